@@ -1,11 +1,14 @@
 import os
 import logging
+import sqlite3
 from flask import Flask, flash, redirect, url_for, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_mail import Mail
 from flask_socketio import SocketIO
 from flask_wtf.csrf import CSRFProtect, CSRFError
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase
 import redis
 # Simple ProxyFix implementation for compatibility
@@ -42,15 +45,26 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
 # Configure the database with performance optimizations
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "postgresql://localhost/proctoring_db")
+# Pool sized for bursts of simultaneous submissions; a short pool_timeout makes an
+# exhausted pool fail fast instead of queueing requests behind it for half a minute
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
-    "pool_size": 20,
-    "max_overflow": 30,
-    "pool_timeout": 30,
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", "25")),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "25")),
+    "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", "5")),
 }
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False  # Disable event system for performance
 
+# SQLite only enforces foreign keys when asked per connection; deletes rely on the
+# models' ON DELETE rules, which Postgres always applies
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 # Configure email
 app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
 app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', '587'))
@@ -59,6 +73,14 @@ app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
 app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER') or os.environ.get('MAIL_USERNAME')
 
+# Configure file uploads; paths are resolved once here so handlers never depend on the cwd
+app.config['UPLOAD_FOLDER'] = os.path.realpath('uploads')
+app.config['QUIZ_ANSWER_UPLOAD_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'quiz_answers')
+app.config['PROFILE_UPLOAD_FOLDER'] = os.path.join(app.static_folder, 'uploads', 'profiles')
+app.config['REPORT_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'reports')
+for upload_folder in (app.config['QUIZ_ANSWER_UPLOAD_FOLDER'], app.config['PROFILE_UPLOAD_FOLDER'], app.config['REPORT_FOLDER']):
+    os.makedirs(upload_folder, exist_ok=True)
+
 # Initialize extensions
 db.init_app(app)
 login_manager.init_app(app)
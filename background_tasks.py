@@ -0,0 +1,66 @@
+"""
+BigBossizzz Background Tasks
+Small in-process worker pool for moving slow I/O (disk writes, SMTP, file parsing) off the request thread
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import has_request_context, request
+
+from app import app
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('BACKGROUND_WORKERS', '4')),
+    thread_name_prefix='bg-task'
+)
+
+def submit_task(func, *args, **kwargs):
+    """
+    Run a function on the background pool inside an application context
+
+    When submitted from a request, the task runs in a request context for the same
+    base URL so url_for(..., _external=True) keeps working (e.g. links in emails).
+
+    Args:
+        func (callable): The function to run
+        *args, **kwargs: Arguments passed through to func
+
+    Returns:
+        concurrent.futures.Future: Future for callers that need the result
+    """
+    base_url = request.url_root if has_request_context() else None
+    return _submit(base_url, func, args, kwargs)
+
+def submit_task_after(delay, func, *args, **kwargs):
+    """
+    Run a function on the background pool after a delay, without holding a worker while waiting
+
+    Args:
+        delay (float): Seconds to wait before the task is queued
+        func (callable): The function to run
+        *args, **kwargs: Arguments passed through to func
+
+    Returns:
+        threading.Timer: The started timer, which can be cancelled before it fires
+    """
+    base_url = request.url_root if has_request_context() else None
+    timer = threading.Timer(delay, _submit, args=(base_url, func, args, kwargs))
+    timer.daemon = True
+    timer.start()
+    return timer
+
+def _submit(base_url, func, args, kwargs):
+    """Queue func on the pool, inside a request context for base_url when one is given"""
+    def run():
+        context = app.test_request_context(base_url=base_url) if base_url else app.app_context()
+        with context:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logging.error("Background task %s failed: %s", func.__name__, e)
+                raise
+
+    return _executor.submit(run)
@@ -43,6 +43,7 @@ def run_migration():
             attempt_columns = [
                 "ALTER TABLE quiz_attempt ADD COLUMN report_sent BOOLEAN DEFAULT 0",
                 "ALTER TABLE quiz_attempt ADD COLUMN violation_count INTEGER DEFAULT 0",
+                "ALTER TABLE quiz_attempt ADD COLUMN high_severity_count INTEGER DEFAULT 0",
                 "ALTER TABLE quiz_attempt ADD COLUMN is_flagged BOOLEAN DEFAULT 0",
                 "ALTER TABLE quiz_attempt ADD COLUMN termination_reason TEXT"
             ]
@@ -60,13 +61,149 @@ def run_migration():
                     else:
                         logger.warning(f"Error executing {sql}: {e}")
             
+            # Backfill the per-attempt violation counters that log_proctoring_event keeps up to date
+            logger.info("Backfilling attempt violation counters...")
+            try:
+                db.session.execute(text("""
+                    UPDATE quiz_attempt SET
+                        violation_count = (SELECT COUNT(*) FROM proctoring_event pe WHERE pe.attempt_id = quiz_attempt.id),
+                        high_severity_count = (SELECT COUNT(*) FROM proctoring_event pe
+                                               WHERE pe.attempt_id = quiz_attempt.id AND pe.severity = 'high')
+                """))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Error backfilling attempt violation counters: {e}")
+            
+            # Pending appeals used to be found by matching 'appeal' in the notes; when the flag
+            # column is first added, seed it from that same match
+            logger.info("Adding the pending-appeal flag to user violations...")
+            try:
+                db.session.execute(text("ALTER TABLE user_violation ADD COLUMN has_pending_appeal BOOLEAN DEFAULT FALSE"))
+                db.session.execute(text("""
+                    UPDATE user_violation SET has_pending_appeal = TRUE
+                    WHERE is_flagged = TRUE AND can_retake = FALSE AND LOWER(notes) LIKE '%appeal%'
+                """))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.info(f"Pending-appeal flag already exists or error: {e}")
+            
+            # One violation record per user, so flags can be upserted on user_id. Where older code
+            # created duplicates, fold them into the oldest record before dropping the rest
+            logger.info("Enforcing one violation record per user...")
+            if db.engine.dialect.name == 'postgresql':
+                merged_notes = "STRING_AGG(d.notes, chr(10) ORDER BY d.id)"
+            else:
+                merged_notes = "GROUP_CONCAT(d.notes, char(10))"
+            try:
+                db.session.execute(text(f"""
+                    UPDATE user_violation SET
+                        violation_count = (SELECT SUM(COALESCE(d.violation_count, 0)) FROM user_violation d
+                                           WHERE d.user_id = user_violation.user_id),
+                        is_flagged = EXISTS (SELECT 1 FROM user_violation d
+                                             WHERE d.user_id = user_violation.user_id AND d.is_flagged = TRUE),
+                        can_retake = EXISTS (SELECT 1 FROM user_violation d
+                                             WHERE d.user_id = user_violation.user_id AND d.can_retake = TRUE),
+                        has_pending_appeal = EXISTS (SELECT 1 FROM user_violation d
+                                                     WHERE d.user_id = user_violation.user_id AND d.has_pending_appeal = TRUE),
+                        flagged_at = COALESCE(flagged_at, (SELECT MAX(d.flagged_at) FROM user_violation d
+                                                           WHERE d.user_id = user_violation.user_id)),
+                        retake_approved_at = COALESCE(retake_approved_at, (SELECT MAX(d.retake_approved_at) FROM user_violation d
+                                                                           WHERE d.user_id = user_violation.user_id)),
+                        notes = (SELECT {merged_notes} FROM user_violation d WHERE d.user_id = user_violation.user_id)
+                    WHERE id IN (SELECT MIN(id) FROM user_violation GROUP BY user_id HAVING COUNT(*) > 1)
+                """))
+                db.session.execute(text(
+                    "DELETE FROM user_violation WHERE id NOT IN (SELECT MIN(id) FROM user_violation GROUP BY user_id)"
+                ))
+                db.session.execute(text(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS uq_user_violation_user ON user_violation(user_id)"
+                ))
+                db.session.commit()
+                logger.info("Merged duplicate violation records and added the per-user unique index")
+            except Exception as e:
+                # Nothing is deleted unless the merge succeeded; upserts keep working without the index
+                db.session.rollback()
+                logger.warning(f"Error merging duplicate violation records, unique index not created: {e}")
+            
+            # Rebuild foreign keys with the ON DELETE rules declared in models.py, so deleting a
+            # user, quiz, attempt or question removes its dependent rows in the database.
+            # SQLite can't alter constraints; its tables get the rules when created by create_all.
+            if db.engine.dialect.name == 'postgresql':
+                logger.info("Applying ON DELETE rules to foreign keys...")
+                for table in db.metadata.sorted_tables:
+                    for fk in table.foreign_keys:
+                        if not fk.ondelete:
+                            continue
+                        
+                        column = fk.parent.name
+                        constraint = f"{table.name}_{column}_fkey"
+                        sql = (
+                            f'ALTER TABLE "{table.name}" DROP CONSTRAINT IF EXISTS {constraint}, '
+                            f'ADD CONSTRAINT {constraint} FOREIGN KEY ({column}) '
+                            f'REFERENCES "{fk.column.table.name}"({fk.column.name}) ON DELETE {fk.ondelete}'
+                        )
+                        try:
+                            db.session.execute(text(sql))
+                            db.session.commit()
+                            logger.info(f"Updated foreign key: {constraint}")
+                        except Exception as e:
+                            db.session.rollback()
+                            logger.warning(f"Error updating foreign key {constraint}: {e}")
+            
+            # Per-user violation rollup for the admin dashboards; the unique index lets the
+            # app refresh it CONCURRENTLY. Other databases aggregate proctoring events on request.
+            if db.engine.dialect.name == 'postgresql':
+                logger.info("Creating violation summary view...")
+                views = [
+                    """CREATE MATERIALIZED VIEW IF NOT EXISTS mv_user_violation_summary AS
+                       SELECT qa.participant_id AS user_id,
+                              COUNT(pe.id) AS total_events,
+                              COUNT(*) FILTER (WHERE pe.severity IN ('high', 'critical')) AS high_severity_count,
+                              MAX(pe.timestamp) AS last_event_at
+                       FROM quiz_attempt qa
+                       JOIN proctoring_event pe ON pe.attempt_id = qa.id
+                       GROUP BY qa.participant_id""",
+                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_user_violation_summary_user ON mv_user_violation_summary(user_id)"
+                ]
+                for sql in views:
+                    try:
+                        db.session.execute(text(sql))
+                        db.session.commit()
+                        logger.info(f"Successfully executed: {sql.split(' AS')[0]}")
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.warning(f"Error creating violation summary view: {e}")
+            
             # Create indexes for performance
             indexes = [
                 "CREATE INDEX IF NOT EXISTS idx_upload_record_host ON upload_record(host_id)",
                 "CREATE INDEX IF NOT EXISTS idx_device_log_user ON device_log(user_id)",
                 "CREATE INDEX IF NOT EXISTS idx_security_alert_user ON security_alert(user_id)",
-                "CREATE INDEX IF NOT EXISTS idx_quiz_attempt_quiz_user ON quiz_attempt(quiz_id, participant_id)",
-                "CREATE INDEX IF NOT EXISTS idx_proctoring_event_attempt ON proctoring_event(attempt_id)"
+                # Covers per-participant attempt stats (grouped by participant, split on status)
+                "CREATE INDEX IF NOT EXISTS idx_quiz_attempt_quiz_user_status ON quiz_attempt(quiz_id, participant_id, status)",
+                "DROP INDEX IF EXISTS idx_quiz_attempt_quiz_user",
+                # Covers per-attempt event counts split by severity
+                "CREATE INDEX IF NOT EXISTS idx_proctoring_event_attempt_severity ON proctoring_event(attempt_id, severity)",
+                "DROP INDEX IF EXISTS idx_proctoring_event_attempt",
+                # Partial index for a participant's in-progress attempts (quiz start and resume list)
+                "CREATE INDEX IF NOT EXISTS idx_quiz_attempt_user_quiz_in_progress ON quiz_attempt(participant_id, quiz_id) WHERE status = 'in_progress'",
+                # Covers per-attempt answer loads and the (attempt, question) lookups on submit
+                "CREATE INDEX IF NOT EXISTS idx_answer_attempt_question ON answer(attempt_id, question_id)",
+                "DROP INDEX IF EXISTS idx_answer_attempt",
+                "CREATE INDEX IF NOT EXISTS idx_question_quiz ON question(quiz_id)",
+                "CREATE INDEX IF NOT EXISTS idx_question_option_question ON question_option(question_id)",
+                "CREATE INDEX IF NOT EXISTS idx_quiz_attempt_started ON quiz_attempt(started_at DESC)",
+                "CREATE INDEX IF NOT EXISTS idx_quiz_attempt_status ON quiz_attempt(status)",
+                "CREATE INDEX IF NOT EXISTS idx_user_created ON \"user\"(created_at DESC)",
+                "CREATE INDEX IF NOT EXISTS idx_login_event_user_time ON login_event(user_id, login_time)",
+                # Covers the distinct-IP suspicion check without visiting the table
+                "CREATE INDEX IF NOT EXISTS idx_login_event_user_time_ip ON login_event(user_id, login_time, ip_address)",
+                # Partial index for the admin appeals queue
+                "CREATE INDEX IF NOT EXISTS idx_user_violation_pending_appeal ON user_violation(flagged_at) WHERE has_pending_appeal",
+                # Partial index for score aggregation over completed attempts
+                "CREATE INDEX IF NOT EXISTS idx_quiz_attempt_completed ON quiz_attempt(quiz_id) WHERE status = 'completed'"
             ]
             
             logger.info("Creating performance indexes...")
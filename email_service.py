@@ -30,6 +30,10 @@ class BrevoEmailService:
             'api-key': self.api_key
         }
         
+        # Keep-alive session so consecutive sends reuse one TLS connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        
         # Validate critical configuration with development flexibility
         if not self.api_key:
             raise ValueError("❌ CRITICAL: BREVO_API_KEY not set. Email system cannot function!")
@@ -89,10 +93,9 @@ class BrevoEmailService:
             return False
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
                 json=email_data,
-                headers=self.headers,
                 timeout=30
             )
             
@@ -106,6 +109,63 @@ class BrevoEmailService:
         except requests.exceptions.RequestException as e:
             logging.error(f"❌ Email service error: {e}")
             return False
+    
+    def send_batch(self,
+                   messages: list,
+                   from_name: str = "BigBossizzz Academic Platform") -> bool:
+        """Send several personalised emails in one Brevo API call using messageVersions
+        
+        Each message is a dict with to_email, subject and html_content.
+        """
+        if not messages:
+            return True
+        
+        if not self.api_key or not self.sender_email:
+            logging.error("Cannot send batch email: Brevo sender is not configured")
+            return False
+        
+        if not from_name or from_name == "BigBossizzz Academic Platform":
+            from_name = self.sender_name
+        
+        # Brevo accepts at most 1000 message versions per request
+        sent_all = True
+        for start in range(0, len(messages), 1000):
+            chunk = messages[start:start + 1000]
+            email_data = {
+                "sender": {
+                    "name": from_name,
+                    "email": self.sender_email
+                },
+                "subject": chunk[0]['subject'],
+                "htmlContent": chunk[0]['html_content'],
+                "messageVersions": [
+                    {
+                        "to": [{"email": message['to_email']}],
+                        "subject": message['subject'],
+                        "htmlContent": message['html_content']
+                    }
+                    for message in chunk
+                ]
+            }
+            
+            try:
+                response = self.session.post(
+                    self.api_url,
+                    json=email_data,
+                    timeout=30
+                )
+                
+                if response.status_code == 201:
+                    logging.info(f"✅ Batch email sent successfully to {len(chunk)} recipients")
+                else:
+                    logging.error(f"❌ Failed to send batch email: {response.status_code} - {response.text}")
+                    sent_all = False
+                    
+            except requests.exceptions.RequestException as e:
+                logging.error(f"❌ Email service error: {e}")
+                sent_all = False
+        
+        return sent_all
 
 # Global email service instance
 brevo_service = BrevoEmailService()
@@ -297,6 +357,36 @@ def send_host_login_notification(host, user=None, login_event=None):
     actual_user = user if user else host
     return send_login_notification(actual_user, login_event)
 
+def send_host_login_notifications(hosts, user, login_event=None):
+    """Tell every host that a participant logged in, batched into a single API call"""
+    try:
+        login_time = login_event.login_time if login_event else datetime.now()
+        subject = f'🔔 Participant Login - {user.username}'
+        
+        messages = []
+        for host in hosts:
+            html_content = f"""
+            <div style="font-family: Arial, sans-serif; max-width: 500px;">
+                <h3>👁️ BigBossizzz Participant Login</h3>
+                <p>Hello {host.username},</p>
+                <p><strong>Participant:</strong> {user.username} ({user.email})</p>
+                <p><strong>Login Time:</strong> {login_time.strftime('%Y-%m-%d %H:%M:%S')}</p>
+                <p><strong>IP Address:</strong> {login_event.ip_address if login_event else 'Unknown'}</p>
+                <p><strong>Academic Platform:</strong> BigBossizzz</p>
+            </div>
+            """
+            messages.append({
+                'to_email': host.email,
+                'subject': subject,
+                'html_content': html_content
+            })
+        
+        return brevo_service.send_batch(messages, from_name="BigBossizzz Academic Security")
+        
+    except Exception as e:
+        logging.error(f"❌ Host login notifications failed: {str(e)}")
+        return False
+
 def send_violation_alert(instructor_email: str, student_name: str,
                        quiz_title: str, violation_details: str) -> bool:
     """Send real-time violation alert to instructor"""
@@ -74,8 +74,8 @@ class User(UserMixin, db.Model):
     lti_result_sourcedid = db.Column(db.String(255))  # Grade passback identifier
     
     # Relationships
-    created_quizzes = db.relationship('Quiz', backref='creator', lazy=True, cascade='all, delete-orphan')
-    quiz_attempts = db.relationship('QuizAttempt', backref='participant', lazy=True, cascade='all, delete-orphan')
+    created_quizzes = db.relationship('Quiz', backref='creator', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    quiz_attempts = db.relationship('QuizAttempt', backref='participant', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
     user_roles = db.relationship('UserRole', foreign_keys='UserRole.user_id', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
@@ -139,6 +139,7 @@ class User(UserMixin, db.Model):
             user_role.user_id = self.id
             user_role.role_id = role.id
             db.session.add(user_role)
+            self.__dict__.pop('_role_name_cache', None)
             return True
         return False
     
@@ -150,15 +151,24 @@ class User(UserMixin, db.Model):
             user_role = UserRole.query.filter_by(user_id=self.id, role_id=role.id).first()
             if user_role:
                 db.session.delete(user_role)
+                self.__dict__.pop('_role_name_cache', None)
                 return True
         return False
     
+    def _role_names(self):
+        """Role names, resolved once per loaded instance (current_user is reloaded each request)"""
+        names = self.__dict__.get('_role_name_cache')
+        if names is None:
+            try:
+                names = frozenset(ur.role.name for ur in self.user_roles if ur.role)
+            except Exception:
+                names = frozenset()
+            self.__dict__['_role_name_cache'] = names
+        return names
+    
     def has_role(self, role_name):
         """Check if user has a specific role"""
-        try:
-            return any(ur.role.name == role_name for ur in self.user_roles if ur.role)
-        except Exception:
-            return False
+        return role_name in self._role_names()
     
     def get_roles(self):
         """Get all role names for this user"""
@@ -205,7 +215,7 @@ class Quiz(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    creator_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    creator_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=True)  # Add course relationship
     time_limit = db.Column(db.Integer, default=60)  # in minutes
     is_active = db.Column(db.Boolean, default=True)
@@ -233,15 +243,15 @@ class Quiz(db.Model):
     display_order = db.Column(db.Integer, default=0)  # For course-level quiz ordering
     
     # Relationships
-    questions = db.relationship('Question', backref='quiz', lazy=True, cascade='all, delete-orphan')
-    attempts = db.relationship('QuizAttempt', backref='quiz', lazy=True, cascade='all, delete-orphan')
+    questions = db.relationship('Question', backref='quiz', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    attempts = db.relationship('QuizAttempt', backref='quiz', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
     
     def __repr__(self):
         return f'<Quiz {self.title}>'
 
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
     question_text = db.Column(db.Text, nullable=False)
     question_type = db.Column(db.String(20), default='multiple_choice')  # 'multiple_choice', 'text', 'true_false', 'code_submission', 'file_upload', 'drawing'
     points = db.Column(db.Integer, default=1)
@@ -257,8 +267,8 @@ class Question(db.Model):
     sample_output = db.Column(db.Text)  # For code_submission: expected output example
     
     # Relationships
-    options = db.relationship('QuestionOption', backref='question', lazy=True, cascade='all, delete-orphan')
-    answers = db.relationship('Answer', backref='question', lazy=True, cascade='all, delete-orphan')
+    options = db.relationship('QuestionOption', backref='question', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    answers = db.relationship('Answer', backref='question', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
     
     def get_shuffled_options(self):
         """Return shuffled options for this question"""
@@ -273,7 +283,7 @@ class Question(db.Model):
 
 class QuestionOption(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id', ondelete='CASCADE'), nullable=False)
     option_text = db.Column(db.String(500), nullable=False)
     is_correct = db.Column(db.Boolean, default=False)
     order = db.Column(db.Integer, default=0)
@@ -283,8 +293,8 @@ class QuestionOption(db.Model):
 
 class QuizAttempt(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    participant_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    participant_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
     score = db.Column(db.Float)
@@ -298,9 +308,11 @@ class QuizAttempt(db.Model):
     highest_risk_level = db.Column(db.String(20), default='low')  # 'low', 'medium', 'high', 'critical'
     highest_risk_severity = db.Column(db.Integer, default=1)  # 1=low, 2=medium, 3=high, 4=critical
     violation_counts_json = db.Column(db.Text)  # JSON: {"low": 2, "medium": 1, "high": 0, "critical": 0}
+    violation_count = db.Column(db.Integer, default=0)  # Proctoring events logged for this attempt
+    high_severity_count = db.Column(db.Integer, default=0)  # Of which severity 'high'
     
     # Relationships (participant and quiz backrefs are defined in User and Quiz models)
-    answers = db.relationship('Answer', backref='attempt', lazy=True, cascade='all, delete-orphan')
+    answers = db.relationship('Answer', backref='attempt', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
     
     def calculate_score(self):
         correct_answers = 0
@@ -323,6 +335,14 @@ class QuizAttempt(db.Model):
     
     def update_highest_risk(self, new_severity_level):
         """Update highest risk summary when a new violation is added"""
+        for column, value in QuizAttempt.risk_summary_after(
+            self.highest_risk_level, self.highest_risk_severity, self.violation_counts_json, new_severity_level
+        ).items():
+            setattr(self, column, value)
+    
+    @staticmethod
+    def risk_summary_after(highest_risk_level, highest_risk_severity, violation_counts_json, new_severity_level):
+        """Return the risk summary column values once a violation of new_severity_level is added"""
         import json
         
         # Severity mapping: critical > high > medium > low
@@ -330,13 +350,13 @@ class QuizAttempt(db.Model):
         new_severity_score = severity_map.get(new_severity_level, 1)
         
         # Update highest risk if new violation is more severe
-        if new_severity_score > self.highest_risk_severity:
-            self.highest_risk_level = new_severity_level
-            self.highest_risk_severity = new_severity_score
+        if new_severity_score > (highest_risk_severity or 1):
+            highest_risk_level = new_severity_level
+            highest_risk_severity = new_severity_score
         
         # Update violation counts
         try:
-            counts = json.loads(self.violation_counts_json) if self.violation_counts_json else {}
+            counts = json.loads(violation_counts_json) if violation_counts_json else {}
         except (json.JSONDecodeError, TypeError):
             counts = {}
         
@@ -348,17 +368,20 @@ class QuizAttempt(db.Model):
         # Increment count for this severity level
         counts[new_severity_level] = counts.get(new_severity_level, 0) + 1
         
-        # Save updated counts
-        self.violation_counts_json = json.dumps(counts)
+        return {
+            'highest_risk_level': highest_risk_level,
+            'highest_risk_severity': highest_risk_severity,
+            'violation_counts_json': json.dumps(counts)
+        }
     
     def __repr__(self):
         return f'<Attempt {self.id}>'
 
 class Answer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'), nullable=False)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
-    selected_option_id = db.Column(db.Integer, db.ForeignKey('question_option.id'))
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id', ondelete='CASCADE'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id', ondelete='CASCADE'), nullable=False)
+    selected_option_id = db.Column(db.Integer, db.ForeignKey('question_option.id', ondelete='SET NULL'))
     text_answer = db.Column(db.Text)
     is_correct = db.Column(db.Boolean)
     answered_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -377,7 +400,7 @@ class Answer(db.Model):
 
 class ProctoringEvent(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'), nullable=False)
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id', ondelete='CASCADE'), nullable=False)
     event_type = db.Column(db.String(50), nullable=False)  # 'tab_switch', 'window_blur', 'multiple_faces', etc.
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     details = db.Column(db.Text)  # Additional event details
@@ -385,7 +408,7 @@ class ProctoringEvent(db.Model):
     description = db.Column(db.Text)  # Add description field
     
     # Add the missing relationship
-    attempt = db.relationship('QuizAttempt', backref='proctoring_events', lazy=True)
+    attempt = db.relationship('QuizAttempt', backref=db.backref('proctoring_events', cascade='all, delete-orphan', passive_deletes=True), lazy=True)
     
     def __repr__(self):
         return f'<ProctoringEvent {self.event_type}>'
@@ -427,7 +450,7 @@ class AlertThreshold(db.Model):
 class QuizThresholdOverride(db.Model):
     """Model to override global thresholds for specific quizzes"""
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
     threshold_id = db.Column(db.Integer, db.ForeignKey('alert_threshold.id'), nullable=False)
     
     # Override values (NULL means use global threshold)
@@ -453,7 +476,7 @@ class QuizThresholdOverride(db.Model):
 class AlertTrigger(db.Model):
     """Model to log when alert thresholds are exceeded"""
     id = db.Column(db.Integer, primary_key=True)
-    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'), nullable=False)
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id', ondelete='CASCADE'), nullable=False)
     threshold_id = db.Column(db.Integer, db.ForeignKey('alert_threshold.id'), nullable=False)
     
     # Event details
@@ -499,7 +522,7 @@ class LoginEvent(db.Model):
 
 class UserViolation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, unique=True)  # One record per user
     violation_count = db.Column(db.Integer, default=0)
     is_flagged = db.Column(db.Boolean, default=False)
     flagged_at = db.Column(db.DateTime)
@@ -508,6 +531,7 @@ class UserViolation(db.Model):
     retake_approved_by = db.Column(db.Integer, db.ForeignKey('user.id'))
     retake_approved_at = db.Column(db.DateTime)
     notes = db.Column(db.Text)
+    has_pending_appeal = db.Column(db.Boolean, default=False)  # Set by a student appeal, cleared by the admin decision
     
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id], backref=db.backref('violations', lazy=True))
@@ -526,7 +550,7 @@ class UploadRecord(db.Model):
     mime_type = db.Column(db.String(100))
     stored_path = db.Column(db.String(500))
     parsed = db.Column(db.Boolean, default=False)
-    parsed_to_quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'))
+    parsed_to_quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='SET NULL'))
     candidate_questions_json = db.Column(db.Text)  # JSON string of candidate questions
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -539,7 +563,7 @@ class UploadRecord(db.Model):
 class DeviceLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'))
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='SET NULL'))
     ip_address = db.Column(db.String(45))  # IPv6 compatible
     user_agent = db.Column(db.Text)
     device_type = db.Column(db.String(50))
@@ -560,8 +584,8 @@ class DeviceLog(db.Model):
 class SecurityAlert(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'))
-    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'))
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='SET NULL'))
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id', ondelete='SET NULL'))
     alert_type = db.Column(db.String(50), nullable=False)  # 'multiple_faces', 'suspicious_behavior', 'device_change', etc.
     severity = db.Column(db.String(20), default='medium')  # 'low', 'medium', 'high', 'critical'
     description = db.Column(db.Text)
@@ -582,7 +606,7 @@ class SecurityAlert(db.Model):
 
 class CollaborationSignal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
     signal_type = db.Column(db.String(50), nullable=False)  # 'answer_similarity', 'simultaneous_answers', 'timing_correlation', 'shared_ip'
     score = db.Column(db.Float, nullable=False)  # 0.0 to 1.0
     severity = db.Column(db.String(20), default='info')  # 'info', 'warn', 'high'
@@ -605,9 +629,9 @@ class CollaborationSignal(db.Model):
 
 class AttemptSimilarity(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
-    attempt_a_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'), nullable=False)
-    attempt_b_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
+    attempt_a_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id', ondelete='CASCADE'), nullable=False)
+    attempt_b_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id', ondelete='CASCADE'), nullable=False)
     jaccard_score = db.Column(db.Float, default=0.0)
     timing_correlation = db.Column(db.Float, default=0.0)
     coanswer_count = db.Column(db.Integer, default=0)
@@ -627,8 +651,8 @@ class AttemptSimilarity(db.Model):
 # Real-time Collaboration Heatmap Models
 class InteractionEvent(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'), nullable=False)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=True)
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id', ondelete='CASCADE'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id', ondelete='SET NULL'), nullable=True)
     event_type = db.Column(db.String(50), nullable=False)  # 'click', 'focus', 'scroll', 'hover', 'answer_change'
     element_selector = db.Column(db.String(200))  # CSS selector or element identifier
     x_coordinate = db.Column(db.Integer)  # Click/hover position
@@ -648,8 +672,8 @@ class InteractionEvent(db.Model):
 
 class QuestionHeatmapData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id', ondelete='CASCADE'), nullable=False)
     
     # Aggregated metrics
     total_participants = db.Column(db.Integer, default=0)
@@ -678,7 +702,7 @@ class QuestionHeatmapData(db.Model):
 
 class CollaborationInsight(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
     insight_type = db.Column(db.String(50), nullable=False)  # 'difficulty_pattern', 'engagement_drop', 'confusion_area', 'performance_trend'
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -707,9 +731,9 @@ class CollaborationInsight(db.Model):
 # AI-Powered Plagiarism Detection Models
 class PlagiarismAnalysis(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'), nullable=False)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
-    answer_id = db.Column(db.Integer, db.ForeignKey('answer.id'), nullable=False)
+    quiz_attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id', ondelete='CASCADE'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id', ondelete='CASCADE'), nullable=False)
+    answer_id = db.Column(db.Integer, db.ForeignKey('answer.id', ondelete='CASCADE'), nullable=False)
     
     # Analysis Results
     overall_similarity_score = db.Column(db.Float, nullable=False)  # 0.0 to 1.0
@@ -763,10 +787,10 @@ class PlagiarismAnalysis(db.Model):
 
 class PlagiarismMatch(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    analysis_id = db.Column(db.Integer, db.ForeignKey('plagiarism_analysis.id'), nullable=False)
+    analysis_id = db.Column(db.Integer, db.ForeignKey('plagiarism_analysis.id', ondelete='CASCADE'), nullable=False)
     
     # Match information
-    matched_against_id = db.Column(db.Integer, db.ForeignKey('answer.id'), nullable=False)
+    matched_against_id = db.Column(db.Integer, db.ForeignKey('answer.id', ondelete='CASCADE'), nullable=False)
     similarity_score = db.Column(db.Float, nullable=False)
     match_type = db.Column(db.String(30), nullable=False)  # 'exact', 'paraphrase', 'structural', 'semantic'
     
@@ -0,0 +1,119 @@
+"""
+BigBossizzz PDF Extraction
+Per-page PDF text extraction: PyMuPDF when installed, otherwise PyPDF2 fanned out
+over a shared process pool for larger documents
+
+Kept free of app imports so pool workers start without loading Flask or the database.
+"""
+
+import os
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+try:
+    import pymupdf  # PyMuPDF (formerly imported as fitz): native MuPDF text extraction
+except ImportError:
+    pymupdf = None
+
+# Below this many pages parsing the document once per worker costs more than it saves
+PARALLEL_PAGE_THRESHOLD = 8
+PDF_WORKERS = min(os.cpu_count() or 1, 4)
+
+# One pool per process, started on first use and reused by every later upload
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    """Return the shared pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Workers must not be forked from a threaded web worker (locks held by other
+            # threads would be copied locked), so start them from a forkserver or fresh interpreter
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return _executor
+
+def _reset_executor():
+    """Drop a broken pool so the next document starts a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def _extract_page(reader, page_num):
+    """Return one page's text, or an empty string if the page can't be read"""
+    try:
+        return reader.pages[page_num].extract_text() or ''
+    except Exception as e:
+        logging.warning("Error extracting text from page %s: %s", page_num, e)
+        return ''
+
+def _extract_page_range(pdf_bytes, start, stop):
+    """Open the PDF in a pool worker and return the text of pages start..stop-1"""
+    import PyPDF2
+    reader = PyPDF2.PdfReader(BytesIO(pdf_bytes))
+    return [_extract_page(reader, page_num) for page_num in range(start, stop)]
+
+def iter_page_texts(pdf_bytes):
+    """
+    Yield the text of each page, in page order, so callers can stop reading early
+
+    Args:
+        pdf_bytes (bytes): Raw PDF; PyPDF2 pool workers each open their own reader from it
+
+    Yields:
+        str: One page's text (nothing for a document with no pages)
+
+    Raises:
+        PyPDF2.errors.PdfReadError: If the PyPDF2 fallback can't read the document
+    """
+    if pymupdf is not None:
+        try:
+            doc = pymupdf.open(stream=pdf_bytes, filetype='pdf')
+        except Exception as e:
+            logging.warning("PyMuPDF could not read PDF, falling back to PyPDF2: %s", e)
+        else:
+            with doc:
+                for page in doc:
+                    yield page.get_text('text')
+            return
+
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_bytes))
+    n_pages = len(pdf_reader.pages)
+    next_page = 0
+
+    if n_pages >= PARALLEL_PAGE_THRESHOLD:
+        # One contiguous page range per worker, so each parses the document only once
+        chunk_size = -(-n_pages // PDF_WORKERS)
+        futures = []
+        try:
+            executor = _get_executor()
+            futures = [
+                executor.submit(_extract_page_range, pdf_bytes, start, min(start + chunk_size, n_pages))
+                for start in range(0, n_pages, chunk_size)
+            ]
+            for future in futures:
+                for page_text in future.result():
+                    yield page_text
+                    next_page += 1
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                _reset_executor()
+            logging.warning("Parallel PDF extraction unavailable, extracting serially: %s", e)
+        finally:
+            # Also reached when the caller stops early: drop ranges no worker has started
+            for future in futures:
+                future.cancel()
+
+    for page_num in range(next_page, n_pages):
+        yield _extract_page(pdf_reader, page_num)
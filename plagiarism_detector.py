@@ -28,6 +28,9 @@ from models import PlagiarismAnalysis, PlagiarismMatch, Answer
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Text normalization pattern, compiled once and reused for every answer
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\!\?\;\:]')
+
 class PlagiarismDetector:
     """Advanced AI-powered plagiarism detection system"""
     
@@ -68,10 +71,10 @@ class PlagiarismDetector:
             return ""
             
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
+        text = ' '.join(text.split())
         
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.\,\!\?\;\:]', '', text)
+        text = SPECIAL_CHARS_RE.sub('', text)
         
         # Convert to lowercase
         text = text.lower()
@@ -1,9 +1,10 @@
 import os
-from flask import render_template, request, redirect, url_for, flash, jsonify, session, send_file, make_response
+from functools import wraps
+from flask import render_template, request, redirect, url_for, flash, jsonify, session, send_file, make_response, g, abort
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from app import app, db, mail, socketio
+from app import app, db, mail, socketio, redis_client
 from models import User, Quiz, Question, QuestionOption, QuizAttempt, Answer, ProctoringEvent, LoginEvent, UserViolation, UploadRecord, Course, HostCourseAssignment, ParticipantEnrollment, DeviceLog, SecurityAlert, CollaborationSignal, AttemptSimilarity, AlertThreshold, QuizThresholdOverride, AlertTrigger, InteractionEvent, QuestionHeatmapData, CollaborationInsight, PlagiarismAnalysis, PlagiarismMatch, Role, Permission, UserRole, RolePermission, RoleAuditLog
 
 # 🛡️ FEATURE FLAGS - Defined immediately after imports to prevent NameError
@@ -60,7 +61,7 @@ if ENABLE_ANALYTICS:
     except ImportError:
         ENABLE_ANALYTICS = False
 from forms import RegistrationForm, LoginForm, QuizForm, QuestionForm, ProfileForm
-from email_service import send_verification_email, send_credentials_email, send_login_notification, send_host_login_notification
+from email_service import send_verification_email, send_credentials_email, send_login_notification, send_host_login_notifications
 from flask_mail import Message
 from datetime import datetime, timedelta
 import json
@@ -68,25 +69,33 @@ import logging
 import os
 import re
 import csv
-# Import optional data processing libraries
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
-
+import hashlib
+import heapq
+from itertools import islice
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import closing, nullcontext
+# pandas, PyPDF2, python-docx, openpyxl and reportlab are imported inside the
+# parsers and report views that use them, keeping worker start-up light
+from io import BytesIO
 try:
-    import PyPDF2
+    import re2  # Optional linear-time matcher (google-re2)
 except ImportError:
-    PyPDF2 = None
-
+    re2 = None
 try:
-    import docx
+    from PIL import Image, ImageOps  # Optional: downscales profile pictures
 except ImportError:
-    docx = None
-from io import BytesIO
-from sqlalchemy import func, text
-from sqlalchemy.orm import joinedload, selectinload
+    Image = None
+from sqlalchemy import func, text, case, cast, or_, tuple_, Numeric, String
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, joinedload, selectinload, contains_eager
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from utils import get_time_greeting, get_greeting_icon
+from background_tasks import submit_task, submit_task_after
 
 # Import collaboration detection with feature flag (after placeholders)
 if ENABLE_COLLABORATION:
@@ -110,6 +119,192 @@ if ENABLE_RBAC:
     except ImportError:
         ENABLE_RBAC = False
 
+def current_is_admin():
+    """Return current_user.is_admin(), evaluated once per request and cached on flask.g"""
+    if not hasattr(g, '_is_admin'):
+        g._is_admin = current_user.is_admin()
+    return g._is_admin
+
+def admin_only(f=None, *, redirect_to_dashboard=False):
+    """
+    Reject non-admin users before the view runs
+
+    Used bare (@admin_only) it answers with a 403. Pages reached by navigation use
+    @admin_only(redirect_to_dashboard=True) to flash a message and send the user back
+    to their dashboard instead.
+    """
+    def decorator(view):
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            if not current_is_admin():
+                if redirect_to_dashboard:
+                    flash('Access denied. Administrator privileges required.', 'error')
+                    return redirect(url_for('dashboard'))
+                abort(403)
+            return view(*args, **kwargs)
+        return decorated_function
+    return decorator(f) if f is not None else decorator
+
+# Short-lived cache for dashboard statistics: Redis when available, in-process otherwise
+ADMIN_STATS_CACHE_KEY = 'dashboard:admin_stats'
+_stats_cache = {}
+LOCAL_CACHE_SWEEP_SIZE = 256
+
+def cached_stats(key, compute, timeout=30, cache_empty=True):
+    """Return a JSON-serialisable value cached under key, calling compute() on a miss
+
+    With cache_empty=False an empty result is returned without being stored, so the next call computes it again.
+    """
+    if redis_client:
+        try:
+            value = redis_client.get(key)
+            if value is not None:
+                return json.loads(value)
+            value = compute()
+            if value or cache_empty:
+                redis_client.setex(key, timeout, json.dumps(value))
+            return value
+        except Exception as e:
+            logging.warning("Stats cache unavailable, using local cache: %s", e)
+    
+    now = time.time()
+    entry = _stats_cache.get(key)
+    if entry and entry[0] > now:
+        return entry[1]
+    value = compute()
+    if not value and not cache_empty:
+        return value
+    # Per-upload keys make the local cache open-ended, so sweep expired entries as it grows
+    if len(_stats_cache) >= LOCAL_CACHE_SWEEP_SIZE:
+        for stale_key in [k for k, (expires, _) in _stats_cache.items() if expires <= now]:
+            del _stats_cache[stale_key]
+    _stats_cache[key] = (now + timeout, value)
+    return value
+
+def invalidate_stats(*keys):
+    """Drop cached statistics after a write that changes them"""
+    for key in keys:
+        _stats_cache.pop(key, None)
+        if redis_client:
+            try:
+                redis_client.delete(key)
+            except Exception as e:
+                logging.warning("Failed to invalidate stats cache key %s: %s", key, e)
+
+# Per-user violation rollup: Postgres reads mv_user_violation_summary (created by
+# database_migration.py), other databases aggregate proctoring events on request
+VIOLATION_SUMMARY_REFRESH_INTERVAL = 60
+_last_violation_summary_refresh = 0.0
+_trailing_violation_summary_refresh = None
+_violation_summary_refresh_lock = threading.Lock()
+
+def violation_summaries(user_ids):
+    """Return {user_id: row} with total_events, high_severity_count and last_event_at"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    
+    if db.engine.dialect.name == 'postgresql':
+        try:
+            rows = db.session.execute(text(
+                "SELECT user_id, total_events, high_severity_count, last_event_at "
+                "FROM mv_user_violation_summary WHERE user_id = ANY(:user_ids)"
+            ), {'user_ids': user_ids})
+            return {row.user_id: row for row in rows}
+        except Exception as e:
+            db.session.rollback()
+            logging.warning("Violation summary view unavailable, aggregating events: %s", e)
+    
+    rows = db.session.query(
+        QuizAttempt.participant_id.label('user_id'),
+        func.count(ProctoringEvent.id).label('total_events'),
+        func.sum(case((ProctoringEvent.severity.in_(['high', 'critical']), 1), else_=0)).label('high_severity_count'),
+        func.max(ProctoringEvent.timestamp).label('last_event_at')
+    ).join(ProctoringEvent, ProctoringEvent.attempt_id == QuizAttempt.id) \
+     .filter(QuizAttempt.participant_id.in_(user_ids)) \
+     .group_by(QuizAttempt.participant_id)
+    return {row.user_id: row for row in rows}
+
+def _refresh_violation_summary_view():
+    db.session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_user_violation_summary"))
+    db.session.commit()
+
+def _run_trailing_violation_summary_refresh():
+    global _last_violation_summary_refresh, _trailing_violation_summary_refresh
+    with _violation_summary_refresh_lock:
+        _trailing_violation_summary_refresh = None
+        _last_violation_summary_refresh = time.time()
+    submit_task(_refresh_violation_summary_view)
+
+def refresh_violation_summary():
+    """
+    Queue a refresh of the violation rollup, at most once per interval per process
+
+    A request inside the interval schedules one trailing refresh for when the interval
+    ends, so events from the tail of a burst still reach the view.
+    """
+    global _last_violation_summary_refresh, _trailing_violation_summary_refresh
+    if db.engine.dialect.name != 'postgresql':
+        return
+    with _violation_summary_refresh_lock:
+        if _trailing_violation_summary_refresh is not None:
+            return
+        wait = _last_violation_summary_refresh + VIOLATION_SUMMARY_REFRESH_INTERVAL - time.time()
+        if wait > 0:
+            _trailing_violation_summary_refresh = threading.Timer(wait, _run_trailing_violation_summary_refresh)
+            _trailing_violation_summary_refresh.daemon = True
+            _trailing_violation_summary_refresh.start()
+            return
+        _last_violation_summary_refresh = time.time()
+    submit_task(_refresh_violation_summary_view)
+
+# Whether a participant is flagged is read on every quiz start; flag writes drop the key
+USER_FLAG_CACHE_TIMEOUT = 60
+
+def user_flag_cache_key(user_id):
+    return f'user_flagged:{user_id}'
+
+def user_is_flagged(user_id):
+    """Return whether the user is flagged for violations, cached for USER_FLAG_CACHE_TIMEOUT seconds"""
+    return cached_stats(
+        user_flag_cache_key(user_id),
+        lambda: db.session.query(UserViolation.id).filter_by(user_id=user_id, is_flagged=True).first() is not None,
+        timeout=USER_FLAG_CACHE_TIMEOUT
+    )
+
+def flag_user_violation(user_id, flagged_by=None, notes=None, count_violation=False):
+    """
+    Flag a user with one INSERT ... ON CONFLICT DO UPDATE on their UserViolation row
+
+    Args:
+        user_id (int): The user to flag
+        flagged_by (int): Admin who flagged the user, None when flagged by the system
+        notes (str): Replaces the record's notes when given
+        count_violation (bool): Also add one to the record's violation count
+    """
+    insert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+    values = {
+        'user_id': user_id,
+        'is_flagged': True,
+        'flagged_at': datetime.utcnow(),
+        'flagged_by': flagged_by,
+        'violation_count': 1 if count_violation else 0
+    }
+    if notes is not None:
+        values['notes'] = notes
+    
+    stmt = insert(UserViolation).values(**values)
+    updates = {column: stmt.excluded[column] for column in values if column not in ('user_id', 'violation_count')}
+    if count_violation:
+        updates['violation_count'] = func.coalesce(UserViolation.violation_count, 0) + 1
+    db.session.execute(stmt.on_conflict_do_update(index_elements=['user_id'], set_=updates))
+
+def auto_flag_user(user_id, notes):
+    """Background task: system-flag a user whose attempt was terminated for violations"""
+    flag_user_violation(user_id, notes=notes, count_violation=True)
+    db.session.commit()
+    invalidate_stats(user_flag_cache_key(user_id))
+
 # Add email health check endpoint
 @app.route('/admin/email-health')
 @login_required
@@ -132,18 +327,6 @@ def admin_email_health():
     except Exception as e:
         return jsonify({'status': 'error', 'error': str(e)}), 500
 
-# Excel/Spreadsheet generation imports
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
-
-# PDF generation imports  
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-
 # Global context processor to inject greeting variables
 @app.context_processor
 def inject_greeting():
@@ -197,18 +380,16 @@ def register():
         
         db.session.add(user)
         db.session.commit()
+        invalidate_stats(ADMIN_STATS_CACHE_KEY)
         
         # Generate verification token and commit it to database
         user.generate_verification_token()
         db.session.commit()  # Critical: Persist the verification token
         
-        # Send verification email
-        if send_verification_email(user):
-            flash('Registration successful! Please check your email to verify your account.', 'success')
-            return render_template('verify_email.html', user=user, resent=False)
-        else:
-            flash('Registration successful, but we could not send the verification email. You can request a new one from the login page.', 'warning')
-            return redirect(url_for('login'))
+        # Send verification email in the background
+        submit_task(_deliver_user_email, send_verification_email, user.id)
+        flash('Registration successful! Your verification email is on its way, please check your inbox shortly.', 'success')
+        return render_template('verify_email.html', user=user, resent=False)
     
     return render_template('register.html', form=form)
 
@@ -228,11 +409,9 @@ def verify_email(token):
         
         db.session.commit()
         
-        # Send credentials email
-        if send_credentials_email(user, temp_password):
-            flash('Email verified successfully! Your login credentials have been sent to your email.', 'success')
-        else:
-            flash('Email verified successfully! You can now log in with your credentials.', 'success')
+        # Send credentials email in the background
+        submit_task(_deliver_user_email, send_credentials_email, user.id, temp_password)
+        flash('Email verified successfully! You can now log in with your credentials.', 'success')
     else:
         flash('Email verification failed. Please try again.', 'error')
     
@@ -255,14 +434,10 @@ def resend_verification(email):
     user.generate_verification_token()
     db.session.commit()
     
-    # Send verification email
-    if send_verification_email(user):
-        flash('Verification email sent successfully! Please check your inbox and spam folder.', 'success')
-        return render_template('verify_email.html', user=user, resent=True)
-    else:
-        flash('Failed to send verification email. Please try again later.', 'error')
-    
-    return redirect(url_for('login'))
+    # Send verification email in the background
+    submit_task(_deliver_user_email, send_verification_email, user.id)
+    flash('Verification email is on its way! Please check your inbox and spam folder shortly.', 'success')
+    return render_template('verify_email.html', user=user, resent=True)
 
 @app.route('/request-verification', methods=['GET', 'POST'])
 def request_verification():
@@ -286,15 +461,51 @@ def request_verification():
         user.generate_verification_token()
         db.session.commit()
         
-        # Send verification email
-        if send_verification_email(user):
-            flash('Verification email sent successfully! Please check your inbox and spam folder.', 'success')
-            return render_template('verify_email.html', user=user, resent=True)
-        else:
-            flash('Failed to send verification email. Please try again later.', 'error')
+        # Send verification email in the background
+        submit_task(_deliver_user_email, send_verification_email, user.id)
+        flash('Verification email is on its way! Please check your inbox and spam folder shortly.', 'success')
+        return render_template('verify_email.html', user=user, resent=True)
     
     return render_template('request_verification.html')
 
+def _deliver_user_email(send_func, user_id, *args, attempt=0, max_retries=5):
+    """Send an email_service message to a user, retrying with exponential backoff while delivery fails"""
+    # Read the user on each attempt so a resent verification uses the newest token
+    user = User.query.get(user_id)
+    if not user:
+        return False
+    
+    if send_func(user, *args):
+        return True
+    
+    if attempt < max_retries:
+        # Wait on a timer rather than sleeping, so a failing mail server doesn't tie up pool workers
+        submit_task_after(2 ** attempt, _deliver_user_email, send_func, user_id, *args,
+                          attempt=attempt + 1, max_retries=max_retries)
+        return False
+    
+    logging.error("Giving up on %s for user %s after %s attempts", send_func.__name__, user_id, max_retries + 1)
+    return False
+
+def _send_login_notifications(user_id, login_event_id):
+    """Email the user about a new login and, for participants, notify every host"""
+    user = User.query.get(user_id)
+    login_event = LoginEvent.query.get(login_event_id)
+    if not user or not login_event:
+        return
+    
+    try:
+        # Send notification to user
+        send_login_notification(user, login_event)
+        
+        # If participant, notify all hosts in one batched send
+        if user.role == 'participant':
+            hosts = User.query.filter_by(role='host').all()
+            send_host_login_notifications(hosts, user, login_event)
+                
+    except Exception as e:
+        logging.error("Failed to send login notifications: %s", e)
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     """User login"""
@@ -320,40 +531,38 @@ def login():
             ip_address = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR', 'Unknown'))
             user_agent = request.headers.get('User-Agent', '')
             
-            # Enhanced device fingerprinting and location tracking
-            device_info = {
-                'user_agent': user_agent,
-                'ip_address': ip_address,
-                'accept_language': request.headers.get('Accept-Language', ''),
-                'accept_encoding': request.headers.get('Accept-Encoding', ''),
-                'remote_addr': request.environ.get('REMOTE_ADDR'),
-                'x_forwarded_for': request.headers.get('X-Forwarded-For', ''),
-                'x_real_ip': request.headers.get('X-Real-IP', ''),
-                'host': request.headers.get('Host', ''),
-                'referer': request.headers.get('Referer', ''),
-                'connection': request.headers.get('Connection', '')
-            }
-            
-            # Check for suspicious login patterns
+            # Check for suspicious login patterns in a single aggregate over the last 7 days:
+            # logins in the last hour, distinct IPs in 24h (location jumping), distinct user agents (device switching)
             from datetime import timedelta
-            recent_logins = LoginEvent.query.filter_by(user_id=user.id).filter(
-                LoginEvent.login_time > datetime.utcnow() - timedelta(hours=1)
-            ).count()
-            
-            # Check for different IP addresses in short time (potential location jumping)
-            different_ips = db.session.query(LoginEvent.ip_address).distinct().filter(
-                LoginEvent.user_id == user.id,
-                LoginEvent.login_time > datetime.utcnow() - timedelta(hours=24)
-            ).count()
-            
-            # Check for different user agents (device switching)
-            different_devices = db.session.query(LoginEvent.user_agent).distinct().filter(
+            now = datetime.utcnow()
+            recent_logins, different_ips, different_devices = db.session.query(
+                func.count(case((LoginEvent.login_time > now - timedelta(hours=1), LoginEvent.id))),
+                func.count(func.distinct(case((LoginEvent.login_time > now - timedelta(hours=24), LoginEvent.ip_address)))),
+                func.count(func.distinct(LoginEvent.user_agent))
+            ).filter(
                 LoginEvent.user_id == user.id,
-                LoginEvent.login_time > datetime.utcnow() - timedelta(days=7)
-            ).count()
+                LoginEvent.login_time > now - timedelta(days=7)
+            ).one()
             
             is_suspicious = recent_logins > 5 or different_ips > 3 or different_devices > 5
             
+            # Enhanced device fingerprinting and location tracking, kept only for suspicious logins
+            if is_suspicious:
+                device_info = {
+                    'user_agent': user_agent,
+                    'ip_address': ip_address,
+                    'accept_language': request.headers.get('Accept-Language', ''),
+                    'accept_encoding': request.headers.get('Accept-Encoding', ''),
+                    'remote_addr': request.environ.get('REMOTE_ADDR'),
+                    'x_forwarded_for': request.headers.get('X-Forwarded-For', ''),
+                    'x_real_ip': request.headers.get('X-Real-IP', ''),
+                    'host': request.headers.get('Host', ''),
+                    'referer': request.headers.get('Referer', ''),
+                    'connection': request.headers.get('Connection', '')
+                }
+            else:
+                device_info = {'user_agent': user_agent}
+            
             # Create login event record
             login_event = LoginEvent(
                 user_id=user.id,
@@ -366,19 +575,8 @@ def login():
             db.session.add(login_event)
             db.session.commit()
             
-            # Send email notifications
-            try:
-                # Send notification to user
-                send_login_notification(user, login_event)
-                
-                # If participant, notify all hosts
-                if user.role == 'participant':
-                    hosts = User.query.filter_by(role='host').all()
-                    for host in hosts:
-                        send_host_login_notification(host, user, login_event)
-                        
-            except Exception as e:
-                logging.error(f"Failed to send login notifications: {e}")
+            # Send email notifications off the request thread
+            submit_task(_send_login_notifications, user.id, login_event.id)
             
             # DEBUG: Log login details
             print(f"🔍 LOGIN DEBUG - User: {user.email}, Role in DB: {user.role}")
@@ -412,7 +610,7 @@ def logout():
 @login_required
 def dashboard():
     """Main dashboard - redirects based on user role"""
-    if current_user.is_admin():
+    if current_is_admin():
         return redirect(url_for('admin_dashboard'))
     elif current_user.is_host():
         return redirect(url_for('host_dashboard'))
@@ -423,21 +621,23 @@ def dashboard():
 @login_required
 def host_dashboard():
     """Enhanced Host dashboard with participant management"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
     quizzes = Quiz.query.filter_by(creator_id=current_user.id).order_by(Quiz.display_order.asc(), Quiz.created_at.desc()).all()
     
-    # Get recent quiz attempts for host's quizzes and add heatmap data flags
-    recent_attempts = []
+    # Get the 10 most recent attempts across the host's quizzes in one query
+    quiz_ids = [quiz.id for quiz in quizzes]
+    recent_attempts = QuizAttempt.query.options(
+        joinedload(QuizAttempt.participant),
+        joinedload(QuizAttempt.quiz)
+    ).filter(QuizAttempt.quiz_id.in_(quiz_ids)).order_by(QuizAttempt.started_at.desc()).limit(10).all()
+    
+    # Add heatmap data flags
     heatmap_ready_count = 0
     
     for quiz in quizzes:
-        attempts = QuizAttempt.query.filter_by(quiz_id=quiz.id).order_by(QuizAttempt.started_at.desc()).limit(5).all()
-        quiz.attempts = attempts  # Add attempts to quiz object for template access
-        recent_attempts.extend(attempts)
-        
         # Check if quiz has completed attempts with interaction data for accurate heatmap counting
         completed_attempts = QuizAttempt.query.filter_by(
             quiz_id=quiz.id, 
@@ -455,15 +655,11 @@ def host_dashboard():
         else:
             quiz.has_heatmap_data = False
     
-    recent_attempts.sort(key=lambda x: x.started_at, reverse=True)
-    recent_attempts = recent_attempts[:10]  # Show only 10 most recent
-    
     # Get participant statistics
     participants = User.query.filter_by(role='participant').all()
     recent_logins = LoginEvent.query.join(User).filter(User.role == 'participant').order_by(LoginEvent.login_time.desc()).limit(10).all()
     
     # Get violation statistics
-    quiz_ids = [quiz.id for quiz in quizzes]
     if quiz_ids:
         high_violations = db.session.query(QuizAttempt, func.count(ProctoringEvent.id).label('violation_count')).join(ProctoringEvent).filter(
             QuizAttempt.quiz_id.in_(quiz_ids),
@@ -486,7 +682,7 @@ def host_dashboard():
 @login_required
 def host_total_quizzes():
     """Show all quizzes created by the host"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -511,7 +707,7 @@ def host_total_quizzes():
 @login_required
 def host_active_quizzes():
     """Show active quizzes created by the host"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -539,7 +735,7 @@ def host_active_quizzes():
 @login_required
 def host_recent_attempts():
     """Show recent quiz attempts for host's quizzes"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -573,7 +769,7 @@ def host_recent_attempts():
 @login_required
 def host_completed_attempts():
     """Show completed quiz attempts for host's quizzes"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -626,14 +822,20 @@ def host_completed_attempts():
 @login_required  
 def host_monitoring():
     """Real-time participant monitoring panel"""
-    if not current_user.is_host() and not current_user.is_admin():
+    is_admin = current_is_admin()
+    if not current_user.is_host() and not is_admin:
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
-    # Get active quiz attempts
-    active_attempts = QuizAttempt.query.filter_by(status='in_progress').join(Quiz).filter(
-        Quiz.creator_id == current_user.id if not current_user.is_admin() else True
-    ).all()
+    # Get active quiz attempts with the participant, answers and quiz questions the panel renders
+    active_query = QuizAttempt.query.filter_by(status='in_progress').join(Quiz).options(
+        contains_eager(QuizAttempt.quiz).selectinload(Quiz.questions),
+        joinedload(QuizAttempt.participant),
+        selectinload(QuizAttempt.answers)
+    )
+    if not is_admin:
+        active_query = active_query.filter(Quiz.creator_id == current_user.id)
+    active_attempts = active_query.all()
     
     # Get recent login events
     recent_logins = LoginEvent.query.order_by(LoginEvent.login_time.desc()).limit(20).all()
@@ -645,7 +847,7 @@ def host_monitoring():
     from sqlalchemy import desc
     
     # CORRECTED: Window functions computed BEFORE filtering to get accurate counts
-    violations_with_stats = db.session.query(
+    violations_query = db.session.query(
         User.id.label('participant_id'),
         User.username.label('participant_name'),
         Quiz.id.label('quiz_id'),
@@ -673,10 +875,10 @@ def host_monitoring():
     ).select_from(User) \
      .join(QuizAttempt, QuizAttempt.participant_id == User.id) \
      .join(Quiz, QuizAttempt.quiz_id == Quiz.id) \
-     .join(ProctoringEvent, ProctoringEvent.attempt_id == QuizAttempt.id) \
-     .filter(
-         Quiz.creator_id == current_user.id if not current_user.is_admin() else True
-     ).subquery()
+     .join(ProctoringEvent, ProctoringEvent.attempt_id == QuizAttempt.id)
+    if not is_admin:
+        violations_query = violations_query.filter(Quiz.creator_id == current_user.id)
+    violations_with_stats = violations_query.subquery()
     
     # Get only the highest severity violation (rank 1) with accurate stats
     consolidated_violations = db.session.query(
@@ -708,16 +910,38 @@ def host_monitoring():
             'is_multiple': result.violation_count > 1
         })
     
+    # Get violation counts for all active attempts in one grouped query
+    violation_counts = dict(db.session.query(
+        ProctoringEvent.attempt_id, func.count(ProctoringEvent.id)
+    ).filter(
+        ProctoringEvent.attempt_id.in_([attempt.id for attempt in active_attempts])
+    ).group_by(ProctoringEvent.attempt_id).all())
+    
+    # Get the latest login of every active participant in one ranked query
+    latest_logins = {}
+    participant_ids = {attempt.participant_id for attempt in active_attempts}
+    if participant_ids:
+        ranked_logins = db.session.query(
+            LoginEvent.id.label('login_event_id'),
+            func.row_number().over(
+                partition_by=LoginEvent.user_id,
+                order_by=LoginEvent.login_time.desc()
+            ).label('rn')
+        ).filter(LoginEvent.user_id.in_(participant_ids)).subquery()
+        
+        latest_logins = {
+            login.user_id: login
+            for login in LoginEvent.query.join(
+                ranked_logins, LoginEvent.id == ranked_logins.c.login_event_id
+            ).filter(ranked_logins.c.rn == 1)
+        }
+    
     # Get participant device info
     participants_online = []
     for attempt in active_attempts:
-        # Get latest login for this participant
-        latest_login = LoginEvent.query.filter_by(user_id=attempt.participant_id).order_by(
-            LoginEvent.login_time.desc()
-        ).first()
+        latest_login = latest_logins.get(attempt.participant_id)
         
-        # Get violation count for this attempt
-        violation_count = ProctoringEvent.query.filter_by(attempt_id=attempt.id).count()
+        violation_count = violation_counts.get(attempt.id, 0)
         
         participants_online.append({
             'attempt': attempt,
@@ -737,13 +961,48 @@ def host_monitoring():
 @login_required
 def get_live_monitoring_data():
     """API endpoint for real-time monitoring data"""
-    if not current_user.is_host() and not current_user.is_admin():
+    is_admin = current_is_admin()
+    if not current_user.is_host() and not is_admin:
         return jsonify({'error': 'Access denied'}), 403
     
     # Get active attempts
-    active_attempts = QuizAttempt.query.filter_by(status='in_progress').join(Quiz).filter(
-        Quiz.creator_id == current_user.id if not current_user.is_admin() else True
-    ).all()
+    active_query = QuizAttempt.query.filter_by(status='in_progress').join(Quiz).options(
+        contains_eager(QuizAttempt.quiz),
+        joinedload(QuizAttempt.participant)
+    )
+    if not is_admin:
+        active_query = active_query.filter(Quiz.creator_id == current_user.id)
+    active_attempts = active_query.all()
+    
+    # Fallback violation stats for older records without a risk summary:
+    # per-attempt counts plus the latest event type, each fetched once for all attempts
+    fallback_ids = [attempt.id for attempt in active_attempts if not attempt.highest_risk_level]
+    fallback_counts = {}
+    fallback_latest = {}
+    if fallback_ids:
+        fallback_counts = dict(db.session.query(
+            ProctoringEvent.attempt_id, func.count(ProctoringEvent.id)
+        ).filter(ProctoringEvent.attempt_id.in_(fallback_ids)).group_by(ProctoringEvent.attempt_id).all())
+        
+        ranked_events = db.session.query(
+            ProctoringEvent.attempt_id,
+            ProctoringEvent.event_type,
+            func.row_number().over(
+                partition_by=ProctoringEvent.attempt_id,
+                order_by=ProctoringEvent.timestamp.desc()
+            ).label('rn')
+        ).filter(ProctoringEvent.attempt_id.in_(fallback_ids)).subquery()
+        fallback_latest = dict(db.session.query(
+            ranked_events.c.attempt_id, ranked_events.c.event_type
+        ).filter(ranked_events.c.rn == 1).all())
+    
+    # Progress counts without loading answer and question rows
+    answers_count = dict(db.session.query(
+        Answer.attempt_id, func.count(Answer.id)
+    ).filter(Answer.attempt_id.in_([attempt.id for attempt in active_attempts])).group_by(Answer.attempt_id).all())
+    questions_count = dict(db.session.query(
+        Question.quiz_id, func.count(Question.id)
+    ).filter(Question.quiz_id.in_({attempt.quiz_id for attempt in active_attempts})).group_by(Question.quiz_id).all())
     
     participants_data = []
     for attempt in active_attempts:
@@ -760,15 +1019,17 @@ def get_live_monitoring_data():
                 except:
                     violation_count = 0
         else:
-            # Fallback: Get violation count directly from database (for older records)
-            violations = ProctoringEvent.query.filter_by(attempt_id=attempt.id).all()
-            violation_count = len(violations)
-            latest_violation = violations[0].event_type if violations else None
+            # Fallback: Use violation stats aggregated from the database (for older records)
+            violation_count = fallback_counts.get(attempt.id, 0)
+            latest_violation = fallback_latest.get(attempt.id)
         
         # Calculate time remaining
         time_elapsed = datetime.utcnow() - attempt.started_at
         time_remaining = timedelta(minutes=attempt.quiz.time_limit) - time_elapsed
         
+        questions_answered = answers_count.get(attempt.id, 0)
+        total_questions = questions_count.get(attempt.quiz_id, 0)
+        
         participants_data.append({
             'attempt_id': attempt.id,
             'participant_name': attempt.participant.username,
@@ -777,9 +1038,9 @@ def get_live_monitoring_data():
             'time_remaining': str(time_remaining).split('.')[0] if time_remaining.total_seconds() > 0 else 'Overtime',
             'violation_count': violation_count,
             'latest_violation': latest_violation,
-            'questions_answered': len(attempt.answers),
-            'total_questions': len(attempt.quiz.questions),
-            'progress_percentage': round((len(attempt.answers) / len(attempt.quiz.questions)) * 100) if attempt.quiz.questions else 0
+            'questions_answered': questions_answered,
+            'total_questions': total_questions,
+            'progress_percentage': round((questions_answered / total_questions) * 100) if total_questions else 0
         })
     
     return jsonify({
@@ -792,14 +1053,21 @@ def get_live_monitoring_data():
 @login_required
 def participant_dashboard():
     """Participant dashboard"""
+    page = request.args.get('page', 1, type=int)
+    
     # Get available quizzes (you might want to implement invitation system)
-    available_quizzes = Quiz.query.filter_by(is_active=True).all()
+    quizzes_page = Quiz.query.filter_by(is_active=True).options(
+        selectinload(Quiz.questions)
+    ).order_by(Quiz.created_at.desc()).paginate(page=page, per_page=50, error_out=False)
     
-    # Get participant's quiz attempts
-    my_attempts = QuizAttempt.query.filter_by(participant_id=current_user.id).order_by(QuizAttempt.started_at.desc()).all()
+    # Get participant's quiz attempts (the full history feeds the dashboard stats)
+    my_attempts = QuizAttempt.query.filter_by(participant_id=current_user.id).options(
+        selectinload(QuizAttempt.proctoring_events)
+    ).order_by(QuizAttempt.started_at.desc()).all()
     
     return render_template('participant_dashboard.html', 
-                         available_quizzes=available_quizzes, 
+                         available_quizzes=quizzes_page.items, 
+                         quizzes_page=quizzes_page,
                          my_attempts=my_attempts,
                          greeting=get_time_greeting(),
                          greeting_icon=get_greeting_icon())
@@ -933,6 +1201,24 @@ def participant_violations():
     critical_count = sum(1 for attempt in attempts_with_violations if attempt.highest_risk_level == 'critical')
     high_count = sum(1 for attempt in attempts_with_violations if attempt.highest_risk_level == 'high')
     
+    # Fetch the 5 most recent events per attempt in one ranked query
+    recent_events = defaultdict(list)
+    attempt_ids = [attempt.id for attempt in attempts_with_violations]
+    if attempt_ids:
+        ranked_events = db.session.query(
+            ProctoringEvent.id.label('event_id'),
+            func.row_number().over(
+                partition_by=ProctoringEvent.attempt_id,
+                order_by=ProctoringEvent.timestamp.desc()
+            ).label('rn')
+        ).filter(ProctoringEvent.attempt_id.in_(attempt_ids)).subquery()
+        
+        events = ProctoringEvent.query.join(
+            ranked_events, ProctoringEvent.id == ranked_events.c.event_id
+        ).filter(ranked_events.c.rn <= 5).order_by(ProctoringEvent.timestamp.desc()).all()
+        for event in events:
+            recent_events[event.attempt_id].append(event)
+    
     # Create simplified violations_by_attempt structure using highest risk only
     violations_by_attempt = {}
     total_violations = 0
@@ -953,7 +1239,8 @@ def participant_violations():
             'highest_risk_level': attempt.highest_risk_level,
             'highest_risk_severity': attempt.highest_risk_severity,
             'violation_count': attempt_total,
-            'violation_counts': counts if 'counts' in locals() else {}
+            'violation_counts': counts if 'counts' in locals() else {},
+            'violations': recent_events[attempt.id]
         }
     
     return render_template('participant_violations.html', 
@@ -972,48 +1259,50 @@ def quiz_listing():
         flash('Access denied. Participants only.', 'error')
         return redirect(url_for('index'))
     
+    # The two lists page independently, so each has its own page parameter
+    quiz_page = request.args.get('quiz_page', 1, type=int)
+    attempt_page = request.args.get('attempt_page', 1, type=int)
+    
     # Get available quizzes for this participant
-    available_quizzes = Quiz.query.filter_by(is_active=True).all()
+    quizzes_page = Quiz.query.filter_by(is_active=True).options(
+        selectinload(Quiz.questions)
+    ).order_by(Quiz.created_at.desc()).paginate(page=quiz_page, per_page=50, error_out=False)
     
     # Get participant's quiz attempts
-    my_attempts = QuizAttempt.query.filter_by(participant_id=current_user.id).order_by(QuizAttempt.started_at.desc()).all()
+    attempts_page = QuizAttempt.query.filter_by(participant_id=current_user.id).options(
+        selectinload(QuizAttempt.quiz)
+    ).order_by(QuizAttempt.started_at.desc()).paginate(page=attempt_page, per_page=50, error_out=False)
     
     return render_template('quiz_listing.html', 
-                         available_quizzes=available_quizzes,
-                         my_attempts=my_attempts,
+                         available_quizzes=quizzes_page.items,
+                         my_attempts=attempts_page.items,
+                         quizzes_page=quizzes_page,
+                         attempts_page=attempts_page,
                          greeting=get_time_greeting(),
                          greeting_icon=get_greeting_icon())
 
 @app.route('/admin/dashboard')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_dashboard():
     """Admin dashboard"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
+    # Get system statistics (cached briefly; they change slowly)
+    def compute_stats():
+        return {
+            'total_users': User.query.count(),
+            'total_hosts': User.query.filter_by(role='host').count(),
+            'total_participants': User.query.filter_by(role='participant').count(),
+            'total_quizzes': Quiz.query.count(),
+            'total_attempts': QuizAttempt.query.count(),
+            'total_courses': Course.query.count(),
+            'total_violation_appeals': db.session.query(UserViolation).filter_by(is_flagged=True).count()
+        }
     
-    # Get system statistics
-    total_users = User.query.count()
-    total_hosts = User.query.filter_by(role='host').count()
-    total_participants = User.query.filter_by(role='participant').count()
-    total_quizzes = Quiz.query.count()
-    total_attempts = QuizAttempt.query.count()
-    total_courses = Course.query.count()
-    total_violation_appeals = db.session.query(UserViolation).filter_by(is_flagged=True).count()
+    stats = cached_stats(ADMIN_STATS_CACHE_KEY, compute_stats)
     
     # Recent registrations
     recent_users = User.query.order_by(User.created_at.desc()).limit(10).all()
     
-    stats = {
-        'total_users': total_users,
-        'total_hosts': total_hosts,
-        'total_participants': total_participants,
-        'total_quizzes': total_quizzes,
-        'total_attempts': total_attempts,
-        'total_courses': total_courses,
-        'total_violation_appeals': total_violation_appeals
-    }
-    
     return render_template('admin_dashboard.html', 
                          stats=stats, 
                          recent_users=recent_users,
@@ -1022,89 +1311,90 @@ def admin_dashboard():
 
 @app.route('/admin/export-database')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_export_database():
     """Export complete database to Excel with comprehensive error handling"""
-    if not current_user.is_admin():
-        flash('Access denied. Admin privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     try:
         from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, PatternFill
         from io import BytesIO
         
-        wb = Workbook()
+        # Write-only mode streams rows to the archive instead of keeping a cell object per value
+        wb = Workbook(write_only=True)
         
         # Users Sheet
-        ws_users = wb.active
-        ws_users.title = "Users"
+        ws_users = wb.create_sheet("Users")
         users_headers = ['ID', 'Username', 'Email', 'Role', 'Is Verified', 'Created At']
         
-        for col, header in enumerate(users_headers, 1):
-            cell = ws_users.cell(row=1, column=col, value=header)
+        header_row = []
+        for header in users_headers:
+            cell = WriteOnlyCell(ws_users, value=header)
             cell.font = Font(bold=True)
             cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+            header_row.append(cell)
+        ws_users.append(header_row)
         
         # Fetch users with error handling
         try:
-            users = User.query.all()
+            users = db.session.execute(
+                db.select(User.id, User.username, User.email, User.role, User.is_verified, User.created_at)
+                .order_by(User.id)
+                .execution_options(yield_per=1000)
+            )
+            
+            for user in users:
+                ws_users.append([
+                    user.id,
+                    user.username or 'N/A',
+                    user.email or 'N/A',
+                    user.role or 'N/A',
+                    'Yes' if user.is_verified else 'No',
+                    user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else 'N/A'
+                ])
         except Exception as e:
-            logging.error(f"Database error fetching users: {e}")
+            logging.error("Database error fetching users: %s", e)
             flash('Error accessing user data for export.', 'error')
             return redirect(url_for('admin_dashboard'))
         
-        for row, user in enumerate(users, 2):
-            try:
-                ws_users.cell(row=row, column=1, value=user.id)
-                ws_users.cell(row=row, column=2, value=user.username or 'N/A')
-                ws_users.cell(row=row, column=3, value=user.email or 'N/A')
-                ws_users.cell(row=row, column=4, value=user.role or 'N/A')
-                ws_users.cell(row=row, column=5, value='Yes' if user.is_verified else 'No')
-                ws_users.cell(row=row, column=6, value=user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else 'N/A')
-            except Exception as e:
-                logging.warning(f"Error exporting user {user.id}: {e}")
-                continue
-        
         # Save to BytesIO with error handling
         try:
             buffer = BytesIO()
             wb.save(buffer)
             buffer.seek(0)
         except Exception as e:
-            logging.error(f"Error creating Excel file: {e}")
+            logging.error("Error creating Excel file: %s", e)
             flash('Error generating export file.', 'error')
             return redirect(url_for('admin_dashboard'))
         
         return send_file(
-            BytesIO(buffer.read()),
+            buffer,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=f'database_export_{datetime.utcnow().strftime("%Y%m%d_%H%M%S")}.xlsx'
         )
         
     except Exception as e:
-        logging.error(f"Unexpected error in database export: {e}")
+        logging.error("Unexpected error in database export: %s", e)
         flash('Database export failed due to an unexpected error.', 'error')
         return redirect(url_for('admin_dashboard'))
 
 # File Upload and Auto-Question Generation System
 
-ALLOWED_EXTENSIONS = {'pdf', 'docx', 'csv', 'xlsx', 'txt'}
-UPLOAD_FOLDER = 'uploads'
-QUIZ_ANSWER_UPLOAD_FOLDER = 'uploads/quiz_answers'
-
-# Create upload directories if they don't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(QUIZ_ANSWER_UPLOAD_FOLDER, exist_ok=True)
+ALLOWED_EXTENSIONS = frozenset({'pdf', 'docx', 'csv', 'xlsx', 'txt'})
+# Upload directories are resolved and created at app startup (see app.py)
+UPLOAD_FOLDER = app.config['UPLOAD_FOLDER']
+QUIZ_ANSWER_UPLOAD_FOLDER = app.config['QUIZ_ANSWER_UPLOAD_FOLDER']
+PROFILE_UPLOAD_FOLDER = app.config['PROFILE_UPLOAD_FOLDER']
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return os.path.splitext(filename)[1][1:].lower() in ALLOWED_EXTENSIONS
 
 @app.route('/api/upload-quiz-file', methods=['POST'])
 @login_required
 def upload_quiz_file():
     """Upload file and extract candidate questions with enhanced security"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     if 'file' not in request.files:
@@ -1131,12 +1421,17 @@ def upload_quiz_file():
         return jsonify({'error': 'File is empty.'}), 400
     
     try:
-        # Secure filename and save
-        filename = secure_filename(file.filename or 'upload')
+        # Secure filename and reserve a unique path so concurrent uploads in the same second
+        # can't collide; the bytes are parsed in memory and written there afterwards
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(file_path)
+        fd, file_path = tempfile.mkstemp(
+            dir=UPLOAD_FOLDER,
+            prefix=f"{timestamp}_",
+            suffix=f"_{secure_filename(file.filename or 'upload')}"
+        )
+        os.close(fd)
+        filename = os.path.basename(file_path)
+        data = file.read()
         
         # Create upload record with proper validation
         try:
@@ -1145,39 +1440,74 @@ def upload_quiz_file():
                 filename=filename,
                 mime_type=file.content_type or 'application/octet-stream',
                 stored_path=file_path,
-                file_size=file_size,
                 parsed=False
             )
             db.session.add(upload_record)
             db.session.commit()
         except Exception as e:
-            logging.error(f"Database error creating upload record: {e}")
+            logging.error("Database error creating upload record: %s", e)
             return jsonify({'error': 'Failed to save upload record'}), 500
         
-        # Parse file and extract candidate questions
-        candidate_questions = parse_file_for_questions(file_path, file.content_type)
-        
-        # Store candidate questions as JSON
-        upload_record.candidate_questions_json = json.dumps(candidate_questions)
-        upload_record.parsed = True
-        db.session.commit()
+        # Parse file in the background; clients poll /api/upload-status/<id>
+        submit_task(_parse_upload, upload_record.id, data)
         
         return jsonify({
             'upload_record_id': upload_record.id,
-            'candidate_count': len(candidate_questions),
+            'status': 'parsing',
             'filename': filename,
-            'message': f'Successfully extracted {len(candidate_questions)} candidate questions'
-        })
+            'message': 'File uploaded, extracting candidate questions'
+        }), 202
         
     except Exception as e:
-        logging.error(f"File upload error: {e}")
+        logging.error("File upload error: %s", e)
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
 
+def _parse_upload(upload_record_id, data):
+    """Parse uploaded file bytes, store the candidate questions and keep a copy on disk"""
+    upload_record = UploadRecord.query.get(upload_record_id)
+    if not upload_record:
+        return
+    
+    # Parse file and extract candidate questions
+    candidate_questions = cached_parse_file_for_questions(BytesIO(data), upload_record.mime_type)
+    
+    # Store candidate questions as JSON
+    upload_record.candidate_questions_json = json.dumps(candidate_questions)
+    upload_record.parsed = True
+    db.session.commit()
+    
+    with open(upload_record.stored_path, 'wb') as f:
+        f.write(data)
+
+@app.route('/api/upload-status/<int:upload_record_id>')
+@login_required
+def upload_status(upload_record_id):
+    """Report whether an uploaded file has finished parsing"""
+    if not current_user.is_host() and not current_is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    upload_record = UploadRecord.query.get_or_404(upload_record_id)
+    
+    if upload_record.host_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if not upload_record.parsed:
+        return jsonify({'upload_record_id': upload_record.id, 'status': 'parsing', 'parsed': False})
+    
+    candidate_count = len(json.loads(upload_record.candidate_questions_json or '[]'))
+    return jsonify({
+        'upload_record_id': upload_record.id,
+        'status': 'parsed',
+        'parsed': True,
+        'candidate_count': candidate_count,
+        'message': f'Successfully extracted {candidate_count} candidate questions'
+    })
+
 @app.route('/api/upload-quiz-create-draft', methods=['POST'])
 @login_required
 def upload_quiz_create_draft():
     """Create draft quiz from uploaded file"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     data = request.json
@@ -1191,6 +1521,9 @@ def upload_quiz_create_draft():
     if upload_record.host_id != current_user.id:
         return jsonify({'error': 'Access denied'}), 403
     
+    if not upload_record.parsed:
+        return jsonify({'error': 'File is still being parsed'}), 409
+    
     try:
         # Load candidate questions
         candidate_questions = json.loads(upload_record.candidate_questions_json)
@@ -1210,28 +1543,34 @@ def upload_quiz_create_draft():
         db.session.add(quiz)
         db.session.flush()  # Get quiz ID
         
-        # Create questions and options
-        for i, q_data in enumerate(selected_questions):
-            question = Question(
+        # Create questions; a single flush batches the INSERTs and returns their IDs
+        questions = [
+            Question(
                 quiz_id=quiz.id,
                 question_text=q_data['question'],
                 question_type=q_data.get('type', 'multiple_choice'),
                 points=q_data.get('points', 1),
                 order=i + 1
             )
-            db.session.add(question)
-            db.session.flush()  # Get question ID
-            
-            # Add options for multiple choice questions
-            if question.question_type in ['multiple_choice', 'true_false']:
-                for j, option_text in enumerate(q_data.get('options', [])):
-                    option = QuestionOption(
-                        question_id=question.id,
-                        option_text=option_text,
-                        is_correct=j == q_data.get('correct_option_index', 0),
-                        order=j + 1
-                    )
-                    db.session.add(option)
+            for i, q_data in enumerate(selected_questions)
+        ]
+        db.session.add_all(questions)
+        db.session.flush()  # Get question IDs
+        
+        # Add options for multiple choice questions with one executemany INSERT
+        option_rows = [
+            {
+                'question_id': question.id,
+                'option_text': option_text,
+                'is_correct': j == q_data.get('correct_option_index', 0),
+                'order': j + 1
+            }
+            for question, q_data in zip(questions, selected_questions)
+            if question.question_type in ['multiple_choice', 'true_false']
+            for j, option_text in enumerate(q_data.get('options', []))
+        ]
+        if option_rows:
+            db.session.execute(db.insert(QuestionOption), option_rows)
         
         upload_record.parsed_to_quiz_id = quiz.id
         db.session.commit()
@@ -1242,378 +1581,499 @@ def upload_quiz_create_draft():
         })
         
     except Exception as e:
-        logging.error(f"Draft creation error: {e}")
+        logging.error("Draft creation error: %s", e)
         db.session.rollback()
         return jsonify({'error': f'Failed to create draft: {str(e)}'}), 500
 
-def parse_file_for_questions(file_path, mime_type):
-    """Parse uploaded file to extract candidate questions"""
+def open_upload_source(source):
+    """Open a file path for binary reading, or pass an in-memory file object through unclosed"""
+    if isinstance(source, str):
+        return open(source, 'rb')
+    source.seek(0)
+    return nullcontext(source)
+
+def detect_upload_encoding(source, sample_size=65536):
+    """Guess a text upload's encoding from its first bytes, or return None if it can't be told"""
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return None
+    
+    with open_upload_source(source) as file:
+        sample = file.read(sample_size)
+    
+    best = from_bytes(sample).best()
+    return best.encoding if best else None
+
+PARSE_CACHE_TIMEOUT = 86400  # Identical re-uploads within a day reuse the earlier parse
+
+def cached_parse_file_for_questions(source, mime_type):
+    """parse_file_for_questions, memoized on a SHA-256 digest of the file contents"""
+    digest = hashlib.sha256()
+    with open_upload_source(source) as file:
+        for chunk in iter(lambda: file.read(65536), b''):
+            digest.update(chunk)
+    if not isinstance(source, str):
+        source.seek(0)
+    
+    return cached_stats(
+        f'qparse:{mime_type}:{digest.hexdigest()}',
+        lambda: parse_file_for_questions(source, mime_type),
+        timeout=PARSE_CACHE_TIMEOUT,
+        # Parse errors come back as an empty list; don't let a transient failure stick for a day
+        cache_empty=False
+    )
+
+def parse_file_for_questions(source, mime_type):
+    """Parse uploaded file (a path or binary file object) to extract candidate questions"""
     candidate_questions = []
     
     try:
         if 'pdf' in mime_type:
-            candidate_questions = parse_pdf_questions(file_path)
+            candidate_questions = parse_pdf_questions(source)
         elif 'docx' in mime_type or 'document' in mime_type:
-            candidate_questions = parse_docx_questions(file_path)
+            candidate_questions = parse_docx_questions(source)
         elif 'csv' in mime_type:
-            candidate_questions = parse_csv_questions(file_path)
+            candidate_questions = parse_csv_questions(source)
         elif 'spreadsheet' in mime_type or 'excel' in mime_type:
-            candidate_questions = parse_excel_questions(file_path)
+            candidate_questions = parse_excel_questions(source)
         elif 'text' in mime_type:
-            candidate_questions = parse_text_questions(file_path)
+            candidate_questions = parse_text_questions(source)
         
     except Exception as e:
-        logging.error(f"File parsing error: {e}")
+        logging.error("File parsing error: %s", e)
         
     return candidate_questions
 
 def parse_pdf_questions(file_path):
-    """Extract questions from PDF file with enhanced error handling"""
+    """Extract questions from PDF file (a path or binary file object) with enhanced error handling"""
     questions = []
     
     try:
         # Validate file exists and is readable
-        if not os.path.exists(file_path):
-            logging.error(f"PDF file not found: {file_path}")
-            return questions
-            
-        if os.path.getsize(file_path) == 0:
-            logging.error(f"PDF file is empty: {file_path}")
-            return questions
+        if isinstance(file_path, str):
+            if not os.path.exists(file_path):
+                logging.error("PDF file not found: %s", file_path)
+                return questions
+                
+            if os.path.getsize(file_path) == 0:
+                logging.error("PDF file is empty: %s", file_path)
+                return questions
         
-        with open(file_path, 'rb') as file:
+        import PyPDF2
+        from pdf_extraction import iter_page_texts
+        
+        with open_upload_source(file_path) as file:
             try:
-                pdf_reader = PyPDF2.PdfReader(file)
+                # Extract over a rolling two-page window so memory stays per-page and reading
+                # stops once 20 questions are found; the window keeps page-spanning questions whole
+                window = deque(maxlen=2)
+                held_question = None
+                seen_questions = set()
+                page_count = 0
+                text_length = 0
                 
-                if len(pdf_reader.pages) == 0:
-                    logging.warning(f"PDF has no pages: {file_path}")
-                    return questions
+                def collect(window_questions):
+                    for question in window_questions:
+                        if question['question'] not in seen_questions:
+                            seen_questions.add(question['question'])
+                            questions.append(question)
                 
-                text = ""
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                    except Exception as e:
-                        logging.warning(f"Error extracting text from page {page_num}: {e}")
-                        continue
+                def release_held(window_questions):
+                    # The held question is emitted as parsed so far unless this window
+                    # parsed it again (i.e. it started on the window's first page)
+                    if held_question is not None and all(
+                        question['question'] != held_question['question'] for question in window_questions
+                    ):
+                        collect([held_question])
+                
+                # PyMuPDF when installed, else PyPDF2 with larger documents split across worker processes
+                with closing(iter_page_texts(file.read())) as page_texts:
+                    for page_text in page_texts:
+                        page_count += 1
+                        text_length += len(page_text.strip())
+                        window.append(page_text)
+                        
+                        if len(window) == 2:
+                            # The window's last question may continue on the next page, so it is
+                            # held back and emitted once the next window shows it is complete
+                            window_questions = extract_questions_from_text("\n".join(window))
+                            release_held(window_questions)
+                            held_question = window_questions[-1] if window_questions else None
+                            collect(window_questions[:-1])
+                            if len(questions) >= 20:
+                                break
+                    else:
+                        if page_count == 0:
+                            logging.warning("PDF has no pages: %s", file_path)
+                            return questions
                         
-                if len(text.strip()) < 10:
-                    logging.warning(f"PDF contains very little text: {file_path}")
-                    return questions
+                        if text_length < 10:
+                            logging.warning("PDF contains very little text: %s", file_path)
+                            return questions
+                        
+                        window_questions = extract_questions_from_text("\n".join(window))
+                        release_held(window_questions)
+                        collect(window_questions)
                 
-                # Parse text for questions with error handling
-                questions = extract_questions_from_text(text)
+                questions = questions[:20]
                 
             except PyPDF2.errors.PdfReadError as e:
-                logging.error(f"PDF read error: {e}")
+                logging.error("PDF read error: %s", e)
             except Exception as e:
-                logging.error(f"Unexpected PDF parsing error: {e}")
+                logging.error("Unexpected PDF parsing error: %s", e)
         
     except Exception as e:
-        logging.error(f"File access error for PDF {file_path}: {e}")
+        logging.error("File access error for PDF %s: %s", file_path, e)
     
     return questions
 
 def parse_docx_questions(file_path):
-    """Extract questions from DOCX file with enhanced error handling"""
+    """Extract questions from DOCX file (a path or binary file object) with enhanced error handling"""
     questions = []
     
     try:
         # Validate file exists and is readable
-        if not os.path.exists(file_path):
-            logging.error(f"DOCX file not found: {file_path}")
-            return questions
-            
-        if os.path.getsize(file_path) == 0:
-            logging.error(f"DOCX file is empty: {file_path}")
-            return questions
+        if isinstance(file_path, str):
+            if not os.path.exists(file_path):
+                logging.error("DOCX file not found: %s", file_path)
+                return questions
+                
+            if os.path.getsize(file_path) == 0:
+                logging.error("DOCX file is empty: %s", file_path)
+                return questions
+        
+        import docx
         
         try:
             doc = docx.Document(file_path)
-            text = ""
+            paragraphs = doc.paragraphs
             
-            if len(doc.paragraphs) == 0:
-                logging.warning(f"DOCX has no paragraphs: {file_path}")
+            if len(paragraphs) == 0:
+                logging.warning("DOCX has no paragraphs: %s", file_path)
                 return questions
             
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text += paragraph.text + "\n"
+            # Collect the pieces and join once; paragraph.text rebuilds the string on every access
+            parts = []
+            for paragraph in paragraphs:
+                paragraph_text = paragraph.text
+                if paragraph_text.strip():
+                    parts.append(paragraph_text)
             
             # Also extract text from tables if present
             for table in doc.tables:
                 for row in table.rows:
                     for cell in row.cells:
-                        if cell.text.strip():
-                            text += cell.text + "\n"
+                        cell_text = cell.text
+                        if cell_text.strip():
+                            parts.append(cell_text)
+            
+            text = "\n".join(parts)
                             
             if len(text.strip()) < 10:
-                logging.warning(f"DOCX contains very little text: {file_path}")
+                logging.warning("DOCX contains very little text: %s", file_path)
                 return questions
             
             # Parse text for questions with error handling
             questions = extract_questions_from_text(text)
             
         except docx.opc.exceptions.PackageNotFoundError as e:
-            logging.error(f"Invalid DOCX format: {e}")
+            logging.error("Invalid DOCX format: %s", e)
         except Exception as e:
-            logging.error(f"Unexpected DOCX parsing error: {e}")
+            logging.error("Unexpected DOCX parsing error: %s", e)
         
     except Exception as e:
-        logging.error(f"File access error for DOCX {file_path}: {e}")
+        logging.error("File access error for DOCX %s: %s", file_path, e)
+    
+    return questions
+
+def _dataframe_to_questions(df):
+    """
+    Build question dicts from a spreadsheet-style DataFrame (shared by the CSV and Excel parsers)
+
+    Expected columns: question, option_a, option_b, option_c, option_d, correct_answer.
+    Whole columns are processed at once rather than materializing a Series per row.
+    """
+    import numpy as np
+    
+    questions = []
+    
+    if df.empty or 'question' not in df.columns:
+        return questions
+    
+    option_cols = [col for col in df.columns if 'option' in str(col).lower()]
+    df = df[df['question'].notna()]
+    if not option_cols or df.empty:
+        return questions
+    
+    options = df[option_cols]
+    present = options.notna().to_numpy()
+    option_text = options.map(str)
+    
+    # Determine correct answer: first matching option, counted among the non-empty ones
+    correct_index = np.zeros(len(df), dtype=int)
+    if 'correct_answer' in df.columns:
+        correct_text = df['correct_answer'].map(str).str.strip().str.lower().to_numpy()
+        normalized = option_text.apply(lambda col: col.str.strip().str.lower()).to_numpy()
+        matches = (normalized == correct_text[:, None]) & present
+        position = present.cumsum(axis=1)[np.arange(len(df)), matches.argmax(axis=1)] - 1
+        correct_index = np.where(matches.any(axis=1), position, 0)
+    
+    question_text = df['question'].map(str)
+    keep = (question_text != '').to_numpy() & (present.sum(axis=1) >= 2)
+    for question, row, row_present, index in zip(question_text[keep], option_text.to_numpy()[keep].tolist(),
+                                                 present[keep].tolist(), correct_index[keep].tolist()):
+        questions.append({
+            'question': question,
+            'type': 'multiple_choice',
+            'options': [value for value, is_present in zip(row, row_present) if is_present],
+            'correct_option_index': index,
+            'confidence': 0.9  # High confidence for structured data
+        })
     
     return questions
 
 def parse_csv_questions(file_path):
-    """Extract questions from CSV file with robust error handling"""
+    """Extract questions from CSV file (a path or binary file object) with robust error handling"""
     questions = []
     
     try:
-        # Try different encodings and delimiters
-        for encoding in ['utf-8', 'latin-1', 'cp1252']:
+        import pandas as pd
+        
+        # Parse once with the detected encoding; the fixed list is only a fallback
+        # for files whose first 64KB don't represent the rest
+        encodings = ['utf-8', 'latin-1', 'cp1252']
+        detected = detect_upload_encoding(file_path)
+        if detected:
+            encodings.insert(0, detected)
+        
+        for encoding in encodings:
             try:
-                df = pd.read_csv(file_path, encoding=encoding)
+                if not isinstance(file_path, str):
+                    file_path.seek(0)
+                # Read every cell as text so numeric options keep their written form
+                df = pd.read_csv(file_path, encoding=encoding, engine='c', dtype=str)
                 break
             except UnicodeDecodeError:
                 continue
         else:
             # If all encodings fail, return empty
-            logging.error(f"Could not decode CSV file: {file_path}")
+            logging.error("Could not decode CSV file: %s", file_path)
             return questions
         
-        if df.empty:
-            return questions
-            
-        # Expected columns: question, option_a, option_b, option_c, option_d, correct_answer
-        for idx, row in df.iterrows():
-            if 'question' in df.columns and pd.notna(row.get('question')):
-                question_data = {
-                    'question': str(row.get('question', '')),
-                    'type': 'multiple_choice',
-                    'options': [],
-                    'correct_option_index': 0,
-                    'confidence': 0.9  # High confidence for structured data
-                }
-                
-                # Extract options
-                option_cols = [col for col in df.columns if col.startswith('option')]
-                for col in option_cols:
-                    if pd.notna(row[col]):
-                        question_data['options'].append(str(row[col]))
-                
-                # Determine correct answer
-                if 'correct_answer' in df.columns:
-                    correct_text = str(row['correct_answer']).strip()
-                    for i, option in enumerate(question_data['options']):
-                        if option.strip().lower() == correct_text.lower():
-                            question_data['correct_option_index'] = i
-                            break
-                
-                if question_data['question'] and len(question_data['options']) >= 2:
-                    questions.append(question_data)
+        questions = _dataframe_to_questions(df)
         
     except Exception as e:
-        logging.error(f"CSV parsing error: {e}")
+        logging.error("CSV parsing error: %s", e)
     
     return questions
 
 def parse_excel_questions(file_path):
-    """Extract questions from Excel file"""
+    """Extract questions from Excel file (a path or binary file object)"""
     questions = []
     
     try:
-        df = pd.read_excel(file_path)
+        import pandas as pd
         
-        # Similar to CSV parsing
-        for _, row in df.iterrows():
-            if 'question' in df.columns:
-                question_data = {
-                    'question': str(row.get('question', '')),
-                    'type': 'multiple_choice',
-                    'options': [],
-                    'correct_option_index': 0,
-                    'confidence': 0.9
-                }
-                
-                # Extract options
-                option_cols = [col for col in df.columns if 'option' in col.lower()]
-                for col in option_cols:
-                    if pd.notna(row[col]):
-                        question_data['options'].append(str(row[col]))
-                
-                # Determine correct answer
-                if 'correct_answer' in df.columns:
-                    correct_text = str(row['correct_answer']).strip()
-                    for i, option in enumerate(question_data['options']):
-                        if option.strip().lower() == correct_text.lower():
-                            question_data['correct_option_index'] = i
-                            break
-                
-                if question_data['question'] and len(question_data['options']) >= 2:
-                    questions.append(question_data)
+        df = pd.read_excel(file_path)
+        questions = _dataframe_to_questions(df)
         
     except Exception as e:
-        logging.error(f"Excel parsing error: {e}")
+        logging.error("Excel parsing error: %s", e)
     
     return questions
 
 def parse_text_questions(file_path):
-    """Extract questions from plain text file"""
+    """Extract questions from plain text file (a path or binary file object)"""
     questions = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            text = file.read()
+        with open_upload_source(file_path) as file:
+            text = file.read().decode('utf-8')
         
         questions = extract_questions_from_text(text)
         
     except Exception as e:
-        logging.error(f"Text parsing error: {e}")
+        logging.error("Text parsing error: %s", e)
     
     return questions
 
-def extract_questions_from_text(text):
-    """Extract questions from text using improved regex patterns"""
-    questions = []
-    
-    if not text or len(text.strip()) < 20:
-        return questions
-    
-    try:
-        # Split text into lines for better processing
-        lines = text.strip().split('\n')
-        current_question = None
-        current_options = []
-        correct_index = 0
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+_RE2_INLINE_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+
+def _compile(pattern, flags=0):
+    """
+    Compile a pattern with RE2 when it is installed and can express it, else with re
+
+    RE2 matches in linear time, so long flattened PDF/DOCX text can't trigger
+    catastrophic backtracking. It has no lookaround, so those patterns stay on re.
+    """
+    if re2 is not None and not any(op in pattern for op in ('(?=', '(?!', '(?<')):
+        inline = ''.join(letter for flag, letter in _RE2_INLINE_FLAGS if flags & flag)
+        try:
+            return re2.compile(f'(?{inline}){pattern}' if inline else pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern, flags)
+
+# Question extraction patterns, compiled once and reused for every line of every upload
+QUESTION_LINE_RE = _compile(r'^(\d+)\.?\s*(.+)')
+OPTION_LINE_RE = _compile(r'^[\*]?[A-Da-d]\)\s*')
+OPTION_BODY_RE = _compile(r'^[A-Da-d][\)\.]\s*(.+)')
+INLINE_OPTION_RE = _compile(r'[A-Da-d][\)\.]([^A-Da-d\)\.]*)(?=[A-Da-d][\)\.]|$)')
+# Fallback question formats in one alternation, so the text is scanned once
+FALLBACK_QUESTION_RE = _compile(
+    # Numbered questions with options (1. Question A) option B) option)
+    r'\d+\.?\s*(?P<numbered_question>.*?)\s*(?P<numbered_options>[A-Da-d][\)\.].*?)(?=\d+\.|$)'
+    # Questions with options on new lines
+    r'|Question\s*\d*:?\s*(?P<labelled_question>.*?)\s*(?P<labelled_options>[A-Da-d][\)\.].*?)(?=Question|\d+\.|$)',
+    re.MULTILINE | re.DOTALL
+)
+
+# Every extractable question has labelled options, so text without any label can be skipped
+OPTION_LABEL_MARKERS = tuple(f'{letter}{mark}' for letter in 'ABCDabcd' for mark in ').')
+
+def split_inline_options(options_text):
+    """Split 'A) first B) second' into its non-empty option texts"""
+    return [opt.strip() for opt in INLINE_OPTION_RE.findall(options_text) if opt.strip()]
+
+def iter_questions_from_text(text):
+    """Yield questions from text in document order, so callers can stop once they have enough"""
+    # Split text into lines for better processing
+    lines = text.strip().split('\n')
+    current_question = None
+    current_options = []
+    correct_index = 0
+    found_structured = False
+    
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        
+        # Skip empty lines
+        if not line:
+            i += 1
+            continue
+        
+        # Check for numbered question format (1. Question text)
+        question_match = QUESTION_LINE_RE.match(line)
+        if question_match:
+            # Save previous question if exists
+            if current_question and len(current_options) >= 2:
+                found_structured = True
+                yield {
+                    'question': current_question,
+                    'type': 'multiple_choice',
+                    'options': current_options,
+                    'correct_option_index': correct_index,
+                    'confidence': 0.9
+                }
             
-            # Skip empty lines
-            if not line:
-                i += 1
-                continue
+            # Start new question
+            current_question = question_match.group(2).strip()
+            current_options = []
+            correct_index = 0
             
-            # Check for numbered question format (1. Question text)
-            question_match = re.match(r'^(\d+)\.?\s*(.+)', line)
-            if question_match:
-                # Save previous question if exists
-                if current_question and len(current_options) >= 2:
-                    questions.append({
-                        'question': current_question,
-                        'type': 'multiple_choice',
-                        'options': current_options,
-                        'correct_option_index': correct_index,
-                        'confidence': 0.9
-                    })
+        # Check for option format (A) Option text, *A) Option text, or A) *Option text)
+        elif OPTION_LINE_RE.match(line):
+            # Handle asterisk before label: "*A) Option"  
+            leading_star = line.startswith('*')
+            tmp = line[1:].lstrip() if leading_star else line
+            
+            # Extract the option body (everything after "A) ")
+            option_match = OPTION_BODY_RE.match(tmp)
+            if option_match:
+                body = option_match.group(1)
                 
-                # Start new question
-                current_question = question_match.group(2).strip()
-                current_options = []
-                correct_index = 0
+                # Handle asterisk after label: "A) *Option"
+                post_star = body.lstrip().startswith('*')
+                if post_star:
+                    body = body.lstrip()[1:].lstrip()
                 
-            # Check for option format (A) Option text, *A) Option text, or A) *Option text)
-            elif re.match(r'^[\*]?[A-Da-d]\)\s*', line):
-                # Handle asterisk before label: "*A) Option"  
-                leading_star = line.startswith('*')
-                tmp = line[1:].lstrip() if leading_star else line
+                is_correct = leading_star or post_star
+                clean_option = body.strip()
                 
-                # Extract the option body (everything after "A) ")
-                option_match = re.match(r'^[A-Da-d][\)\.]\s*(.+)', tmp)
-                if option_match:
-                    body = option_match.group(1)
-                    
-                    # Handle asterisk after label: "A) *Option"
-                    post_star = body.lstrip().startswith('*')
-                    if post_star:
-                        body = body.lstrip()[1:].lstrip()
-                    
-                    is_correct = leading_star or post_star
-                    clean_option = body.strip()
-                    
-                    if is_correct:
-                        correct_index = len(current_options)
-                    
-                    current_options.append(clean_option)
-            
-            # Check for alternative question formats
-            elif line.startswith('Q:') or line.startswith('Question:'):
-                if current_question and len(current_options) >= 2:
-                    questions.append({
-                        'question': current_question,
-                        'type': 'multiple_choice',
-                        'options': current_options,
-                        'correct_option_index': correct_index,
-                        'confidence': 0.9
-                    })
+                if is_correct:
+                    correct_index = len(current_options)
                 
-                current_question = line.split(':', 1)[1].strip()
-                current_options = []
-                correct_index = 0
-            
-            i += 1
-        
-        # Add the last question if exists
-        if current_question and len(current_options) >= 2:
-            questions.append({
-                'question': current_question,
-                'type': 'multiple_choice',
-                'options': current_options,
-                'correct_option_index': correct_index,
-                'confidence': 0.9
-            })
-        
-        # If no questions found with structured approach, try regex fallback
-        if not questions:
-            # Clean and normalize text for regex patterns
-            text_normalized = re.sub(r'\s+', ' ', text.strip())
+                current_options.append(clean_option)
+        
+        # Check for alternative question formats
+        elif line.startswith('Q:') or line.startswith('Question:'):
+            if current_question and len(current_options) >= 2:
+                found_structured = True
+                yield {
+                    'question': current_question,
+                    'type': 'multiple_choice',
+                    'options': current_options,
+                    'correct_option_index': correct_index,
+                    'confidence': 0.9
+                }
             
-            # Enhanced patterns for different question formats
-            patterns = [
-                # Pattern 1: Numbered questions with options (1. Question A) option B) option)
-                r'(\d+\.?\s*)(.*?)\s*((?:[A-Da-d][\)\.].*?)(?=\d+\.|$))',
-                # Pattern 2: Questions with options on new lines
-                r'(Question\s*\d*:?\s*)(.*?)\s*((?:[A-Da-d][\)\.].*?)(?=Question|\d+\.|$))',
-            ]
+            current_question = line.split(':', 1)[1].strip()
+            current_options = []
+            correct_index = 0
+        
+        i += 1
+    
+    # Add the last question if exists
+    if current_question and len(current_options) >= 2:
+        found_structured = True
+        yield {
+            'question': current_question,
+            'type': 'multiple_choice',
+            'options': current_options,
+            'correct_option_index': correct_index,
+            'confidence': 0.9
+        }
+    
+    # If no questions found with structured approach, try regex fallback
+    if not found_structured:
+        # Clean and normalize text for regex patterns; str.split() collapses whitespace
+        # runs in C without going through the regex engine
+        text_normalized = ' '.join(text.split())
+        
+        # Extract questions, reading the groups of whichever format matched
+        for match in FALLBACK_QUESTION_RE.finditer(text_normalized):
+            if match.group('numbered_question') is not None:
+                question_text = match.group('numbered_question').strip()
+                options_text = match.group('numbered_options').strip()
+            else:
+                question_text = match.group('labelled_question').strip()
+                options_text = match.group('labelled_options').strip()
             
-            # Try each pattern to extract questions
-            for pattern in patterns:
-                matches = re.finditer(pattern, text_normalized, re.MULTILINE | re.DOTALL)
+            if len(question_text) > 10:
+                options = split_inline_options(options_text)
                 
-                for match in matches:
-                    try:
-                        if len(match.groups()) >= 2:
-                            question_text = match.group(-2).strip()
-                            options_text = match.group(-1).strip()
-                            
-                            if len(question_text) > 10:
-                                question_data = {
-                                    'question': question_text,
-                                    'type': 'multiple_choice',
-                                    'options': [],
-                                    'correct_option_index': 0,
-                                    'confidence': 0.7
-                                }
-                                
-                                # Extract individual options
-                                option_parts = re.findall(r'[A-Da-d][\)\.]([^A-Da-d\)\.]*)(?=[A-Da-d][\)\.]|$)', options_text)
-                                question_data['options'] = [opt.strip() for opt in option_parts if opt.strip()]
-                                
-                                if len(question_data['options']) >= 2:
-                                    questions.append(question_data)
-                                    
-                    except Exception as e:
-                        continue
-                        
-        return questions[:20]  # Limit to 20 questions max
+                if len(options) >= 2:
+                    yield {
+                        'question': question_text,
+                        'type': 'multiple_choice',
+                        'options': options,
+                        'correct_option_index': 0,
+                        'confidence': 0.7
+                    }
+
+def extract_questions_from_text(text):
+    """Extract questions from text using improved regex patterns"""
+    questions = []
+    
+    if not text or len(text.strip()) < 20:
+        return questions
+    
+    # Plain substring checks are far cheaper than running the line parser and regexes for nothing
+    if not any(marker in text for marker in OPTION_LABEL_MARKERS):
+        return questions
+    
+    try:
+        # Parsing stops as soon as the 20th question is found
+        return list(islice(iter_questions_from_text(text), 20))  # Limit to 20 questions max
         
     except Exception as e:
-        logging.error(f"Text extraction error: {e}")
+        logging.error("Text extraction error: %s", e)
         return []
 
+VECTORIZED_SCORING_THRESHOLD = 1000
+
 def select_top_questions(candidate_questions, num_questions):
     """Select top N questions based on confidence and completeness"""
     
@@ -1625,9 +2085,25 @@ def select_top_questions(candidate_questions, num_questions):
         
         return confidence + (option_count / 10) + (0.2 if has_answer else 0)
     
-    sorted_questions = sorted(candidate_questions, key=question_score, reverse=True)
+    # Large pools (e.g. big spreadsheet banks) are scored as whole arrays; a stable sort on the
+    # negated scores keeps the same upload-order tie breaking as the heap below
+    if len(candidate_questions) >= VECTORIZED_SCORING_THRESHOLD:
+        import numpy as np
+        
+        count = len(candidate_questions)
+        confidence = np.fromiter((q.get('confidence', 0.5) for q in candidate_questions), dtype=np.float64, count=count)
+        option_count = np.fromiter((len(q.get('options', [])) for q in candidate_questions), dtype=np.int64, count=count)
+        has_answer = np.fromiter((q.get('correct_option_index', -1) >= 0 for q in candidate_questions), dtype=bool, count=count)
+        
+        scores = confidence + option_count / 10 + np.where(has_answer, 0.2, 0.0)
+        top = np.argsort(-scores, kind='stable')[:max(num_questions, 0)]
+        return [candidate_questions[i] for i in top]
     
-    return sorted_questions[:num_questions]
+    # Score each candidate once, heapify in linear time and pop only the top num_questions;
+    # the index breaks ties in upload order so question dicts are never compared
+    scored = [(-question_score(q), i, q) for i, q in enumerate(candidate_questions)]
+    heapq.heapify(scored)
+    return [heapq.heappop(scored)[2] for _ in range(min(num_questions, len(scored)))]
 
 # Enhanced Security Measures and Advanced Features
 
@@ -1637,7 +2113,7 @@ def publish_quiz(quiz_id):
     """Publish a draft quiz after host review"""
     quiz = Quiz.query.get_or_404(quiz_id)
     
-    if quiz.creator_id != current_user.id and not current_user.is_admin():
+    if quiz.creator_id != current_user.id and not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     data = request.json
@@ -1663,12 +2139,12 @@ def delete_quiz(quiz_id):
     """Delete quiz (soft delete by default)"""
     quiz = Quiz.query.get_or_404(quiz_id)
     
-    if quiz.creator_id != current_user.id and not current_user.is_admin():
+    if quiz.creator_id != current_user.id and not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     hard_delete = request.args.get('hard', 'false').lower() == 'true'
     
-    if hard_delete and current_user.is_admin():
+    if hard_delete and current_is_admin():
         # Hard delete - remove completely
         # First remove related upload files
         if quiz.draft_from_upload_id:
@@ -1697,7 +2173,7 @@ def restore_quiz(quiz_id):
     """Restore a soft-deleted quiz"""
     quiz = Quiz.query.get_or_404(quiz_id)
     
-    if quiz.creator_id != current_user.id and not current_user.is_admin():
+    if quiz.creator_id != current_user.id and not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     quiz.is_deleted = False
@@ -1709,40 +2185,65 @@ def restore_quiz(quiz_id):
 @login_required
 def host_participants_advanced():
     """Enhanced participant management and login activity"""
-    if not current_user.is_host() and not current_user.is_admin():
+    is_admin = current_is_admin()
+    if not current_user.is_host() and not is_admin:
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
-    # Get participants who have taken host's quizzes
-    participants = db.session.query(User).join(QuizAttempt).join(Quiz).filter(
-        Quiz.creator_id == current_user.id if not current_user.is_admin() else True,
+    # Load the host's attempts once, with quiz and participant, and group them per participant
+    attempts_query = QuizAttempt.query.join(QuizAttempt.quiz).join(QuizAttempt.participant).filter(
         User.role == 'participant'
-    ).distinct().all()
+    ).options(contains_eager(QuizAttempt.quiz), contains_eager(QuizAttempt.participant))
+    if not is_admin:
+        attempts_query = attempts_query.filter(Quiz.creator_id == current_user.id)
+    
+    participants = {}
+    attempts_by_participant = defaultdict(list)
+    for attempt in attempts_query.order_by(QuizAttempt.id).all():
+        participants[attempt.participant_id] = attempt.participant
+        attempts_by_participant[attempt.participant_id].append(attempt)
+    
+    violation_counts = {}
+    latest_device_logs = {}
+    if participants:
+        if is_admin:
+            # Admins see every attempt, so the per-user rollup already has the totals
+            violation_counts = {
+                user_id: summary.total_events
+                for user_id, summary in violation_summaries(participants).items()
+            }
+        else:
+            # Violation totals on this host's quizzes in one grouped query
+            violation_counts = dict(db.session.query(
+                QuizAttempt.participant_id, func.count(ProctoringEvent.id)
+            ).join(ProctoringEvent, ProctoringEvent.attempt_id == QuizAttempt.id) \
+             .join(Quiz, QuizAttempt.quiz_id == Quiz.id) \
+             .filter(QuizAttempt.participant_id.in_(participants), Quiz.creator_id == current_user.id) \
+             .group_by(QuizAttempt.participant_id).all())
+        
+        # Latest device log per participant in one ranked query
+        ranked_logs = db.session.query(
+            DeviceLog.id.label('log_id'),
+            func.row_number().over(
+                partition_by=DeviceLog.user_id,
+                order_by=DeviceLog.logged_in_at.desc()
+            ).label('rn')
+        ).filter(DeviceLog.user_id.in_(participants)).subquery()
+        
+        latest_device_logs = {
+            log.user_id: log
+            for log in DeviceLog.query.join(ranked_logs, DeviceLog.id == ranked_logs.c.log_id).filter(ranked_logs.c.rn == 1)
+        }
     
     # Get detailed info for each participant
     participant_data = []
-    for participant in participants:
-        # Get latest device log
-        latest_device_log = DeviceLog.query.filter_by(user_id=participant.id).order_by(
-            DeviceLog.logged_in_at.desc()
-        ).first()
-        
-        # Get quiz attempts
-        attempts = QuizAttempt.query.join(Quiz).filter(
-            QuizAttempt.participant_id == participant.id,
-            Quiz.creator_id == current_user.id if not current_user.is_admin() else True
-        ).all()
-        
-        # Get violation count
-        violation_count = 0
-        for attempt in attempts:
-            violation_count += ProctoringEvent.query.filter_by(attempt_id=attempt.id).count()
-        
+    for participant_id, participant in participants.items():
+        latest_device_log = latest_device_logs.get(participant_id)
         participant_data.append({
             'user': participant,
             'latest_device': latest_device_log,
-            'attempts': attempts,
-            'violation_count': violation_count,
+            'attempts': attempts_by_participant[participant_id],
+            'violation_count': violation_counts.get(participant_id, 0),
             'status': 'online' if latest_device_log and 
                      (datetime.utcnow() - latest_device_log.logged_in_at).seconds < 300 else 'offline'
         })
@@ -1753,16 +2254,19 @@ def host_participants_advanced():
 @login_required
 def participant_security_report(participant_id):
     """Generate detailed security report for a participant"""
-    if not current_user.is_host() and not current_user.is_admin():
+    is_admin = current_is_admin()
+    if not current_user.is_host() and not is_admin:
         return jsonify({'error': 'Access denied'}), 403
     
     participant = User.query.get_or_404(participant_id)
     
     # Get all attempts by this participant for current host's quizzes
-    attempts = QuizAttempt.query.join(Quiz).filter(
-        QuizAttempt.participant_id == participant_id,
-        Quiz.creator_id == current_user.id if not current_user.is_admin() else True
-    ).all()
+    attempts_query = QuizAttempt.query.join(QuizAttempt.quiz).options(contains_eager(QuizAttempt.quiz)).filter(
+        QuizAttempt.participant_id == participant_id
+    )
+    if not is_admin:
+        attempts_query = attempts_query.filter(Quiz.creator_id == current_user.id)
+    attempts = attempts_query.order_by(QuizAttempt.id).all()
     
     # Compile security data
     security_data = {
@@ -1777,12 +2281,17 @@ def participant_security_report(participant_id):
         'suspicious_patterns': []
     }
     
-    # Get violations
-    for attempt in attempts:
-        violations = ProctoringEvent.query.filter_by(attempt_id=attempt.id).all()
+    # Get violations for all attempts in one query
+    attempts_by_id = {attempt.id: attempt for attempt in attempts}
+    violation_counts = defaultdict(int)
+    if attempts_by_id:
+        violations = ProctoringEvent.query.filter(
+            ProctoringEvent.attempt_id.in_(attempts_by_id)
+        ).order_by(ProctoringEvent.attempt_id, ProctoringEvent.id).all()
         for violation in violations:
+            violation_counts[violation.attempt_id] += 1
             security_data['violations'].append({
-                'quiz_title': attempt.quiz.title,
+                'quiz_title': attempts_by_id[violation.attempt_id].quiz.title,
                 'event_type': violation.event_type,
                 'severity': violation.severity,
                 'timestamp': violation.timestamp.isoformat(),
@@ -1813,12 +2322,12 @@ def participant_security_report(participant_id):
         security_data['suspicious_patterns'].append('Multiple devices/browsers detected')
     
     # Flagged attempts
-    flagged_attempts = [a for a in attempts if a.violation_count > 2]
+    flagged_attempts = [a for a in attempts if violation_counts[a.id] > 2]
     for attempt in flagged_attempts:
         security_data['flagged_attempts'].append({
             'quiz_title': attempt.quiz.title,
             'started_at': attempt.started_at.isoformat(),
-            'violation_count': attempt.violation_count,
+            'violation_count': violation_counts[attempt.id],
             'status': attempt.status
         })
     
@@ -1828,12 +2337,12 @@ def participant_security_report(participant_id):
 @login_required
 def send_warning_to_participant(attempt_id):
     """Send real-time warning to participant"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     attempt = QuizAttempt.query.get_or_404(attempt_id)
     
-    if attempt.quiz.creator_id != current_user.id and not current_user.is_admin():
+    if attempt.quiz.creator_id != current_user.id and not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     data = request.json
@@ -1891,6 +2400,9 @@ def auto_terminate_quiz(attempt_id):
     
     return jsonify({'success': True, 'message': 'Quiz terminated due to violations'})
 
+# Automation markers in user agents, matched in one pass instead of one substring scan per keyword
+SUSPICIOUS_USER_AGENT_RE = _compile(r'headless|phantom|selenium|webdriver|automation', re.IGNORECASE)
+
 @app.route('/api/device-log', methods=['POST'])
 @login_required
 def log_device_info():
@@ -1901,9 +2413,7 @@ def log_device_info():
     is_suspicious = False
     
     # Check for suspicious user agents
-    suspicious_keywords = ['headless', 'phantom', 'selenium', 'webdriver', 'automation']
-    user_agent = data.get('userAgent', '').lower()
-    if any(keyword in user_agent for keyword in suspicious_keywords):
+    if SUSPICIOUS_USER_AGENT_RE.search(data.get('userAgent') or ''):
         is_suspicious = True
     
     # Check for unusual screen resolutions
@@ -1939,12 +2449,9 @@ def log_device_info():
 # Database Export for Admin
 @app.route('/admin/export-database-sqlite')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def export_database_sqlite():
     """Export database as SQLite file for admin"""
-    if not current_user.is_admin():
-        flash('Access denied. Admin privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     try:
         import sqlite3
         import tempfile
@@ -1959,8 +2466,15 @@ def export_database_sqlite():
         sqlite_conn = sqlite3.connect(sqlite_path)
         sqlite_cursor = sqlite_conn.cursor()
         
+        # Rows are streamed from column-only queries and inserted with one executemany per
+        # table; sqlite3 keeps everything in a single transaction until the commit below
+        
         # Export users
-        users = User.query.all()
+        users = db.session.execute(
+            db.select(User.id, User.username, User.email, User.role, User.is_verified, User.created_at)
+            .order_by(User.id)
+            .execution_options(yield_per=1000)
+        )
         sqlite_cursor.execute('''
             CREATE TABLE users (
                 id INTEGER PRIMARY KEY,
@@ -1972,14 +2486,21 @@ def export_database_sqlite():
             )
         ''')
         
-        for user in users:
-            sqlite_cursor.execute('''
-                INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)
-            ''', (user.id, user.username, user.email, user.role, user.is_verified, 
-                  user.created_at.isoformat() if user.created_at else None))
+        sqlite_cursor.executemany('''
+            INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)
+        ''', ((user.id, user.username, user.email, user.role, user.is_verified,
+               user.created_at.isoformat() if user.created_at else None)
+              for user in users))
         
         # Export quizzes
-        quizzes = Quiz.query.filter_by(is_deleted=False).all()
+        quizzes = db.session.execute(
+            db.select(Quiz.id, Quiz.title, User.username, Quiz.time_limit,
+                      Quiz.proctoring_enabled, Quiz.created_at)
+            .join(User, Quiz.creator_id == User.id)
+            .filter(Quiz.is_deleted == False)
+            .order_by(Quiz.id)
+            .execution_options(yield_per=1000)
+        )
         sqlite_cursor.execute('''
             CREATE TABLE quizzes (
                 id INTEGER PRIMARY KEY,
@@ -1991,14 +2512,28 @@ def export_database_sqlite():
             )
         ''')
         
-        for quiz in quizzes:
-            sqlite_cursor.execute('''
-                INSERT INTO quizzes VALUES (?, ?, ?, ?, ?, ?)
-            ''', (quiz.id, quiz.title, quiz.creator.username, quiz.time_limit, 
-                  quiz.proctoring_enabled, quiz.created_at.isoformat()))
+        sqlite_cursor.executemany('''
+            INSERT INTO quizzes VALUES (?, ?, ?, ?, ?, ?)
+        ''', ((quiz.id, quiz.title, quiz.username, quiz.time_limit, quiz.proctoring_enabled,
+               quiz.created_at.isoformat() if quiz.created_at else None)
+              for quiz in quizzes))
         
         # Export quiz attempts
-        attempts = QuizAttempt.query.all()
+        # Violation count per attempt is the number of proctoring events it recorded
+        violation_counts = db.select(
+            ProctoringEvent.attempt_id,
+            func.count(ProctoringEvent.id).label('violation_count')
+        ).group_by(ProctoringEvent.attempt_id).subquery()
+        attempts = db.session.execute(
+            db.select(QuizAttempt.id, User.username, Quiz.title, QuizAttempt.score, QuizAttempt.status,
+                      QuizAttempt.started_at, QuizAttempt.completed_at,
+                      func.coalesce(violation_counts.c.violation_count, 0).label('violation_count'))
+            .join(User, QuizAttempt.participant_id == User.id)
+            .join(Quiz, QuizAttempt.quiz_id == Quiz.id)
+            .outerjoin(violation_counts, violation_counts.c.attempt_id == QuizAttempt.id)
+            .order_by(QuizAttempt.id)
+            .execution_options(yield_per=1000)
+        )
         sqlite_cursor.execute('''
             CREATE TABLE quiz_attempts (
                 id INTEGER PRIMARY KEY,
@@ -2012,13 +2547,13 @@ def export_database_sqlite():
             )
         ''')
         
-        for attempt in attempts:
-            sqlite_cursor.execute('''
-                INSERT INTO quiz_attempts VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (attempt.id, attempt.participant.username, attempt.quiz.title,
-                  attempt.score, attempt.status, attempt.started_at.isoformat(),
-                  attempt.completed_at.isoformat() if attempt.completed_at else None,
-                  attempt.violation_count))
+        sqlite_cursor.executemany('''
+            INSERT INTO quiz_attempts VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', ((attempt.id, attempt.username, attempt.title, attempt.score, attempt.status,
+               attempt.started_at.isoformat() if attempt.started_at else None,
+               attempt.completed_at.isoformat() if attempt.completed_at else None,
+               attempt.violation_count)
+              for attempt in attempts))
         
         sqlite_conn.commit()
         sqlite_conn.close()
@@ -2038,24 +2573,18 @@ def export_database_sqlite():
 
 @app.route('/admin/users')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_users():
     """Manage all users"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     users = User.query.order_by(User.created_at.desc()).all()
     courses = Course.query.filter_by(is_active=True).order_by(Course.code).all()
     return render_template('admin_users.html', users=users, courses=courses)
 
 @app.route('/admin/user/<int:user_id>/toggle-status', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_toggle_user_status(user_id):
     """Toggle user active/inactive status"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     user = User.query.get_or_404(user_id)
     
     # Don't allow disabling yourself
@@ -2072,12 +2601,9 @@ def admin_toggle_user_status(user_id):
 
 @app.route('/admin/user/<int:user_id>/change-role', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_change_user_role(user_id):
     """Change user role"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     user = User.query.get_or_404(user_id)
     new_role = request.form.get('role')
     
@@ -2097,14 +2623,41 @@ def admin_change_user_role(user_id):
     flash(f'User {user.username} role changed from {old_role} to {new_role}.', 'success')
     return redirect(url_for('admin_users'))
 
+def delete_with_dependents(model, row_id):
+    """
+    Delete one row together with everything under it
+
+    Normally a single DELETE that the ON DELETE rules in models.py cascade. Databases whose
+    constraints predate those rules (SQLite files created earlier, Postgres before
+    database_migration.py has run) reject it, so the rules are then applied statement by statement.
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.delete(model).where(model.id == row_id))
+    except IntegrityError as e:
+        logging.warning("Foreign keys on %s lack ON DELETE rules, deleting dependents explicitly: %s",
+                        model.__tablename__, e.orig)
+        _delete_rows_explicitly(model.__table__, [row_id])
+
+def _delete_rows_explicitly(table, ids):
+    """Apply the declared ON DELETE CASCADE / SET NULL rules to the rows' dependents, then delete the rows"""
+    for child in db.metadata.tables.values():
+        for fk in child.foreign_keys:
+            if fk.column.table is not table:
+                continue
+            if fk.ondelete == 'CASCADE':
+                child_ids = db.session.scalars(db.select(child.c.id).where(fk.parent.in_(ids))).all()
+                if child_ids:
+                    _delete_rows_explicitly(child, child_ids)
+            elif fk.ondelete == 'SET NULL':
+                db.session.execute(child.update().where(fk.parent.in_(ids)).values({fk.parent.name: None}))
+    db.session.execute(table.delete().where(table.c.id.in_(ids)))
+
 @app.route('/admin/user/<int:user_id>/delete', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_delete_user(user_id):
     """Delete a user (admin only)"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     user = User.query.get_or_404(user_id)
     
     # Don't allow deleting yourself
@@ -2113,41 +2666,14 @@ def admin_delete_user(user_id):
         return redirect(url_for('admin_users'))
     
     try:
-        # Delete related data in proper order
-        # 1. Delete answers and proctoring events for this user's attempts
-        user_attempts = QuizAttempt.query.filter_by(participant_id=user.id).all()
-        for attempt in user_attempts:
-            Answer.query.filter_by(attempt_id=attempt.id).delete()
-            ProctoringEvent.query.filter_by(attempt_id=attempt.id).delete()
-        
-        # 2. Delete quiz attempts
-        QuizAttempt.query.filter_by(participant_id=user.id).delete()
-        
-        # 3. Handle quizzes created by this user
-        user_quizzes = Quiz.query.filter_by(creator_id=user.id).all()
-        for quiz in user_quizzes:
-            # Delete all attempts for these quizzes first
-            quiz_attempts = QuizAttempt.query.filter_by(quiz_id=quiz.id).all()
-            for attempt in quiz_attempts:
-                Answer.query.filter_by(attempt_id=attempt.id).delete()
-                ProctoringEvent.query.filter_by(attempt_id=attempt.id).delete()
-            QuizAttempt.query.filter_by(quiz_id=quiz.id).delete()
-            
-            # Delete questions and options
-            for question in quiz.questions:
-                QuestionOption.query.filter_by(question_id=question.id).delete()
-            Question.query.filter_by(quiz_id=quiz.id).delete()
-            
-            # Delete the quiz
-            db.session.delete(quiz)
-        
-        # 4. Delete course enrollments and assignments
+        # Delete course enrollments and assignments
         ParticipantEnrollment.query.filter_by(participant_id=user.id).delete()
         HostCourseAssignment.query.filter_by(host_id=user.id).delete()
         
-        # 5. Finally delete the user
+        # Finally delete the user; their attempts, their quizzes and everything under both
+        # follow through the ON DELETE rules declared in models.py
         username = user.username
-        db.session.delete(user)
+        delete_with_dependents(User, user.id)
         db.session.commit()
         
         flash(f'User {username} has been permanently deleted.', 'success')
@@ -2159,12 +2685,9 @@ def admin_delete_user(user_id):
 
 @app.route('/admin/user/<int:user_id>/reset-password', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_reset_password(user_id):
     """Reset user password"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     user = User.query.get_or_404(user_id)
     new_password = request.form.get('new_password')
     
@@ -2180,12 +2703,9 @@ def admin_reset_password(user_id):
 
 @app.route('/admin/bulk-delete-users', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_bulk_delete_users():
     """Bulk delete multiple users"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     user_ids = request.form.getlist('user_ids')
     
     if not user_ids:
@@ -2304,12 +2824,9 @@ def admin_bulk_delete_users():
 
 @app.route('/admin/quiz-attempts')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_quiz_attempts():
     """Admin page to view all quiz attempts"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     page = request.args.get('page', 1, type=int)
     quiz_id = request.args.get('quiz_id', type=int)
     status = request.args.get('status', 'all')
@@ -2342,12 +2859,9 @@ def admin_quiz_attempts():
 
 @app.route('/admin/hosts')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_hosts():
     """Admin page to view all host accounts"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     page = request.args.get('page', 1, type=int)
     status = request.args.get('status', 'all')
     search = request.args.get('search', '').strip()
@@ -2388,12 +2902,9 @@ def admin_hosts():
 # Alert Threshold Management Routes
 @app.route('/admin/alert-thresholds')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_alert_thresholds():
     """Admin page to manage alert thresholds"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '').strip()
     event_type = request.args.get('event_type', 'all')
@@ -2425,12 +2936,9 @@ def admin_alert_thresholds():
 
 @app.route('/admin/alert-threshold/create', methods=['GET', 'POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_create_alert_threshold():
     """Create new alert threshold"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     if request.method == 'POST':
         name = request.form.get('name')
         event_type = request.form.get('event_type')
@@ -2507,12 +3015,9 @@ def admin_create_alert_threshold():
 
 @app.route('/admin/alert-threshold/<int:threshold_id>/edit', methods=['GET', 'POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_edit_alert_threshold(threshold_id):
     """Edit alert threshold"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     threshold = AlertThreshold.query.get_or_404(threshold_id)
     
     if request.method == 'POST':
@@ -2556,12 +3061,9 @@ def admin_edit_alert_threshold(threshold_id):
 
 @app.route('/admin/alert-threshold/<int:threshold_id>/delete', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_delete_alert_threshold(threshold_id):
     """Delete alert threshold"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     threshold = AlertThreshold.query.get_or_404(threshold_id)
     
     try:
@@ -2580,12 +3082,9 @@ def admin_delete_alert_threshold(threshold_id):
 
 @app.route('/admin/create-user', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_create_user():
     """Create new user account"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     username = request.form.get('username')
     email = request.form.get('email')
     password = request.form.get('password')
@@ -2596,11 +3095,16 @@ def admin_create_user():
         flash('All fields are required.', 'error')
         return redirect(url_for('admin_users'))
     
-    if User.query.filter_by(email=email).first():
+    # Both uniqueness checks in one lookup of just the two columns
+    existing = db.session.query(User.email, User.username).filter(
+        or_(User.email == email, User.username == username)
+    ).all()
+    
+    if any(row.email == email for row in existing):
         flash('Email already exists.', 'error')
         return redirect(url_for('admin_users'))
     
-    if User.query.filter_by(username=username).first():
+    if any(row.username == username for row in existing):
         flash('Username already exists.', 'error')
         return redirect(url_for('admin_users'))
     
@@ -2618,18 +3122,16 @@ def admin_create_user():
     
     db.session.add(user)
     db.session.commit()
+    invalidate_stats(ADMIN_STATS_CACHE_KEY)
     
     flash(f'User {username} created successfully with role {role}.', 'success')
     return redirect(url_for('admin_users'))
 
 @app.route('/admin/bulk-create-users', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_bulk_create_users():
     """Create multiple users at once"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     users_data = request.form.get('users_data', '').strip()
     default_role = request.form.get('default_role', 'participant')
     default_course = request.form.get('default_course', '').strip()
@@ -2784,12 +3286,9 @@ def admin_bulk_create_users():
 
 @app.route('/admin/upload-users-excel', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_upload_users_excel():
     """Upload users from Excel file"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     if 'excel_file' not in request.files:
         flash('No file selected.', 'error')
         return redirect(url_for('admin_users'))
@@ -2817,12 +3316,20 @@ def admin_upload_users_excel():
         created_count = 0
         errors = []
         
-        for index, row in df.iterrows():
+        # Plain tuples per row; iterrows would build a Series for each one
+        columns = list(df.columns)
+        username_col = columns.index('username')
+        email_col = columns.index('email')
+        password_col = columns.index('password') if 'password' in columns else None
+        role_col = columns.index('role') if 'role' in columns else None
+        
+        for index, row in enumerate(df.itertuples(index=False, name=None)):
             try:
-                username = str(row['username']).strip()
-                email = str(row['email']).strip()
-                password = str(row.get('password', f'BigBoss{__import__("random").randrange(1000, 9999)}')).strip()
-                role = str(row.get('role', 'participant')).strip().lower()
+                username = str(row[username_col]).strip()
+                email = str(row[email_col]).strip()
+                password = str(row[password_col] if password_col is not None
+                               else f'BigBoss{__import__("random").randrange(1000, 9999)}').strip()
+                role = str(row[role_col] if role_col is not None else 'participant').strip().lower()
                 
                 # Validation
                 if not username or not email or username == 'nan' or email == 'nan':
@@ -2870,12 +3377,12 @@ def admin_upload_users_excel():
 @login_required
 def host_participants():
     """Course-based participant management for hosts"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
     # Get courses assigned to this host (or all courses if admin)
-    if current_user.is_admin():
+    if current_is_admin():
         assigned_courses = Course.query.filter_by(is_active=True).all()
     else:
         # Get courses where this user is assigned as host
@@ -2884,7 +3391,6 @@ def host_participants():
     
     # Get participants enrolled in these courses
     course_participants = {}
-    all_attempts = []
     
     for course in assigned_courses:
         # Get participants enrolled in this course
@@ -2892,60 +3398,77 @@ def host_participants():
         participants = [enrollment.participant for enrollment in enrollments]
         
         # Get quizzes for this course created by the current host (or all if admin)
-        if current_user.is_admin():
+        if current_is_admin():
             course_quizzes = Quiz.query.filter_by(course_id=course.id, is_active=True).all()
         else:
             course_quizzes = Quiz.query.filter_by(course_id=course.id, creator_id=current_user.id, is_active=True).all()
         
-        # Get attempts for these quizzes
+        # Attempt and violation totals per participant, aggregated in the database
         quiz_ids = [quiz.id for quiz in course_quizzes]
+        attempt_totals = {}
+        violation_counts = {}
         if quiz_ids:
-            course_attempts = QuizAttempt.query.filter(QuizAttempt.quiz_id.in_(quiz_ids)).order_by(QuizAttempt.started_at.desc()).all()
-            all_attempts.extend(course_attempts)
-        else:
-            course_attempts = []
+            attempt_totals = {
+                row.participant_id: row
+                for row in db.session.query(
+                    QuizAttempt.participant_id,
+                    func.count(QuizAttempt.id).label('total_attempts'),
+                    func.sum(case((QuizAttempt.status == 'completed', 1), else_=0)).label('completed_attempts'),
+                    # Completed attempts without a score count as zero
+                    func.avg(case((QuizAttempt.status == 'completed', func.coalesce(QuizAttempt.score, 0)))).label('avg_score')
+                ).filter(QuizAttempt.quiz_id.in_(quiz_ids)).group_by(QuizAttempt.participant_id)
+            }
+            violation_counts = dict(db.session.query(
+                QuizAttempt.participant_id, func.count(ProctoringEvent.id)
+            ).join(ProctoringEvent, ProctoringEvent.attempt_id == QuizAttempt.id)
+             .filter(QuizAttempt.quiz_id.in_(quiz_ids))
+             .group_by(QuizAttempt.participant_id).all())
+        
+        # Most recent login per participant in one ranked query
+        recent_logins = {}
+        if participants:
+            ranked_logins = db.session.query(
+                LoginEvent.id.label('login_id'),
+                func.row_number().over(
+                    partition_by=LoginEvent.user_id,
+                    order_by=LoginEvent.login_time.desc()
+                ).label('rn')
+            ).filter(LoginEvent.user_id.in_([participant.id for participant in participants])).subquery()
+            
+            recent_logins = {
+                login.user_id: login
+                for login in LoginEvent.query.join(ranked_logins, LoginEvent.id == ranked_logins.c.login_id).filter(ranked_logins.c.rn == 1)
+            }
         
         # Calculate participant statistics for this course
         participant_stats = {}
         for participant in participants:
-            participant_attempts = [attempt for attempt in course_attempts if attempt.participant_id == participant.id]
-            completed_attempts = [attempt for attempt in participant_attempts if attempt.status == 'completed']
-            avg_score = sum([attempt.score for attempt in completed_attempts if attempt.score]) / len(completed_attempts) if completed_attempts else 0
-            
-            # Get violation count
-            violation_count = 0
-            for attempt in participant_attempts:
-                violation_count += ProctoringEvent.query.filter_by(attempt_id=attempt.id).count()
-            
-            # Get recent login
-            recent_login = LoginEvent.query.filter_by(user_id=participant.id).order_by(LoginEvent.login_time.desc()).first()
+            totals = attempt_totals.get(participant.id)
             
             participant_stats[participant.id] = {
-                'total_attempts': len(participant_attempts),
-                'completed_attempts': len(completed_attempts),
-                'avg_score': avg_score,
-                'violation_count': violation_count,
-                'recent_login': recent_login,
+                'total_attempts': totals.total_attempts if totals else 0,
+                'completed_attempts': totals.completed_attempts if totals else 0,
+                'avg_score': float(totals.avg_score) if totals and totals.avg_score is not None else 0,
+                'violation_count': violation_counts.get(participant.id, 0),
+                'recent_login': recent_logins.get(participant.id),
                 'is_flagged': False  # Will be tracked via UserViolation model
             }
         
         course_participants[course] = {
             'participants': participants,
             'quizzes': course_quizzes,
-            'attempts': course_attempts,
             'stats': participant_stats
         }
     
     return render_template('host_participants.html', 
                          course_participants=course_participants,
-                         assigned_courses=assigned_courses,
-                         attempts=all_attempts)
+                         assigned_courses=assigned_courses)
 
 @app.route('/host/participant/<int:participant_id>/manage', methods=['GET', 'POST'])
 @login_required
 def manage_participant(participant_id):
     """Manage individual participant - credentials, performance, flags"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -2975,17 +3498,9 @@ def manage_participant(participant_id):
             
         elif action == 'flag_user':
             # Flag user for violations
-            violation_record = UserViolation.query.filter_by(user_id=participant_id).first()
-            if not violation_record:
-                violation_record = UserViolation(user_id=participant_id)
-                db.session.add(violation_record)
-            
-            violation_record.is_flagged = True
-            violation_record.flagged_at = datetime.utcnow()
-            violation_record.flagged_by = current_user.id
-            violation_record.notes = request.form.get('notes', '')
-            
+            flag_user_violation(participant_id, flagged_by=current_user.id, notes=request.form.get('notes', ''))
             db.session.commit()
+            invalidate_stats(user_flag_cache_key(participant_id))
             flash('Participant flagged for violations.', 'warning')
             
         elif action == 'unflag_user':
@@ -2995,6 +3510,7 @@ def manage_participant(participant_id):
                 violation_record.is_flagged = False
                 violation_record.notes = request.form.get('notes', '')
                 db.session.commit()
+                invalidate_stats(user_flag_cache_key(participant_id))
             flash('Participant flag removed.', 'success')
             
         return redirect(url_for('manage_participant', participant_id=participant_id))
@@ -3020,18 +3536,21 @@ def manage_participant(participant_id):
 @login_required
 def view_participant_violations(participant_id):
     """View detailed violation history for a participant"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
     participant = User.query.get_or_404(participant_id)
-    attempts = QuizAttempt.query.filter_by(participant_id=participant_id).all()
+    # Quizzes and proctoring events load with the attempts instead of once per attempt
+    attempts = QuizAttempt.query.options(
+        joinedload(QuizAttempt.quiz),
+        selectinload(QuizAttempt.proctoring_events)
+    ).filter_by(participant_id=participant_id).all()
     
     # Get all violations for this participant
     violations = []
     for attempt in attempts:
-        attempt_violations = ProctoringEvent.query.filter_by(attempt_id=attempt.id).order_by(ProctoringEvent.timestamp.desc()).all()
-        for violation in attempt_violations:
+        for violation in attempt.proctoring_events:
             violations.append({
                 'violation': violation,
                 'attempt': attempt,
@@ -3048,7 +3567,7 @@ def view_participant_violations(participant_id):
 @login_required
 def host_login_activity():
     """View login activity of all participants"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -3066,7 +3585,7 @@ def host_login_activity():
 @login_required
 def host_live_monitoring():
     """Live violation monitoring dashboard for hosts"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -3094,12 +3613,9 @@ def host_live_monitoring():
 
 @app.route('/admin/manage-flags')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_manage_flags():
     """Admin interface to manage user flags and retake permissions"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Get all flagged users - specify which foreign key to use for join
     flagged_users = db.session.query(UserViolation, User).join(
         User, UserViolation.user_id == User.id
@@ -3120,22 +3636,22 @@ def admin_manage_flags():
     
     return render_template('admin_manage_flags.html', 
                          flagged_users=flagged_users,
-                         recent_violations=recent_violations)
+                         recent_violations=recent_violations,
+                         violation_summaries=violation_summaries({user.id for _, user in flagged_users}))
 
 @app.route('/admin/unflag-user/<int:user_id>', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_unflag_user(user_id):
     """Admin action to unflag a user and grant retake permissions"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     violation_record = UserViolation.query.filter_by(user_id=user_id).first()
     if not violation_record:
         flash('User violation record not found.', 'error')
         return redirect(url_for('admin_manage_flags'))
     
-    user = User.query.get_or_404(user_id)
+    username = db.session.query(User.username).filter_by(id=user_id).scalar()
+    if username is None:
+        abort(404)
     
     # Remove flag
     violation_record.is_flagged = False
@@ -3144,34 +3660,31 @@ def admin_unflag_user(user_id):
     violation_record.notes = request.form.get('notes', '')
     
     db.session.commit()
+    invalidate_stats(user_flag_cache_key(user_id))
     
-    flash(f'User {user.username} has been unflagged and granted retake permissions.', 'success')
+    flash(f'User {username} has been unflagged and granted retake permissions.', 'success')
     return redirect(url_for('admin_manage_flags'))
 
 @app.route('/admin/flag-user/<int:user_id>', methods=['POST'])
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_flag_user(user_id):
     """Admin action to manually flag a user"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
-    user = User.query.get_or_404(user_id)
-    
-    violation_record = UserViolation.query.filter_by(user_id=user_id).first()
-    if not violation_record:
-        violation_record = UserViolation(user_id=user_id)
-        db.session.add(violation_record)
-    
-    violation_record.is_flagged = True
-    violation_record.flagged_at = datetime.utcnow()
-    violation_record.flagged_by = current_user.id
-    violation_record.notes = request.form.get('notes', 'Manually flagged by administrator')
-    violation_record.violation_count = (violation_record.violation_count or 0) + 1
-    
+    # Only the name is needed, for the flash message
+    username = db.session.query(User.username).filter_by(id=user_id).scalar()
+    if username is None:
+        abort(404)
+    
+    flag_user_violation(
+        user_id,
+        flagged_by=current_user.id,
+        notes=request.form.get('notes', 'Manually flagged by administrator'),
+        count_violation=True
+    )
     db.session.commit()
+    invalidate_stats(user_flag_cache_key(user_id))
     
-    flash(f'User {user.username} has been flagged for violations.', 'warning')
+    flash(f'User {username} has been flagged for violations.', 'warning')
     return redirect(url_for('admin_manage_flags'))
 
 @app.route('/api/violations/<int:attempt_id>')
@@ -3181,7 +3694,7 @@ def get_violations(attempt_id):
     attempt = QuizAttempt.query.get_or_404(attempt_id)
     
     # Check permissions
-    if not (current_user.is_admin() or 
+    if not (current_is_admin() or 
             (current_user.is_host() and attempt.quiz.creator_id == current_user.id)):
         return jsonify({'error': 'Access denied'}), 403
     
@@ -3209,12 +3722,29 @@ def log_proctoring_event():
         if not attempt_id:
             return jsonify({'error': 'Attempt ID required'}), 400
         
-        attempt = QuizAttempt.query.get_or_404(attempt_id)
+        # Enhanced violation tracking and termination logic: bump the attempt's counters and
+        # read back the new totals and risk summary in one statement. Ownership is part of
+        # the WHERE clause, so the attempt is never loaded.
+        attempt = db.session.execute(
+            db.update(QuizAttempt).where(
+                QuizAttempt.id == attempt_id,
+                QuizAttempt.participant_id == current_user.id
+            ).values(
+                violation_count=func.coalesce(QuizAttempt.violation_count, 0) + 1,
+                high_severity_count=func.coalesce(QuizAttempt.high_severity_count, 0) + (1 if data.get('severity') == 'high' else 0)
+            ).returning(
+                QuizAttempt.violation_count, QuizAttempt.high_severity_count, QuizAttempt.highest_risk_level,
+                QuizAttempt.highest_risk_severity, QuizAttempt.violation_counts_json
+            )
+        ).first()
         
-        # Verify user owns this attempt
-        if attempt.participant_id != current_user.id:
+        if attempt is None:
+            if db.session.query(QuizAttempt.id).filter_by(id=attempt_id).first() is None:
+                return jsonify({'error': 'Attempt not found'}), 404
             return jsonify({'error': 'Access denied'}), 403
         
+        violation_count, high_severity_count = attempt.violation_count, attempt.high_severity_count
+        
         # Create proctoring event
         event = ProctoringEvent(
             attempt_id=attempt_id,
@@ -3227,17 +3757,10 @@ def log_proctoring_event():
         db.session.add(event)
         
         # Update highest risk summary for this attempt (performance optimization)
-        attempt.update_highest_risk(data.get('severity', 'medium'))
-        
-        # Enhanced violation tracking and termination logic
-        violation_count = ProctoringEvent.query.filter_by(attempt_id=attempt_id).count() + 1
-        high_severity_count = ProctoringEvent.query.filter_by(
-            attempt_id=attempt_id, 
-            severity='high'
-        ).count()
-        
-        if data.get('severity') == 'high':
-            high_severity_count += 1
+        attempt_values = QuizAttempt.risk_summary_after(
+            attempt.highest_risk_level, attempt.highest_risk_severity, attempt.violation_counts_json,
+            data.get('severity', 'medium')
+        )
         
         # Immediate termination conditions
         immediate_termination_types = ['quiz_terminated', 'console_access', 'multiple_instances', 'devtools_opened']
@@ -3249,23 +3772,23 @@ def log_proctoring_event():
         
         if should_terminate:
             # Terminate the quiz attempt
-            attempt.status = 'terminated'
-            attempt.completed_at = datetime.utcnow()
-            
-            # Auto-flag the user for violations
-            violation_record = UserViolation.query.filter_by(user_id=current_user.id).first()
-            if not violation_record:
-                violation_record = UserViolation(user_id=current_user.id)
-                db.session.add(violation_record)
-            
-            violation_record.is_flagged = True
-            violation_record.flagged_at = datetime.utcnow()
-            violation_record.flagged_by = None  # System flagged
-            violation_record.notes = f"Auto-flagged due to quiz termination: {data.get('type')} - {data.get('description')}"
-            violation_record.violation_count = (violation_record.violation_count or 0) + 1
-            
+            attempt_values.update(status='terminated', completed_at=datetime.utcnow())
+        
+        # Write the risk summary, and the termination if any, back in one statement
+        db.session.execute(db.update(QuizAttempt).where(QuizAttempt.id == attempt_id).values(**attempt_values))
+        
+        if should_terminate:
             # Save current answers before termination
             db.session.commit()
+            refresh_violation_summary()
+            
+            # Auto-flag the user for violations off the request path; the termination above
+            # is what the client has to see straight away
+            submit_task(
+                auto_flag_user,
+                current_user.id,
+                f"Auto-flagged due to quiz termination: {data.get('type')} - {data.get('description')}"
+            )
             
             return jsonify({
                 'status': 'terminated',
@@ -3273,6 +3796,7 @@ def log_proctoring_event():
             })
         
         db.session.commit()
+        refresh_violation_summary()
         
         response_data = {'status': 'logged'}
         
@@ -3641,7 +4165,7 @@ def get_heatmap_data(quiz_id):
         quiz = Quiz.query.get_or_404(quiz_id)
         
         # Check if user is the host or admin
-        if not (current_user.is_admin() or quiz.creator_id == current_user.id):
+        if not (current_is_admin() or quiz.creator_id == current_user.id):
             return jsonify({'error': 'Access denied'}), 403
         
         # Get heatmap data for all questions in the quiz
@@ -3687,7 +4211,7 @@ def get_collaboration_insights(quiz_id):
         quiz = Quiz.query.get_or_404(quiz_id)
         
         # Check if user is the host or admin
-        if not (current_user.is_admin() or quiz.creator_id == current_user.id):
+        if not (current_is_admin() or quiz.creator_id == current_user.id):
             return jsonify({'error': 'Access denied'}), 403
         
         # Get active insights for the quiz
@@ -3735,7 +4259,7 @@ def acknowledge_insight(insight_id):
         insight = CollaborationInsight.query.get_or_404(insight_id)
         
         # Verify user has access to this quiz
-        if not (current_user.is_admin() or insight.quiz.creator_id == current_user.id):
+        if not (current_is_admin() or insight.quiz.creator_id == current_user.id):
             return jsonify({'error': 'Access denied'}), 403
         
         # Acknowledge the insight
@@ -3756,7 +4280,6 @@ import os
 import csv
 import io
 import logging
-import tempfile
 import mimetypes
 from werkzeug.utils import secure_filename
 
@@ -3764,7 +4287,7 @@ from werkzeug.utils import secure_filename
 @login_required
 def create_quiz():
     """Create a new quiz with optional file upload"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -3792,27 +4315,25 @@ def create_quiz():
                         flash('No questions found in the pasted text. Please check the format and try again.', 'warning')
                         return render_template('create_quiz.html', form=form)
                     
+                    # Flush only: the quiz is committed together with its questions, so a
+                    # failed import doesn't leave an empty quiz behind
                     db.session.add(quiz)
-                    db.session.commit()
+                    db.session.flush()
                     
                     # Create questions from parsed data
-                    created_count = 0
-                    for q_data in candidate_questions:
-                        try:
-                            create_question_from_comprehensive_data(quiz, q_data)
-                            created_count += 1
-                        except Exception as e:
-                            logging.warning(f"Failed to create question: {e}")
-                            continue
+                    created_count = add_parsed_questions(quiz, candidate_questions)
                     
                     if created_count > 0:
+                        invalidate_stats(ADMIN_STATS_CACHE_KEY)
                         flash(f'Quiz created successfully from pasted text! {created_count} questions added.', 'success')
                         return redirect(url_for('edit_quiz', quiz_id=quiz.id))
                     else:
+                        db.session.rollback()
                         flash('No valid questions could be created from the pasted text.', 'error')
                         return render_template('create_quiz.html', form=form)
                         
                 except Exception as e:
+                    db.session.rollback()
                     flash(f'Error processing pasted text: {str(e)}', 'error')
                     return render_template('create_quiz.html', form=form)
         
@@ -3845,33 +4366,31 @@ def create_quiz():
                         mime_type = mime_type_map.get(ext, 'text/plain')
                     
                     # Use comprehensive file parsing
-                    candidate_questions = parse_file_for_questions(temp_file_path, mime_type)
+                    candidate_questions = cached_parse_file_for_questions(temp_file_path, mime_type)
                     
                     if not candidate_questions:
                         flash('No questions found in the uploaded file. Please check the format and try again.', 'warning')
                         return render_template('create_quiz.html', form=form)
                     
+                    # Flush only: the quiz is committed together with its questions, so a
+                    # failed import doesn't leave an empty quiz behind
                     db.session.add(quiz)
-                    db.session.commit()
+                    db.session.flush()
                     
-                    # Create questions from parsed data with better error handling
-                    created_count = 0
-                    for q_data in candidate_questions:
-                        try:
-                            create_question_from_comprehensive_data(quiz, q_data)
-                            created_count += 1
-                        except Exception as e:
-                            logging.warning(f"Failed to create question: {e}")
-                            continue
+                    # Create questions from parsed data
+                    created_count = add_parsed_questions(quiz, candidate_questions)
                     
                     if created_count > 0:
+                        invalidate_stats(ADMIN_STATS_CACHE_KEY)
                         flash(f'Quiz created successfully from file "{filename}"! {created_count} questions added.', 'success')
                         return redirect(url_for('edit_quiz', quiz_id=quiz.id))
                     else:
+                        db.session.rollback()
                         flash('No valid questions could be created from the uploaded file.', 'error')
                         return render_template('create_quiz.html', form=form)
                         
                 except Exception as e:
+                    db.session.rollback()
                     flash(f'Error parsing file: {str(e)}', 'error')
                     return render_template('create_quiz.html', form=form)
                     
@@ -3885,72 +4404,94 @@ def create_quiz():
         
         db.session.add(quiz)
         db.session.commit()
+        invalidate_stats(ADMIN_STATS_CACHE_KEY)
         
         flash('Quiz created successfully! Now add questions to your quiz.', 'success')
         return redirect(url_for('edit_quiz', quiz_id=quiz.id))
     
     return render_template('create_quiz.html', form=form)
 
+# TXT quiz lines: "Q:"/"Question:" starts a question; "A)".."D)" or "1.".."4." is an option,
+# marked correct by a leading "*" or "(correct)"
+TXT_QUIZ_LINE_RE = _compile(r'(?:(?P<question>Q:|Question:)|(?P<marked>\*)?(?:[A-D]\)|[1-4]\.))\s*(?P<body>.*)')
+CORRECT_MARKER_RE = _compile(r'\(correct\)', re.IGNORECASE)
+
 def parse_quiz_file(file):
     """Parse uploaded quiz file and return questions data"""
     questions_data = []
-    content = file.read().decode('utf-8')
-    file.seek(0)  # Reset file pointer
-    
-    if file.filename.endswith('.csv'):
-        csv_reader = csv.reader(io.StringIO(content))
-        for row in csv_reader:
-            if len(row) >= 6:  # Question, Option1, Option2, Option3, Option4, CorrectAnswer
-                question_data = {
-                    'question_text': row[0].strip(),
-                    'options': [row[i].strip() for i in range(1, 5)],
-                    'correct_answer': int(row[5]) - 1 if row[5].isdigit() else 0,
-                    'points': int(row[6]) if len(row) > 6 and row[6].isdigit() else 1
-                }
-                questions_data.append(question_data)
-    else:  # TXT format
-        lines = content.split('\n')
-        current_question = None
-        options = []
-        correct_answer = 0
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if current_question and options:
-                    questions_data.append({
-                        'question_text': current_question,
-                        'options': options,
-                        'correct_answer': correct_answer,
-                        'points': 1
-                    })
-                    current_question = None
-                    options = []
-                    correct_answer = 0
-                continue
-                
-            if line.startswith('Q:') or line.startswith('Question:'):
-                current_question = line.split(':', 1)[1].strip()
-            elif line.startswith(('A)', 'B)', 'C)', 'D)')) or line.startswith(('1.', '2.', '3.', '4.')):
-                option_text = line[2:].strip() if line[1] in ').' else line[3:].strip()
-                if line.startswith('*') or '(correct)' in line.lower():
-                    correct_answer = len(options)
-                    option_text = option_text.replace('*', '').replace('(correct)', '').strip()
-                options.append(option_text)
-        
-        # Add last question if exists
-        if current_question and options:
-            questions_data.append({
-                'question_text': current_question,
-                'options': options,
-                'correct_answer': correct_answer,
-                'points': 1
-            })
+    # Decode the upload as it is read instead of holding the raw bytes and the decoded text
+    text_stream = io.TextIOWrapper(file.stream, encoding='utf-8', newline='')
     
+    try:
+        if file.filename.endswith('.csv'):
+            csv_reader = csv.reader(text_stream)
+            for row in csv_reader:
+                if len(row) >= 6:  # Question, Option1, Option2, Option3, Option4, CorrectAnswer
+                    question_data = {
+                        'question_text': row[0].strip(),
+                        'options': [row[i].strip() for i in range(1, 5)],
+                        'correct_answer': int(row[5]) - 1 if row[5].isdigit() else 0,
+                        'points': int(row[6]) if len(row) > 6 and row[6].isdigit() else 1
+                    }
+                    questions_data.append(question_data)
+        else:  # TXT format
+            current_question = None
+            options = []
+            correct_answer = 0
+        
+            for line in text_stream:
+                line = line.strip()
+                if not line:
+                    if current_question and options:
+                        questions_data.append({
+                            'question_text': current_question,
+                            'options': options,
+                            'correct_answer': correct_answer,
+                            'points': 1
+                        })
+                        current_question = None
+                        options = []
+                        correct_answer = 0
+                    continue
+                
+                match = TXT_QUIZ_LINE_RE.match(line)
+                if not match:
+                    continue
+            
+                if match.group('question'):
+                    current_question = match.group('body').strip()
+                else:
+                    option_text = match.group('body').strip()
+                    if match.group('marked') or CORRECT_MARKER_RE.search(option_text):
+                        correct_answer = len(options)
+                        option_text = CORRECT_MARKER_RE.sub('', option_text.replace('*', '')).strip()
+                    options.append(option_text)
+        
+            # Add last question if exists
+            if current_question and options:
+                questions_data.append({
+                    'question_text': current_question,
+                    'options': options,
+                    'correct_answer': correct_answer,
+                    'points': 1
+                })
+    finally:
+        # Leave the upload's stream open for the caller, even if parsing failed
+        text_stream.detach()
     return questions_data
 
-def create_question_from_comprehensive_data(quiz, question_data):
-    """Create a question and its options from comprehensive parsed data"""
+def create_question_from_comprehensive_data(quiz, question_data, order):
+    """
+    Build a question and its option rows from comprehensive parsed data
+
+    Nothing is added to the session; add_parsed_questions inserts a whole import at once.
+
+    Returns:
+        tuple: (Question, list of option dicts without question_id)
+
+    Raises:
+        ValueError: If the question text is missing or a multiple choice question has fewer than 2 options
+    """
     # Handle different data formats from comprehensive parser
     question_text = question_data.get('question', question_data.get('question_text', ''))
     question_type = question_data.get('type', 'multiple_choice')
@@ -3958,60 +4499,98 @@ def create_question_from_comprehensive_data(quiz, question_data):
     if not question_text:
         raise ValueError("Question text is required")
     
+    # Create options for multiple choice questions
+    option_rows = []
+    if question_type == 'multiple_choice':
+        options = question_data.get('options', [])
+        correct_index = question_data.get('correct_option_index', 0)
+        
+        if len(options) < 2:
+            raise ValueError("Multiple choice questions need at least 2 options")
+        
+        option_rows = [
+            {'option_text': option_text, 'is_correct': i == correct_index, 'order': i}
+            for i, option_text in enumerate(options)
+            if option_text  # Only add non-empty options
+        ]
+    
     question = Question(
         quiz_id=quiz.id,
         question_text=question_text,
         question_type=question_type,
         points=question_data.get('points', 1),
-        order=len(quiz.questions)
+        order=order
     )
+    return question, option_rows
+
+def next_question_order(quiz_id):
+    """Order value for a question appended to a quiz, without loading its questions"""
+    return db.session.query(
+        func.coalesce(func.max(Question.order), -1) + 1
+    ).filter(Question.quiz_id == quiz_id).scalar()
+
+def add_parsed_questions(quiz, candidate_questions):
+    """
+    Add parsed questions to a quiz with one batched insert per table and a single commit
+
+    Invalid entries are logged and skipped. The commit includes the caller's pending changes,
+    such as a quiz that was only flushed; nothing is committed when no entry is valid.
+
+    Returns:
+        int: Number of questions added
+    """
+    next_order = next_question_order(quiz.id)
+    questions = []
+    for q_data in candidate_questions:
+        try:
+            questions.append(create_question_from_comprehensive_data(quiz, q_data, next_order + len(questions)))
+        except ValueError as e:
+            logging.warning("Failed to create question: %s", e)
     
-    db.session.add(question)
-    db.session.commit()
-    
-    # Create options for multiple choice questions
-    if question_type == 'multiple_choice':
-        options = question_data.get('options', [])
-        correct_index = question_data.get('correct_option_index', 0)
-        
-        if len(options) < 2:
-            raise ValueError("Multiple choice questions need at least 2 options")
-        
-        for i, option_text in enumerate(options):
-            if option_text:  # Only add non-empty options
-                option = QuestionOption(
-                    question_id=question.id,
-                    option_text=option_text,
-                    is_correct=(i == correct_index),
-                    order=i
-                )
-                db.session.add(option)
+    if not questions:
+        return 0
     
-    db.session.commit()
-    return question
+    try:
+        # One flush inserts the questions and returns their ids
+        db.session.add_all([question for question, _ in questions])
+        db.session.flush()
+        
+        option_rows = [
+            dict(option, question_id=question.id)
+            for question, options in questions
+            for option in options
+        ]
+        if option_rows:
+            db.session.execute(db.insert(QuestionOption), option_rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(questions)
 
-def create_question_from_data(quiz, question_data):
+def create_question_from_data(quiz, question_data, order=None):
     """Create a question and its options from parsed data (legacy format)"""
     question = Question(
         quiz_id=quiz.id,
         question_text=question_data['question_text'],
         question_type='multiple_choice',
         points=question_data.get('points', 1),
-        order=len(quiz.questions)
+        order=next_question_order(quiz.id) if order is None else order
     )
     
     db.session.add(question)
-    db.session.commit()
+    db.session.flush()
     
     # Create options
-    for i, option_text in enumerate(question_data['options']):
-        option = QuestionOption(
-            question_id=question.id,
-            option_text=option_text,
-            is_correct=(i == question_data['correct_answer']),
-            order=i
-        )
-        db.session.add(option)
+    db.session.execute(db.insert(QuestionOption), [
+        {
+            'question_id': question.id,
+            'option_text': option_text,
+            'is_correct': i == question_data['correct_answer'],
+            'order': i
+        }
+        for i, option_text in enumerate(question_data['options'])
+    ])
     
     db.session.commit()
 
@@ -4021,7 +4600,7 @@ def edit_quiz(quiz_id):
     """Edit quiz and manage questions"""
     quiz = Quiz.query.get_or_404(quiz_id)
     
-    if quiz.creator_id != current_user.id and not current_user.is_admin():
+    if quiz.creator_id != current_user.id and not current_is_admin():
         flash('Access denied. You can only edit your own quizzes.', 'error')
         return redirect(url_for('host_dashboard'))
     
@@ -4048,7 +4627,7 @@ def edit_question(question_id):
     question = Question.query.get_or_404(question_id)
     quiz = question.quiz
     
-    if quiz.creator_id != current_user.id and not current_user.is_admin():
+    if quiz.creator_id != current_user.id and not current_is_admin():
         flash('Access denied.', 'error')
         return redirect(url_for('host_dashboard'))
     
@@ -4084,14 +4663,12 @@ def delete_question(question_id):
     question = Question.query.get_or_404(question_id)
     quiz = question.quiz
     
-    if quiz.creator_id != current_user.id and not current_user.is_admin():
+    if quiz.creator_id != current_user.id and not current_is_admin():
         flash('Access denied.', 'error')
         return redirect(url_for('host_dashboard'))
     
-    # Delete associated options first
-    QuestionOption.query.filter_by(question_id=question.id).delete()
-    # Delete the question
-    db.session.delete(question)
+    # Options and answers go with it through ON DELETE CASCADE
+    delete_with_dependents(Question, question.id)
     db.session.commit()
     
     flash('Question deleted successfully!', 'success')
@@ -4103,7 +4680,7 @@ def add_question(quiz_id):
     """Add a question to quiz"""
     quiz = Quiz.query.get_or_404(quiz_id)
     
-    if quiz.creator_id != current_user.id and not current_user.is_admin():
+    if quiz.creator_id != current_user.id and not current_is_admin():
         flash('Access denied.', 'error')
         return redirect(url_for('host_dashboard'))
     
@@ -4120,7 +4697,7 @@ def add_question(quiz_id):
         question_text=question_text,
         question_type=question_type,
         points=points,
-        order=len(quiz.questions)
+        order=next_question_order(quiz_id)
     )
     
     db.session.add(question)
@@ -4178,8 +4755,7 @@ def take_quiz(quiz_id):
         return redirect(url_for('dashboard'))
     
     # Check if user is flagged for violations - ADMIN ONLY RETAKE PERMISSIONS
-    violation_record = UserViolation.query.filter_by(user_id=current_user.id).first()
-    if violation_record and violation_record.is_flagged:
+    if user_is_flagged(current_user.id):
         flash('❌ Access denied. Your account has been flagged for security violations. Contact an administrator for retake permissions.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -4230,15 +4806,29 @@ def take_quiz(quiz_id):
     
     db.session.add(attempt)
     db.session.commit()
+    invalidate_stats(ADMIN_STATS_CACHE_KEY)
     
     # Pass device type to the template
     return redirect(url_for('continue_quiz', attempt_id=attempt.id))
 
+def get_attempt_for_report_or_404(attempt_id):
+    """
+    Load an attempt with its participant, answers, quiz, questions and options
+
+    Collections are selectin-loaded, one query per level, so walking the questions
+    and their options doesn't issue a query per question.
+    """
+    return QuizAttempt.query.options(
+        joinedload(QuizAttempt.participant),
+        joinedload(QuizAttempt.quiz).selectinload(Quiz.questions).selectinload(Question.options),
+        selectinload(QuizAttempt.answers)
+    ).filter_by(id=attempt_id).first_or_404()
+
 @app.route('/attempt/<int:attempt_id>')
 @login_required
 def continue_quiz(attempt_id):
     """Continue taking a quiz"""
-    attempt = QuizAttempt.query.get_or_404(attempt_id)
+    attempt = get_attempt_for_report_or_404(attempt_id)
     
     if attempt.participant_id != current_user.id:
         flash('Access denied.', 'error')
@@ -4291,15 +4881,26 @@ def submit_quiz(attempt_id):
     
     quiz = attempt.quiz
     
+    # Existing answers and the selected options, one query each instead of per question
+    existing_answers = {answer.question_id: answer for answer in Answer.query.filter_by(attempt_id=attempt_id)}
+    selected_option_ids = {
+        int(request.form[f'question_{question.id}'])
+        for question in quiz.questions
+        if question.question_type in ('multiple_choice', 'true_false') and request.form.get(f'question_{question.id}')
+    }
+    selected_options = {}
+    if selected_option_ids:
+        selected_options = {
+            option.id: option
+            for option in QuestionOption.query.filter(QuestionOption.id.in_(selected_option_ids))
+        }
+    
     # Process answers
     for question in quiz.questions:
         answer_key = f'question_{question.id}'
         
         # Check if answer already exists
-        existing_answer = Answer.query.filter_by(
-            attempt_id=attempt_id,
-            question_id=question.id
-        ).first()
+        existing_answer = existing_answers.get(question.id)
         
         if existing_answer:
             # Update existing answer
@@ -4315,7 +4916,7 @@ def submit_quiz(attempt_id):
             selected_option_id = request.form.get(answer_key)
             if selected_option_id:
                 answer.selected_option_id = int(selected_option_id)
-                selected_option = QuestionOption.query.get(selected_option_id)
+                selected_option = selected_options.get(answer.selected_option_id)
                 answer.is_correct = selected_option.is_correct if selected_option else False
             else:
                 answer.is_correct = False
@@ -4453,9 +5054,9 @@ def submit_quiz(attempt_id):
 @login_required
 def quiz_results(attempt_id):
     """View quiz results"""
-    attempt = QuizAttempt.query.get_or_404(attempt_id)
+    attempt = get_attempt_for_report_or_404(attempt_id)
     
-    if attempt.participant_id != current_user.id and attempt.quiz.creator_id != current_user.id and not current_user.is_admin():
+    if attempt.participant_id != current_user.id and attempt.quiz.creator_id != current_user.id and not current_is_admin():
         flash('Access denied.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -4469,42 +5070,268 @@ def quiz_results(attempt_id):
                          questions=questions,
                          answers=answers)
 
+# ReportLab styles for participant reports, built on first use and shared by every later report
+_participant_report_styles = None
+
+def participant_report_styles():
+    """Return the participant report's stylesheet, title style and table styles, building them once"""
+    global _participant_report_styles
+    if _participant_report_styles is None:
+        from reportlab.platypus import TableStyle
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib import colors
+        
+        styles = getSampleStyleSheet()
+        _participant_report_styles = {
+            'styles': styles,
+            'title': ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                textColor=colors.darkblue,
+                spaceAfter=30,
+                alignment=1  # Center alignment
+            ),
+            'quiz_table': TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+                ('BACKGROUND', (1, 0), (1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]),
+            'options_table': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ])
+        }
+    return _participant_report_styles
+
+# Reports are rendered on the background pool into REPORT_FOLDER. The download views
+# return a "being prepared" page that refreshes onto the job URL until the file exists,
+# so a slow ReportLab/xlsxwriter build never holds a web worker. Reports for finished
+# attempts are named after the attempt's version and kept, so later downloads skip the render.
+REPORT_FOLDER = app.config['REPORT_FOLDER']
+REPORT_REFRESH_SECONDS = 2
+# A pending marker older than this belongs to a job whose worker died mid-render
+REPORT_JOB_TIMEOUT = 300
+# Cached reports not downloaded for this long are swept, at most once per sweep interval per process
+REPORT_CACHE_MAX_AGE = 7 * 24 * 3600
+REPORT_SWEEP_INTERVAL = 3600
+_last_report_sweep = 0.0
+# uuid4 hex for one-off jobs, sha1 hex for versioned (cached) reports
+REPORT_JOB_ID_RE = _compile(r'[0-9a-f]{32}(?:[0-9a-f]{8})?')
+REPORT_FORMATS = {
+    'participant': {
+        'extension': 'pdf',
+        'mimetype': 'application/pdf',
+        'download_prefix': 'quiz_report',
+        'dashboard': 'participant_dashboard'
+    },
+    'host': {
+        'extension': 'xlsx',
+        'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'download_prefix': 'detailed_report',
+        'dashboard': 'host_dashboard'
+    }
+}
+
+def report_path(kind, attempt_id, job_id):
+    return os.path.join(REPORT_FOLDER, f"{kind}_{attempt_id}_{job_id}.{REPORT_FORMATS[kind]['extension']}")
+
+def report_version(attempt):
+    """Cache key for a finished attempt's reports; None while the attempt can still change"""
+    if attempt.completed_at is None:
+        return None
+    # The reports also show the quiz's questions, so editing the quiz invalidates them too
+    return hashlib.sha1(
+        f"{attempt.id}:{attempt.completed_at.isoformat()}:{attempt.score}:{attempt.quiz.updated_at}".encode()
+    ).hexdigest()
+
+def report_access_denied(kind, attempt):
+    """Participants may download their own report; hosts the reports for their quizzes, admins any"""
+    if kind == 'participant':
+        return attempt.participant_id != current_user.id
+    return attempt.quiz.creator_id != current_user.id and not current_is_admin()
+
+def _run_report_job(writer, attempt_id, path):
+    """Render a report into a temp file and move it into place (runs on the background pool)"""
+    fd, tmp_path = tempfile.mkstemp(dir=REPORT_FOLDER, suffix='.part')
+    try:
+        with os.fdopen(fd, 'w+b') as out:
+            writer(attempt_id, out)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        # Leave a marker so the waiting page can stop polling and report the failure
+        open(f'{path}.failed', 'w').close()
+        raise
+    finally:
+        # The marker may already be gone if this job ran past REPORT_JOB_TIMEOUT and was taken over
+        try:
+            os.remove(f'{path}.pending')
+        except FileNotFoundError:
+            pass
+
+def report_job_stale(path):
+    """Whether the job's pending marker has outlived REPORT_JOB_TIMEOUT"""
+    try:
+        return time.time() - os.path.getmtime(f'{path}.pending') > REPORT_JOB_TIMEOUT
+    except FileNotFoundError:
+        return False
+
+def claim_report_job(path):
+    """Create the job's pending marker exclusively, taking over a stale one; False if a live job holds it"""
+    for _ in range(2):
+        try:
+            open(f'{path}.pending', 'x').close()
+        except FileExistsError:
+            if not report_job_stale(path):
+                return False
+            try:
+                os.remove(f'{path}.pending')
+            except FileNotFoundError:
+                pass
+        else:
+            # A failure marker left by an earlier attempt would make the new job look failed at once
+            try:
+                os.remove(f'{path}.failed')
+            except FileNotFoundError:
+                pass
+            return True
+    return False
+
+def _sweep_report_folder():
+    """Delete cached reports past REPORT_CACHE_MAX_AGE and markers or partial files of dead jobs"""
+    now = time.time()
+    with os.scandir(REPORT_FOLDER) as entries:
+        for entry in entries:
+            max_age = REPORT_CACHE_MAX_AGE
+            if entry.name.endswith(('.pending', '.part')):
+                max_age = REPORT_JOB_TIMEOUT
+            try:
+                if now - entry.stat().st_mtime > max_age:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+def sweep_report_folder():
+    """Queue a sweep of REPORT_FOLDER, at most once per interval per process"""
+    global _last_report_sweep
+    now = time.time()
+    if now - _last_report_sweep < REPORT_SWEEP_INTERVAL:
+        return
+    _last_report_sweep = now
+    submit_task(_sweep_report_folder)
+
+def report_pending_response(kind, attempt_id, job_id):
+    job_url = url_for('download_report_job', kind=kind, attempt_id=attempt_id, job_id=job_id)
+    response = make_response(render_template('report_pending.html', job_url=job_url), 202)
+    response.headers['Refresh'] = f'{REPORT_REFRESH_SECONDS}; url={job_url}'
+    return response
+
+def send_report(kind, attempt, path, keep):
+    """Send a rendered report; one-off files are unlinked once open, the download streams from the handle"""
+    report_format = REPORT_FORMATS[kind]
+    try:
+        report_file = open(path, 'rb')
+    except FileNotFoundError:
+        abort(404)
+    if keep:
+        # Downloads keep a cached report fresh for the age-based sweep
+        os.utime(path)
+    else:
+        os.remove(path)
+    
+    return send_file(
+        report_file,
+        mimetype=report_format['mimetype'],
+        as_attachment=True,
+        download_name=f"{report_format['download_prefix']}_{attempt.quiz.title}_{attempt.participant.username}.{report_format['extension']}"
+    )
+
+def queue_report(kind, attempt, writer):
+    """Send the cached report for this attempt version, or start rendering it and return the waiting page"""
+    sweep_report_folder()
+    job_id = report_version(attempt) or uuid.uuid4().hex
+    path = report_path(kind, attempt.id, job_id)
+    if os.path.exists(path):
+        return send_report(kind, attempt, path, keep=True)
+    
+    # The pending marker lets the job URL tell "still rendering" from an unknown or spent job;
+    # creating it exclusively means concurrent clicks share one render
+    if not claim_report_job(path):
+        return report_pending_response(kind, attempt.id, job_id)
+    submit_task(_run_report_job, writer, attempt.id, path)
+    return report_pending_response(kind, attempt.id, job_id)
+
+@app.route('/download/report/<kind>/<int:attempt_id>/<job_id>')
+@login_required
+def download_report_job(kind, attempt_id, job_id):
+    """Send a queued report once its background job has written it"""
+    if kind not in REPORT_FORMATS or not REPORT_JOB_ID_RE.fullmatch(job_id):
+        abort(404)
+    
+    attempt = QuizAttempt.query.options(
+        joinedload(QuizAttempt.quiz), joinedload(QuizAttempt.participant)
+    ).get_or_404(attempt_id)
+    
+    if report_access_denied(kind, attempt):
+        flash('Access denied.', 'error')
+        return redirect(url_for(REPORT_FORMATS[kind]['dashboard']))
+    
+    path = report_path(kind, attempt_id, job_id)
+    # A failed job, or one whose worker died (stale marker); the next download re-queues it
+    if os.path.exists(f'{path}.failed') or report_job_stale(path):
+        for marker in (f'{path}.failed', f'{path}.pending'):
+            if os.path.exists(marker):
+                os.remove(marker)
+        flash('The report could not be generated. Please try again.', 'error')
+        return redirect(url_for('quiz_results', attempt_id=attempt_id))
+    
+    if not os.path.exists(path):
+        if os.path.exists(f'{path}.pending'):
+            return report_pending_response(kind, attempt_id, job_id)
+        abort(404)
+    
+    return send_report(kind, attempt, path, keep=job_id == report_version(attempt))
+
 @app.route('/download/participant-report/<int:attempt_id>')
 @login_required
 def download_participant_report(attempt_id):
-    """Download participant report as PDF with comprehensive error handling"""
-    try:
-        attempt = QuizAttempt.query.get_or_404(attempt_id)
-        
-        if attempt.participant_id != current_user.id:
-            flash('Access denied.', 'error')
-            return redirect(url_for('participant_dashboard'))
-    except Exception as e:
-        logging.error(f"Error fetching quiz attempt {attempt_id}: {e}")
+    """Queue the participant report PDF and show the page that waits for it"""
+    attempt = QuizAttempt.query.get(attempt_id)
+    if attempt is None:
         flash('Quiz attempt not found.', 'error')
         return redirect(url_for('participant_dashboard'))
     
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
+    if report_access_denied('participant', attempt):
+        flash('Access denied.', 'error')
+        return redirect(url_for('participant_dashboard'))
+    
+    return queue_report('participant', attempt, write_participant_report)
+
+def write_participant_report(attempt_id, out):
+    """Render the participant report PDF into a binary file (runs on the background pool)"""
+    attempt = get_attempt_for_report_or_404(attempt_id)
+    
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
     from reportlab.lib.units import inch
-    from io import BytesIO
     
     # Create PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.darkblue,
-        spaceAfter=30,
-        alignment=1  # Center alignment
-    )
+    doc = SimpleDocTemplate(out, pagesize=A4)
+    report_styles = participant_report_styles()
+    styles = report_styles['styles']
+    title_style = report_styles['title']
     
     story = []
     
@@ -4523,16 +5350,7 @@ def download_participant_report(attempt_id):
     ]
     
     quiz_table = Table(quiz_info, colWidths=[2*inch, 4*inch])
-    quiz_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    quiz_table.setStyle(report_styles['quiz_table'])
     
     story.append(quiz_table)
     story.append(Spacer(1, 30))
@@ -4559,15 +5377,7 @@ def download_participant_report(attempt_id):
                 options_data.append([option.option_text, is_selected, is_correct])
             
             options_table = Table(options_data, colWidths=[3*inch, 1*inch, 1*inch])
-            options_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            options_table.setStyle(report_styles['options_table'])
             
             story.append(options_table)
             
@@ -4595,42 +5405,36 @@ def download_participant_report(attempt_id):
     
     # Build PDF
     doc.build(story)
-    buffer.seek(0)
-    
-    # Return as download
-    return send_file(
-        BytesIO(buffer.read()),
-        mimetype='application/pdf',
-        as_attachment=True,
-        download_name=f'quiz_report_{attempt.quiz.title}_{attempt.participant.username}.pdf'
-    )
 
 @app.route('/download/host-report/<int:attempt_id>')
 @login_required
 def download_host_report(attempt_id):
-    """Download detailed host report as Excel"""
+    """Queue the detailed host report workbook and show the page that waits for it"""
     attempt = QuizAttempt.query.get_or_404(attempt_id)
     
-    if attempt.quiz.creator_id != current_user.id and not current_user.is_admin():
+    if report_access_denied('host', attempt):
         flash('Access denied.', 'error')
         return redirect(url_for('host_dashboard'))
     
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Fill, PatternFill, Alignment
-    from openpyxl.utils import get_column_letter
-    from io import BytesIO
+    return queue_report('host', attempt, write_host_report)
+
+def write_host_report(attempt_id, out):
+    """Render the detailed host report workbook into a binary file (runs on the background pool)"""
+    attempt = get_attempt_for_report_or_404(attempt_id)
     
-    # Create workbook
-    wb = Workbook()
+    import xlsxwriter
     
-    # Quiz Summary Sheet
-    ws1 = wb.active
-    ws1.title = "Quiz Summary"
+    # constant_memory streams each row out as it is written, so rows go strictly in order
+    wb = xlsxwriter.Workbook(out, {'constant_memory': True})
     
-    # Headers
-    ws1['A1'] = "Quiz Results Summary"
-    ws1['A1'].font = Font(size=16, bold=True)
-    ws1['A1'].fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    title_format = wb.add_format({'font_size': 16, 'bold': True, 'bg_color': '#4472C4'})
+    bold = wb.add_format({'bold': True})
+    header_format = wb.add_format({'bold': True, 'bg_color': '#D9E2F3'})
+    correct_format = wb.add_format({'bg_color': '#C6EFCE'})
+    incorrect_format = wb.add_format({'bg_color': '#FFC7CE'})
+    
+    # Quiz Summary Sheet
+    ws1 = wb.add_worksheet("Quiz Summary")
     
     # Quiz info
     quiz_data = [
@@ -4646,84 +5450,116 @@ def download_host_report(attempt_id):
         ["Time Taken", str(attempt.completed_at - attempt.started_at) if attempt.completed_at else 'N/A']
     ]
     
-    for row, (label, value) in enumerate(quiz_data, 3):
-        ws1[f'A{row}'] = label
-        ws1[f'B{row}'] = value
-        ws1[f'A{row}'].font = Font(bold=True)
+    # Summary widths come from the rows about to be written, so no second pass over the cells is needed
+    ws1.set_column(0, 0, min(max(len("Quiz Results Summary"), *(len(str(label)) for label, _ in quiz_data)) + 2, 50))
+    ws1.set_column(1, 1, min(max(len(str(value)) for _, value in quiz_data) + 2, 50))
+    
+    # Headers
+    ws1.write(0, 0, "Quiz Results Summary", title_format)
+    
+    for row, (label, value) in enumerate(quiz_data, 2):
+        ws1.write(row, 0, label, bold)
+        ws1.write(row, 1, value)
     
     # Detailed Answers Sheet
-    ws2 = wb.create_sheet("Detailed Answers")
+    ws2 = wb.add_worksheet("Detailed Answers")
     headers = ["Question #", "Question Text", "Question Type", "Points", "Your Answer", "Correct Answer", "Result", "Points Earned"]
     
-    for col, header in enumerate(headers, 1):
-        ws2.cell(row=1, column=col, value=header)
-        ws2.cell(row=1, column=col).font = Font(bold=True)
-        ws2.cell(row=1, column=col).fill = PatternFill(start_color="D9E2F3", end_color="D9E2F3", fill_type="solid")
+    # The answers sheet has a fixed schema, so its column widths are known up front
+    for col, width in enumerate([12, 50, 18, 8, 40, 40, 14, 15]):
+        ws2.set_column(col, col, width)
+    
+    ws2.write_row(0, 0, headers, header_format)
     
     answers = {answer.question_id: answer for answer in attempt.answers}
     
-    for row, question in enumerate(attempt.quiz.questions, 2):
+    # Index the eager-loaded options once instead of scanning each question's options per lookup
+    options_by_id = {}
+    correct_by_question = {}
+    for question in attempt.quiz.questions:
+        for option in question.options:
+            options_by_id[option.id] = option
+            if option.is_correct:
+                correct_by_question.setdefault(question.id, option)
+    
+    for row, question in enumerate(attempt.quiz.questions, 1):
         answer = answers.get(question.id)
         
-        ws2.cell(row=row, column=1, value=row-1)
-        ws2.cell(row=row, column=2, value=question.question_text)
-        ws2.cell(row=row, column=3, value=question.question_type.title())
-        ws2.cell(row=row, column=4, value=question.points)
+        ws2.write_row(row, 0, [row, question.question_text, question.question_type.title(), question.points])
         
         if question.question_type in ['multiple_choice', 'true_false']:
             if answer and answer.selected_option_id:
-                selected_option = next((opt for opt in question.options if opt.id == answer.selected_option_id), None)
-                ws2.cell(row=row, column=5, value=selected_option.option_text if selected_option else 'Unknown')
+                selected_option = options_by_id.get(answer.selected_option_id)
+                ws2.write(row, 4, selected_option.option_text if selected_option else 'Unknown')
             else:
-                ws2.cell(row=row, column=5, value='Not answered')
+                ws2.write(row, 4, 'Not answered')
             
-            correct_option = next((opt for opt in question.options if opt.is_correct), None)
-            ws2.cell(row=row, column=6, value=correct_option.option_text if correct_option else 'No correct answer set')
+            correct_option = correct_by_question.get(question.id)
+            ws2.write(row, 5, correct_option.option_text if correct_option else 'No correct answer set')
             
             if answer:
                 if answer.is_correct:
-                    ws2.cell(row=row, column=7, value='Correct')
-                    ws2.cell(row=row, column=8, value=question.points)
-                    ws2.cell(row=row, column=7).fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+                    ws2.write(row, 6, 'Correct', correct_format)
+                    ws2.write(row, 7, question.points)
                 else:
-                    ws2.cell(row=row, column=7, value='Incorrect')
-                    ws2.cell(row=row, column=8, value=0)
-                    ws2.cell(row=row, column=7).fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+                    ws2.write(row, 6, 'Incorrect', incorrect_format)
+                    ws2.write(row, 7, 0)
             else:
-                ws2.cell(row=row, column=7, value='Not answered')
-                ws2.cell(row=row, column=8, value=0)
+                ws2.write_row(row, 6, ['Not answered', 0])
         
         elif question.question_type == 'text':
-            ws2.cell(row=row, column=5, value=answer.text_answer if answer and answer.text_answer else 'Not answered')
-            ws2.cell(row=row, column=6, value='Manual grading required')
-            ws2.cell(row=row, column=7, value='Needs review' if answer and answer.text_answer else 'Not answered')
-            ws2.cell(row=row, column=8, value='TBD')
-    
-    # Auto-adjust column widths
-    for ws in [ws1, ws2]:
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
+            ws2.write_row(row, 4, [
+                answer.text_answer if answer and answer.text_answer else 'Not answered',
+                'Manual grading required',
+                'Needs review' if answer and answer.text_answer else 'Not answered',
+                'TBD'
+            ])
+    
+    # Totals row, aggregated in SQL instead of another pass over the answers
+    earned_points = db.session.query(
+        func.coalesce(func.sum(case((Answer.is_correct == True, Question.points), else_=0)), 0)
+    ).select_from(Answer).join(Question, Answer.question_id == Question.id) \
+     .filter(Answer.attempt_id == attempt.id).scalar()
+    
+    total_row = len(attempt.quiz.questions) + 1
+    ws2.write(total_row, 0, 'Total', bold)
+    ws2.write(total_row, 3, attempt.total_points or 0)
+    ws2.write(total_row, 7, earned_points, bold)
+    
+    wb.close()
+
+PROFILE_PICTURE_MAX_BYTES = 2 * 1024 * 1024
+PROFILE_PICTURE_SIZE = (512, 512)
+PROFILE_PICTURE_MAX_DIMENSION = 4096  # Larger images take too much memory to decode on the pool
+
+def _persist_profile_image(filename, data):
+    """Write an uploaded profile picture to disk, downscaled to a JPEG when Pillow is installed (runs on the background pool)"""
+    # Write to a temp file first and swap it in so a partial write never replaces a good picture
+    tmp = tempfile.NamedTemporaryFile(dir=PROFILE_UPLOAD_FOLDER, delete=False)
+    try:
+        with tmp:
+            if Image is not None:
                 try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Save to BytesIO
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    
-    return send_file(
-        BytesIO(buffer.read()),
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'detailed_report_{attempt.quiz.title}_{attempt.participant.username}.xlsx'
-    )
+                    with Image.open(BytesIO(data)) as img:
+                        img = ImageOps.exif_transpose(img)
+                        img.thumbnail(PROFILE_PICTURE_SIZE)
+                        img.convert('RGB').save(tmp, 'JPEG', quality=82, optimize=True)
+                except Exception as e:
+                    # The header passed in the view but decoding failed (e.g. a truncated file);
+                    # the profile already points at this path, so keep the bytes as uploaded
+                    logging.warning("Could not downscale profile picture %s, storing it as uploaded: %s", filename, e)
+                    tmp.seek(0)
+                    tmp.truncate()
+                    tmp.write(data)
+            else:
+                tmp.write(data)
+        # NamedTemporaryFile is created 0600; static files must stay readable to whatever serves them
+        os.chmod(tmp.name, 0o644)
+        os.replace(tmp.name, os.path.join(PROFILE_UPLOAD_FOLDER, filename))
+    except Exception:
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        raise
 
 @app.route('/profile', methods=['GET', 'POST'])
 @login_required
@@ -4750,17 +5586,29 @@ def profile():
         if 'profile_picture' in request.files:
             file = request.files['profile_picture']
             if file and file.filename:
-                import os
-                from werkzeug.utils import secure_filename
+                # Read one byte past the cap so an oversized upload is rejected without buffering it whole
+                data = file.read(PROFILE_PICTURE_MAX_BYTES + 1)
+                if len(data) > PROFILE_PICTURE_MAX_BYTES:
+                    flash('Profile picture too large. Maximum size is 2MB.', 'error')
+                    return render_template('profile.html', form=form)
                 
-                # Create uploads directory if it doesn't exist
-                upload_dir = os.path.join('static', 'uploads', 'profiles')
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                # Save file with user id prefix
+                # Save file with user id prefix; the disk write happens on the background pool
                 filename = f"user_{current_user.id}_{secure_filename(file.filename)}"
-                filepath = os.path.join(upload_dir, filename)
-                file.save(filepath)
+                if Image is not None:
+                    # Opening only parses the header; decoding and resizing happen in the background
+                    try:
+                        with Image.open(BytesIO(data)) as img:
+                            width, height = img.size
+                    except Exception:
+                        # Not an image, a corrupt header, or a decompression bomb
+                        flash('Profile picture must be an image file.', 'error')
+                        return render_template('profile.html', form=form)
+                    if max(width, height) > PROFILE_PICTURE_MAX_DIMENSION:
+                        flash(f'Profile picture is too large. Maximum size is '
+                              f'{PROFILE_PICTURE_MAX_DIMENSION}x{PROFILE_PICTURE_MAX_DIMENSION} pixels.', 'error')
+                        return render_template('profile.html', form=form)
+                    filename = f"{os.path.splitext(filename)[0]}.jpg"
+                submit_task(_persist_profile_image, filename, data)
                 
                 # Update user profile picture path
                 current_user.profile_picture = f"uploads/profiles/{filename}"
@@ -4799,45 +5647,55 @@ def get_quiz_questions(quiz_id):
     """Get quiz questions for AJAX loading"""
     quiz = Quiz.query.get_or_404(quiz_id)
     
-    if quiz.creator_id != current_user.id and not current_user.is_admin():
+    if quiz.creator_id != current_user.id and not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
-    questions = []
-    for question in quiz.questions:
-        question_data = {
-            'id': question.id,
-            'text': question.question_text,
-            'type': question.question_type,
-            'points': question.points,
-            'options': []
-        }
+    # Fetch plain column tuples in one query instead of hydrating Question/QuestionOption objects
+    rows = db.session.query(
+        Question.id, Question.question_text, Question.question_type, Question.points,
+        QuestionOption.id, QuestionOption.option_text, QuestionOption.is_correct
+    ).outerjoin(QuestionOption, QuestionOption.question_id == Question.id) \
+     .filter(Question.quiz_id == quiz_id) \
+     .order_by(Question.id, QuestionOption.id).all()
+    
+    questions = {}
+    for question_id, question_text, question_type, points, option_id, option_text, is_correct in rows:
+        question_data = questions.get(question_id)
+        if question_data is None:
+            question_data = questions[question_id] = {
+                'id': question_id,
+                'text': question_text,
+                'type': question_type,
+                'points': points,
+                'options': []
+            }
         
-        for option in question.options:
+        if option_id is not None:
             question_data['options'].append({
-                'id': option.id,
-                'text': option.option_text,
-                'is_correct': option.is_correct
+                'id': option_id,
+                'text': option_text,
+                'is_correct': is_correct
             })
-        
-        questions.append(question_data)
     
-    return jsonify({'questions': questions})
+    return jsonify({'questions': list(questions.values())})
 
 
 
 @app.route('/admin/violations')
 @login_required
+@admin_only
 def admin_violations():
     """Enhanced violations view with consolidated entries per user per quiz"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Get filter parameters
     severity_filter = request.args.get('severity', 'all')
     date_filter = request.args.get('date_range', '7')
     user_filter = request.args.get('user_id', '')
     
+    # Keyset cursor: the (latest_at, last_event_id) of the last row on the previous page
+    per_page = 50
+    before_ts = request.args.get('before_ts', '')
+    before_id = request.args.get('before_id', type=int)
+    
     # Build aggregated query to consolidate violations by user, quiz, and type
     from sqlalchemy import func, case
     
@@ -4852,6 +5710,7 @@ def admin_violations():
         ProctoringEvent.event_type.label('violation_type'),
         func.count(ProctoringEvent.id).label('count'),
         func.max(ProctoringEvent.timestamp).label('latest_at'),
+        func.max(ProctoringEvent.id).label('last_event_id'),
         func.max(ProctoringEvent.description).label('description'),
         func.max(case(
             (ProctoringEvent.severity == 'low', 1),
@@ -4877,11 +5736,40 @@ def admin_violations():
         base_query = base_query.filter(User.id == user_filter)
     
     # Group by user, quiz, and violation type
-    aggregated_violations = base_query.group_by(
+    grouped_query = base_query.group_by(
         User.id, User.username, User.email,
         Quiz.id, Quiz.title, Quiz.creator_id,
         ProctoringEvent.event_type
-    ).order_by(func.max(ProctoringEvent.timestamp).desc()).limit(500).all()
+    )
+    
+    # Each event belongs to exactly one group, so max(id) breaks ties between equal timestamps
+    latest_at = func.max(ProctoringEvent.timestamp)
+    last_event_id = func.max(ProctoringEvent.id)
+    
+    if before_ts and before_id:
+        try:
+            cursor_ts = datetime.fromisoformat(before_ts)
+        except ValueError:
+            cursor_ts = None
+        if cursor_ts:
+            grouped_query = grouped_query.having(tuple_(latest_at, last_event_id) < tuple_(cursor_ts, before_id))
+    
+    # Fetch one extra row to know whether there is an older page
+    aggregated_violations = grouped_query.order_by(latest_at.desc(), last_event_id.desc()).limit(per_page + 1).all()
+    has_more = len(aggregated_violations) > per_page
+    aggregated_violations = aggregated_violations[:per_page]
+    
+    current_filters = {
+        'severity': severity_filter,
+        'date_range': date_filter,
+        'user_id': user_filter
+    }
+    
+    next_page_url = None
+    if has_more:
+        last_row = aggregated_violations[-1]
+        next_page_url = url_for('admin_violations', **current_filters,
+                                before_ts=last_row.latest_at.isoformat(), before_id=last_row.last_event_id)
     
     # Get creator usernames for the results
     creator_usernames = {}
@@ -4909,18 +5797,16 @@ def admin_violations():
             'attempt_status': v.attempt_status
         })
     
-    # Get violation statistics
-    total_violations = ProctoringEvent.query.count()
-    high_severity = ProctoringEvent.query.filter_by(severity='high').count()
-    recent_violations = ProctoringEvent.query.filter(
-        ProctoringEvent.timestamp >= datetime.utcnow() - timedelta(hours=24)
-    ).count()
+    # Get violation statistics in one pass over the events
+    stats_row = db.session.query(
+        func.count(ProctoringEvent.id).label('total_violations'),
+        func.count(case((ProctoringEvent.severity == 'high', ProctoringEvent.id))).label('high_severity'),
+        func.count(case((
+            ProctoringEvent.timestamp >= datetime.utcnow() - timedelta(hours=24), ProctoringEvent.id
+        ))).label('recent_violations')
+    ).one()
     
-    stats = {
-        'total_violations': total_violations,
-        'high_severity': high_severity,
-        'recent_violations': recent_violations
-    }
+    stats = stats_row._asdict()
     
     # Get all users for filter dropdown
     users = User.query.filter_by(role='participant').all()
@@ -4929,26 +5815,22 @@ def admin_violations():
                          violations=violations, 
                          stats=stats,
                          users=users,
-                         current_filters={
-                             'severity': severity_filter,
-                             'date_range': date_filter,
-                             'user_id': user_filter
-                         })
+                         next_page_url=next_page_url,
+                         is_first_page=not (before_ts and before_id),
+                         current_filters=current_filters)
 
 @app.route('/admin/violations/<int:user_id>/<int:quiz_id>/<violation_type>')
 @login_required
+@admin_only
 def admin_violation_details(user_id, quiz_id, violation_type):
     """Show detailed violation timeline for a specific user-quiz-type combination"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Get the user and quiz for display
     user = User.query.get_or_404(user_id)
     quiz = Quiz.query.get_or_404(quiz_id)
     
     # Get all detailed violations for this combination
     violations = ProctoringEvent.query.join(QuizAttempt) \
+        .options(contains_eager(ProctoringEvent.attempt)) \
         .filter(
             QuizAttempt.participant_id == user_id,
             QuizAttempt.quiz_id == quiz_id,
@@ -4963,12 +5845,9 @@ def admin_violation_details(user_id, quiz_id, violation_type):
 
 @app.route('/admin/user/<int:user_id>/edit-credentials', methods=['POST'])
 @login_required
+@admin_only
 def admin_edit_credentials(user_id):
     """Edit user credentials"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     user = User.query.get_or_404(user_id)
     
     # Don't allow editing your own account
@@ -5007,24 +5886,18 @@ def admin_edit_credentials(user_id):
 
 @app.route('/admin/quiz-management')
 @login_required
+@admin_only
 def admin_quiz_management():
     """Admin quiz management system"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     quizzes = Quiz.query.order_by(Quiz.display_order.asc(), Quiz.created_at.desc()).all()
     return render_template('admin_quiz_management.html', quizzes=quizzes)
 
 # AI-Powered Plagiarism Detection Admin Routes
 @app.route('/admin/plagiarism-detection')
 @login_required 
+@admin_only
 def admin_plagiarism_detection():
     """Admin dashboard for plagiarism detection monitoring and management"""
-    if not current_user.is_admin():
-        flash('Access denied. Admin privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Get filter parameters
     risk_filter = request.args.get('risk', 'all')
     review_filter = request.args.get('reviewed', 'all')
@@ -5080,12 +5953,9 @@ def admin_plagiarism_detection():
 
 @app.route('/admin/plagiarism-analysis/<int:analysis_id>')
 @login_required
+@admin_only
 def admin_plagiarism_analysis_detail(analysis_id):
     """Detailed view of a specific plagiarism analysis"""
-    if not current_user.is_admin():
-        flash('Access denied. Admin privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     analysis = PlagiarismAnalysis.query.get_or_404(analysis_id)
     
     # Get related data
@@ -5109,12 +5979,9 @@ def admin_plagiarism_analysis_detail(analysis_id):
 
 @app.route('/admin/plagiarism-analysis/<int:analysis_id>/review', methods=['POST'])
 @login_required
+@admin_only
 def admin_review_plagiarism(analysis_id):
     """Review and make decision on plagiarism analysis"""
-    if not current_user.is_admin():
-        flash('Access denied. Admin privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     # CSRF Protection - Check token
     csrf_token = request.form.get('csrf_token')
     expected_token = session.get('csrf_token')
@@ -5151,11 +6018,12 @@ def admin_review_plagiarism(analysis_id):
 
 @app.route('/admin/plagiarism-reports/download')
 @login_required
+@admin_only
 def download_plagiarism_report():
     """Download comprehensive plagiarism detection report"""
-    if not current_user.is_admin():
-        flash('Access denied. Admin privileges required.', 'error')
-        return redirect(url_for('dashboard'))
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.utils import get_column_letter
     
     try:
         # Create workbook
@@ -5172,11 +6040,15 @@ def download_plagiarism_report():
             'Analyzed At', 'Reviewed At', 'Reviewer'
         ]
         
+        # Column widths are tracked while writing so no second pass over the cells is needed
+        col_widths = defaultdict(int)
+        
         # Add headers with styling
         for col, header in enumerate(headers, 1):
             cell = ws.cell(row=1, column=col, value=header)
             cell.font = Font(bold=True)
             cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            col_widths[col] = len(header)
         
         # Get all analyses with related data
         analyses = db.session.query(PlagiarismAnalysis).join(Answer).join(QuizAttempt).join(Quiz).join(User).join(Question).all()
@@ -5205,19 +6077,11 @@ def download_plagiarism_report():
             
             for col, value in enumerate(data, 1):
                 ws.cell(row=row, column=col, value=value)
+                col_widths[col] = max(col_widths[col], len(str(value)))
         
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+        # Apply the column widths collected while writing
+        for col, width in col_widths.items():
+            ws.column_dimensions[get_column_letter(col)].width = min(width + 2, 50)
         
         # Save to BytesIO
         output = BytesIO()
@@ -5239,12 +6103,9 @@ def download_plagiarism_report():
 
 @app.route('/admin/analytics')
 @login_required
+@admin_only
 def admin_analytics():
     """Comprehensive system analytics dashboard"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Comprehensive analytics data
     total_users = User.query.count()
     total_hosts = User.query.filter_by(role='host').count()
@@ -5350,12 +6211,9 @@ def admin_analytics():
 
 @app.route('/admin/bulk-operations', endpoint='admin_bulk_users')
 @login_required
+@admin_only
 def admin_bulk_operations():
     """Bulk operations management dashboard"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Get recent bulk operation statistics
     total_users = User.query.count()
     recent_users = User.query.filter(
@@ -5372,29 +6230,23 @@ def admin_bulk_operations():
 
 @app.route('/admin/system-settings')
 @login_required
+@admin_only
 def admin_system_settings():
     """Admin system settings"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     return render_template('admin_system_settings.html')
 
 @app.route('/admin/violation-appeals')
 @login_required
+@admin_only
 def admin_violation_appeals():
     """Admin page to manage student violation appeals"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Get users with pending appeals (flagged users who requested reconsideration)
     pending_appeals = db.session.query(UserViolation, User).join(
         User, UserViolation.user_id == User.id
     ).filter(
+        UserViolation.has_pending_appeal == True,
         UserViolation.is_flagged == True,
-        UserViolation.can_retake == False,
-        UserViolation.notes.ilike('%appeal%')
+        UserViolation.can_retake == False
     ).order_by(UserViolation.flagged_at.desc()).all()
     
     # Get recent violations for context
@@ -5414,12 +6266,9 @@ def admin_violation_appeals():
 
 @app.route('/admin/approve-appeal/<int:violation_id>', methods=['POST'])
 @login_required
+@admin_only
 def admin_approve_appeal(violation_id):
     """Admin approves a student's violation appeal"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     violation = UserViolation.query.get_or_404(violation_id)
     decision = request.form.get('decision')  # 'approve' or 'deny'
     admin_notes = request.form.get('admin_notes', '')
@@ -5434,6 +6283,7 @@ def admin_approve_appeal(violation_id):
         violation.notes += f"\n\n[ADMIN DENIAL - {current_user.username}]: Appeal denied. {admin_notes}"
         flash(f'Appeal denied for {violation.user.username}.', 'info')
     
+    violation.has_pending_appeal = False
     db.session.commit()
     return redirect(url_for('admin_violation_appeals'))
 
@@ -5441,7 +6291,7 @@ def admin_approve_appeal(violation_id):
 @login_required
 def student_request_appeal():
     """Student requests appeal for security violations"""
-    if current_user.is_admin() or current_user.is_host():
+    if current_is_admin() or current_user.is_host():
         flash('This page is for students only.', 'error')
         return redirect(url_for('dashboard'))
     
@@ -5461,6 +6311,7 @@ def student_request_appeal():
         # Add appeal to notes
         current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
         violation.notes += f"\n\n[STUDENT APPEAL - {current_time}]: {appeal_reason}"
+        violation.has_pending_appeal = True
         db.session.commit()
         
         flash('Your appeal has been submitted. An administrator will review it shortly.', 'success')
@@ -5470,26 +6321,38 @@ def student_request_appeal():
 
 @app.route('/admin/audit-logs')
 @login_required
+@admin_only
 def admin_audit_logs():
     """Admin audit logs"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Get recent activities (for now, we'll show quiz attempts and user registrations)
-    recent_attempts = QuizAttempt.query.order_by(QuizAttempt.started_at.desc()).limit(50).all()
-    recent_users = User.query.order_by(User.created_at.desc()).limit(20).all()
+    # Select only the columns the template shows, so no ORM objects or relationship loads are needed
+    creator = aliased(User)
+    recent_attempts = db.session.query(
+        QuizAttempt.id,
+        QuizAttempt.started_at,
+        QuizAttempt.completed_at,
+        QuizAttempt.status,
+        QuizAttempt.score,
+        func.coalesce(QuizAttempt.violation_count, 0).label('violation_count'),
+        User.username.label('participant_username'),
+        User.email.label('participant_email'),
+        Quiz.title.label('quiz_title'),
+        creator.username.label('creator_username')
+    ).join(User, User.id == QuizAttempt.participant_id) \
+     .join(Quiz, Quiz.id == QuizAttempt.quiz_id) \
+     .join(creator, creator.id == Quiz.creator_id) \
+     .order_by(QuizAttempt.started_at.desc()).limit(50).all()
+    recent_users = db.session.query(
+        User.username, User.email, User.role, User.is_verified, User.created_at, User.last_login
+    ).order_by(User.created_at.desc()).limit(20).all()
     
     return render_template('admin_audit_logs.html', recent_attempts=recent_attempts, recent_users=recent_users)
 
 @app.route('/admin/quiz/<int:quiz_id>/toggle-active', methods=['POST'])
 @login_required
+@admin_only
 def admin_toggle_quiz_active(quiz_id):
     """Toggle quiz active status"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
     quiz = Quiz.query.get_or_404(quiz_id)
     quiz.is_active = not quiz.is_active
     db.session.commit()
@@ -5500,45 +6363,26 @@ def admin_toggle_quiz_active(quiz_id):
 
 @app.route('/admin/quiz/<int:quiz_id>/delete', methods=['POST'])
 @login_required
+@admin_only
 def admin_delete_quiz(quiz_id):
     """Delete a quiz (admin only)"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
-    
-    quiz = Quiz.query.get_or_404(quiz_id)
-    
-    # Delete all related data in correct order (respecting foreign keys)
-    # 1. Delete answers first (they reference quiz_attempt)
-    attempts = QuizAttempt.query.filter_by(quiz_id=quiz_id).all()
-    for attempt in attempts:
-        Answer.query.filter_by(attempt_id=attempt.id).delete()
-        ProctoringEvent.query.filter_by(attempt_id=attempt.id).delete()
-    
-    # 2. Delete quiz attempts
-    QuizAttempt.query.filter_by(quiz_id=quiz_id).delete()
-    
-    # 3. Delete question options and questions
-    for question in quiz.questions:
-        QuestionOption.query.filter_by(question_id=question.id).delete()
-    Question.query.filter_by(quiz_id=quiz_id).delete()
+    quiz_title = Quiz.query.get_or_404(quiz_id).title
     
-    # 4. Finally delete the quiz
-    db.session.delete(quiz)
+    # Questions, options, attempts, answers, proctoring events and the per-quiz
+    # analytics rows go with it through ON DELETE CASCADE / SET NULL
+    delete_with_dependents(Quiz, quiz_id)
     db.session.commit()
+    invalidate_stats(ADMIN_STATS_CACHE_KEY)
     
-    flash(f'Quiz "{quiz.title}" has been permanently deleted.', 'success')
+    flash(f'Quiz "{quiz_title}" has been permanently deleted.', 'success')
     return redirect(url_for('admin_quiz_management'))
 
 # ===== COURSE MANAGEMENT SYSTEM =====
 @app.route('/admin/course-management')
 @login_required
+@admin_only
 def admin_course_management():
     """Admin course management system"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     courses = Course.query.order_by(Course.display_order.asc(), Course.created_at.desc()).all()
     hosts = User.query.filter_by(role='host').all()
     participants = User.query.filter_by(role='participant').all()
@@ -5562,12 +6406,9 @@ def admin_course_management():
 
 @app.route('/admin/create-course', methods=['POST'])
 @login_required
+@admin_only
 def admin_create_course():
     """Create new course"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     name = request.form.get('name')
     code = request.form.get('code')
     description = request.form.get('description')
@@ -5597,12 +6438,9 @@ def admin_create_course():
 
 @app.route('/admin/course/<int:course_id>/assign-host', methods=['POST'])
 @login_required
+@admin_only
 def admin_assign_host_to_course(course_id):
     """Assign host to course"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     course = Course.query.get_or_404(course_id)
     host_id = request.form.get('host_id', type=int)
     
@@ -5635,12 +6473,9 @@ def admin_assign_host_to_course(course_id):
 
 @app.route('/admin/course/<int:course_id>/enroll-participant', methods=['POST'])
 @login_required
+@admin_only
 def admin_enroll_participant_in_course(course_id):
     """Enroll participant in course"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     course = Course.query.get_or_404(course_id)
     participant_id = request.form.get('participant_id', type=int)
     
@@ -5679,12 +6514,9 @@ def admin_enroll_participant_in_course(course_id):
 
 @app.route('/admin/course/<int:course_id>/bulk-enroll-participants', methods=['POST'])
 @login_required
+@admin_only
 def admin_bulk_enroll_participants(course_id):
     """Bulk enroll multiple participants in course"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     course = Course.query.get_or_404(course_id)
     participant_ids = request.form.getlist('participant_ids')
     
@@ -5793,12 +6625,9 @@ def admin_bulk_enroll_participants(course_id):
 
 @app.route('/admin/course/<int:course_id>/remove-host/<int:host_id>', methods=['POST'])
 @login_required
+@admin_only
 def admin_remove_host_from_course(course_id, host_id):
     """Remove host from course"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     assignment = HostCourseAssignment.query.filter_by(host_id=host_id, course_id=course_id).first_or_404()
     host_name = assignment.host.username
     course_name = assignment.course.name
@@ -5811,12 +6640,9 @@ def admin_remove_host_from_course(course_id, host_id):
 
 @app.route('/admin/course/<int:course_id>/remove-participant/<int:participant_id>', methods=['POST'])
 @login_required
+@admin_only
 def admin_remove_participant_from_course(course_id, participant_id):
     """Remove participant from course"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     enrollment = ParticipantEnrollment.query.filter_by(participant_id=participant_id, course_id=course_id).first_or_404()
     participant_name = enrollment.participant.username
     course_name = enrollment.course.name
@@ -5829,12 +6655,9 @@ def admin_remove_participant_from_course(course_id, participant_id):
 
 @app.route('/admin/course/<int:course_id>/toggle-status', methods=['POST'])
 @login_required
+@admin_only
 def admin_toggle_course_status(course_id):
     """Toggle course active status"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     course = Course.query.get_or_404(course_id)
     course.is_active = not course.is_active
     db.session.commit()
@@ -5845,12 +6668,9 @@ def admin_toggle_course_status(course_id):
 
 @app.route('/admin/course/<int:course_id>/delete', methods=['POST'])
 @login_required
+@admin_only
 def admin_delete_course(course_id):
     """Delete course and all related data"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     course = Course.query.get_or_404(course_id)
     course_name = course.name
     
@@ -5871,11 +6691,9 @@ def admin_delete_course(course_id):
 
 @app.route('/api/quiz/<int:quiz_id>/stats')
 @login_required
+@admin_only
 def get_quiz_stats(quiz_id):
     """Get quiz statistics for admin"""
-    if not current_user.is_admin():
-        return jsonify({'error': 'Access denied'}), 403
-    
     quiz = Quiz.query.get_or_404(quiz_id)
     attempts = QuizAttempt.query.filter_by(quiz_id=quiz_id).all()
     violations = ProctoringEvent.query.join(QuizAttempt).filter(QuizAttempt.quiz_id == quiz_id).all()
@@ -5897,22 +6715,18 @@ def get_quiz_stats(quiz_id):
 
 @app.route('/api/violations/count')
 @login_required
+@admin_only
 def get_violations_count():
     """Get total violation count for admin dashboard"""
-    if not current_user.is_admin():
-        return jsonify({'error': 'Access denied'}), 403
-    
     count = ProctoringEvent.query.count()
     return jsonify({'count': count})
 
 
 @app.route('/api/export-logs')
 @login_required  
+@admin_only
 def export_logs():
     """Export audit logs to CSV"""
-    if not current_user.is_admin():
-        return jsonify({'error': 'Access denied'}), 403
-    
     import csv
     import io
     from flask import make_response
@@ -5923,18 +6737,33 @@ def export_logs():
     # Write headers
     writer.writerow(['Date', 'User', 'Quiz', 'Action', 'Status', 'Score', 'Violations'])
     
-    # Write data
-    attempts = QuizAttempt.query.order_by(QuizAttempt.started_at.desc()).all()
-    for attempt in attempts:
-        writer.writerow([
-            attempt.started_at.strftime('%Y-%m-%d %H:%M:%S') if attempt.started_at else 'N/A',
-            attempt.participant.username,
-            attempt.quiz.title,
+    # Write data - the score string and answer count come back from the same query as the row
+    score_str = case(
+        (func.coalesce(QuizAttempt.score, 0) == 0, 'N/A'),
+        else_=cast(func.round(cast(QuizAttempt.score, Numeric), 1), String) + '%'
+    )
+    answer_count = db.select(func.count(Answer.id)) \
+        .where(Answer.attempt_id == QuizAttempt.id) \
+        .correlate(QuizAttempt).scalar_subquery()
+    
+    attempts = db.session.query(
+        QuizAttempt.started_at, User.username, Quiz.title, QuizAttempt.status,
+        score_str.label('score_str'), answer_count.label('answer_count')
+    ).join(User, QuizAttempt.participant_id == User.id) \
+     .join(Quiz, QuizAttempt.quiz_id == Quiz.id) \
+     .order_by(QuizAttempt.started_at.desc()).yield_per(1000)
+    writer.writerows(
+        (
+            started_at.strftime('%Y-%m-%d %H:%M:%S') if started_at else 'N/A',
+            username,
+            quiz_title,
             'Quiz Attempt',
-            attempt.status,
-            f"{attempt.score:.1f}%" if attempt.score else 'N/A',
-            len(attempt.answers) if hasattr(attempt, 'answers') else 0
-        ])
+            status,
+            score,
+            answers
+        )
+        for started_at, username, quiz_title, status, score, answers in attempts
+    )
     
     response = make_response(output.getvalue())
     response.headers['Content-Type'] = 'text/csv'
@@ -5944,11 +6773,9 @@ def export_logs():
 
 @app.route('/api/export-users')
 @login_required  
+@admin_only
 def export_users():
     """Export user data to CSV"""
-    if not current_user.is_admin():
-        return jsonify({'error': 'Access denied'}), 403
-    
     import csv
     import io
     from flask import make_response
@@ -5959,18 +6786,22 @@ def export_users():
     # Write headers
     writer.writerow(['Username', 'Email', 'Role', 'Status', 'Verified', 'Registered', 'Last Login'])
     
-    # Write data
-    users = User.query.order_by(User.created_at.desc()).all()
-    for user in users:
-        writer.writerow([
-            user.username,
-            user.email,
-            user.role,
-            'Active' if user.is_verified else 'Inactive',
-            'Yes' if user.is_verified else 'No',
-            user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else 'N/A',
-            user.last_login.strftime('%Y-%m-%d %H:%M:%S') if user.last_login else 'Never'
-        ])
+    # Write data - project only the exported columns and let csv consume the rows in one call
+    users = db.session.query(
+        User.username, User.email, User.role, User.is_verified, User.created_at, User.last_login
+    ).order_by(User.created_at.desc()).yield_per(1000)
+    writer.writerows(
+        (
+            username,
+            email,
+            role,
+            'Active' if is_verified else 'Inactive',
+            'Yes' if is_verified else 'No',
+            created_at.strftime('%Y-%m-%d %H:%M:%S') if created_at else 'N/A',
+            last_login.strftime('%Y-%m-%d %H:%M:%S') if last_login else 'Never'
+        )
+        for username, email, role, is_verified, created_at, last_login in users
+    )
     
     response = make_response(output.getvalue())
     response.headers['Content-Type'] = 'text/csv'
@@ -6070,15 +6901,8 @@ def mark_malpractice():
         attempt.termination_reason = f"Malpractice: {violation.get('description', 'Critical violation detected')}"
         attempt.is_flagged = True
         
-        # Create or update user violation record
-        user_violation = UserViolation.query.filter_by(user_id=current_user.id).first()
-        if not user_violation:
-            user_violation = UserViolation(user_id=current_user.id)
-            db.session.add(user_violation)
-        
-        user_violation.is_flagged = True
-        user_violation.flagged_at = datetime.utcnow()
-        user_violation.flagged_by = None  # System flagged
+        # Create or update user violation record (system flagged)
+        flag_user_violation(current_user.id)
         
         # Create security alert
         alert = SecurityAlert(
@@ -6103,6 +6927,7 @@ def mark_malpractice():
         db.session.add(event)
         
         db.session.commit()
+        invalidate_stats(user_flag_cache_key(current_user.id))
         
         return jsonify({
             'success': True,
@@ -6244,12 +7069,12 @@ def force_submit_quiz():
 @login_required
 def host_heatmap_dashboard():
     """Host collaboration heatmap dashboard"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied. Host privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
     # Get quizzes created by the current host (or all if admin)
-    if current_user.is_admin():
+    if current_is_admin():
         quizzes = Quiz.query.filter_by(is_deleted=False).order_by(Quiz.created_at.desc()).all()
     else:
         quizzes = Quiz.query.filter_by(
@@ -6263,7 +7088,7 @@ def host_heatmap_dashboard():
     if selected_quiz_id:
         selected_quiz = Quiz.query.get(selected_quiz_id)
         # Verify access to selected quiz
-        if selected_quiz and not current_user.is_admin() and selected_quiz.creator_id != current_user.id:
+        if selected_quiz and not current_is_admin() and selected_quiz.creator_id != current_user.id:
             selected_quiz = None
     
     # Add attempt counts to quizzes
@@ -6284,7 +7109,7 @@ def help_page():
 @login_required
 def api_reorder_courses():
     """API endpoint to handle course reordering via drag-and-drop"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'success': False, 'message': 'Unauthorized access'}), 403
     
     try:
@@ -6311,7 +7136,7 @@ def api_reorder_courses():
 @login_required
 def api_reorder_quizzes():
     """API endpoint to handle quiz reordering via drag-and-drop"""
-    if not (current_user.is_admin() or current_user.is_host()):
+    if not (current_is_admin() or current_user.is_host()):
         return jsonify({'success': False, 'message': 'Unauthorized access'}), 403
     
     try:
@@ -6327,7 +7152,7 @@ def api_reorder_quizzes():
             quiz = Quiz.query.get(quiz_id)
             if quiz:
                 # Verify user has permission to modify this quiz
-                if not current_user.is_admin() and quiz.creator_id != current_user.id:
+                if not current_is_admin() and quiz.creator_id != current_user.id:
                     return jsonify({'success': False, 'message': 'Unauthorized to modify this quiz'}), 403
                 quiz.display_order = index
         
@@ -6342,12 +7167,9 @@ def api_reorder_quizzes():
 
 @app.route('/admin/rbac')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_rbac_dashboard():
     """RBAC management dashboard"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     roles = Role.query.order_by(Role.created_at.desc()).all()
     permissions = Permission.query.order_by(Permission.category, Permission.name).all()
     
@@ -6379,12 +7201,9 @@ def admin_rbac_dashboard():
 
 @app.route('/admin/rbac/roles')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_rbac_roles():
     """Role management interface"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     roles = Role.query.order_by(Role.created_at.desc()).all()
     permissions = Permission.query.order_by(Permission.category, Permission.name).all()
     
@@ -6397,12 +7216,9 @@ def admin_rbac_roles():
 
 @app.route('/admin/rbac/permissions')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_rbac_permissions():
     """Permission management interface"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     permissions = Permission.query.order_by(Permission.category, Permission.name).all()
     
     # Group by category
@@ -6418,12 +7234,9 @@ def admin_rbac_permissions():
 
 @app.route('/admin/rbac/user-assignments')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_rbac_user_assignments():
     """User role assignment interface"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     users = User.query.order_by(User.username).all()
     roles = Role.query.filter_by(is_active=True).order_by(Role.name).all()
     
@@ -6442,12 +7255,9 @@ def admin_rbac_user_assignments():
 
 @app.route('/admin/rbac/audit-logs')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_rbac_audit_logs():
     """RBAC audit log viewer"""
-    if not current_user.is_admin():
-        flash('Access denied. Administrator privileges required.', 'error')
-        return redirect(url_for('dashboard'))
-    
     page = request.args.get('page', 1, type=int)
     entity_type = request.args.get('entity_type', '')
     action = request.args.get('action', '')
@@ -6472,7 +7282,7 @@ def admin_rbac_audit_logs():
 @login_required
 def api_create_role():
     """Create a new role"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'success': False, 'error': 'Access denied'}), 403
     
     try:
@@ -6501,7 +7311,7 @@ def api_create_role():
 @login_required
 def api_update_role(role_id):
     """Update an existing role"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'success': False, 'error': 'Access denied'}), 403
     
     try:
@@ -6524,7 +7334,7 @@ def api_update_role(role_id):
 @login_required
 def api_delete_role(role_id):
     """Delete a role"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'success': False, 'error': 'Access denied'}), 403
     
     try:
@@ -6544,7 +7354,7 @@ def api_delete_role(role_id):
 @login_required
 def api_assign_role():
     """Assign role to user"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'success': False, 'error': 'Access denied'}), 403
     
     try:
@@ -6575,7 +7385,7 @@ def api_assign_role():
 @login_required
 def api_revoke_role():
     """Revoke role from user"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'success': False, 'error': 'Access denied'}), 403
     
     try:
@@ -6601,7 +7411,7 @@ def api_revoke_role():
 @login_required
 def api_update_role_permissions(role_id):
     """Update role permissions"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'success': False, 'error': 'Access denied'}), 403
     
     try:
@@ -6646,7 +7456,7 @@ def api_update_role_permissions(role_id):
 @login_required
 def api_bulk_assign_roles():
     """Bulk assign roles to multiple users"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'success': False, 'error': 'Access denied'}), 403
     
     try:
@@ -6674,7 +7484,7 @@ def api_bulk_assign_roles():
 @login_required
 def api_initialize_rbac():
     """Initialize RBAC system with default roles and permissions"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'success': False, 'error': 'Access denied'}), 403
     
     try:
@@ -6807,12 +7617,9 @@ def lti_config_json():
 
 @app.route('/lti/admin')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def lti_admin():
     """LTI Administration dashboard"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('home'))
-    
     # Get LTI user statistics
     lti_users = User.query.filter(User.lti_user_id.isnot(None)).all()
     lti_stats = {
@@ -6894,12 +7701,12 @@ def lti_grade_passback():
 @login_required
 def lti_quiz_selection():
     """Quiz selection page for LTI content selection"""
-    if not current_user.is_host() and not current_user.is_admin():
+    if not current_user.is_host() and not current_is_admin():
         flash('Access denied.', 'error')
         return redirect(url_for('home'))
     
     # Get available quizzes for selection
-    if current_user.is_admin():
+    if current_is_admin():
         quizzes = Quiz.query.filter_by(is_active=True).all()
     else:
         quizzes = Quiz.query.filter_by(creator_id=current_user.id, is_active=True).all()
@@ -6930,7 +7737,7 @@ def lti_content_item():
             return jsonify({'success': False, 'error': 'Quiz not found'}), 404
         
         # Check permissions
-        if not current_user.is_admin() and quiz.creator_id != current_user.id:
+        if not current_is_admin() and quiz.creator_id != current_user.id:
             return jsonify({'success': False, 'error': 'Access denied'}), 403
         
         # Create content item response
@@ -7055,12 +7862,9 @@ def lti_grade_passback_trigger(response):
 
 @app.route('/admin/proctoring-reports')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_proctoring_reports():
     """Proctoring reports dashboard for administrators"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('home'))
-    
     try:
         # Get recent report summary
         generator = ProctoringReportGenerator()
@@ -7095,7 +7899,7 @@ def admin_proctoring_reports():
 @login_required
 def api_generate_proctoring_report():
     """Generate custom proctoring report via API"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     try:
@@ -7146,7 +7950,7 @@ def api_generate_proctoring_report():
 @login_required
 def api_proctoring_analytics():
     """Get proctoring analytics data for charts and graphs"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     try:
@@ -7237,12 +8041,9 @@ def api_proctoring_analytics():
 
 @app.route('/admin/analytics-dashboard')
 @login_required
+@admin_only(redirect_to_dashboard=True)
 def admin_analytics_dashboard():
     """Enhanced analytics dashboard for comprehensive insights"""
-    if not current_user.is_admin():
-        flash('Access denied.', 'error')
-        return redirect(url_for('home'))
-    
     try:
         # Initialize analytics engine
         analytics = get_analytics_engine()
@@ -7270,7 +8071,7 @@ def admin_analytics_dashboard():
 @login_required
 def api_predictive_analytics():
     """Get predictive analytics for student risk assessment"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     try:
@@ -7342,7 +8143,7 @@ def api_predictive_analytics():
 @login_required
 def api_institutional_metrics():
     """Get real-time institutional dashboard metrics"""
-    if not current_user.is_admin():
+    if not current_is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
     try: